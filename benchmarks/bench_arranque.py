@@ -0,0 +1,54 @@
+"""
+Benchmark de arranque de la GUI: tiempo hasta el primer pintado del Login y de
+la Aplicacion, cada medición en un proceso nuevo (incluye importar los módulos).
+
+Necesita una pantalla (DISPLAY). La Aplicacion se abre sobre la base de datos
+por defecto (ecotech.db), igual que al usar main.py.
+
+Uso:
+    python benchmarks/bench_arranque.py [repeticiones]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def medir_en_hijo(ventana: str) -> None:
+    inicio = time.perf_counter()
+    sys.path.insert(0, RAIZ)
+    import gui
+
+    if ventana == "login":
+        raiz = gui.Login()
+    else:
+        gui.db.inicializar_bd()
+        raiz = gui.Aplicacion()
+
+    def listo(_nombre, ms):
+        print(f"{ms:.1f}")
+        raiz.after(0, raiz.destroy)
+
+    gui.medir_primer_pintado(raiz, ventana, inicio, al_medir=listo)
+    raiz.mainloop()
+
+
+def main(repeticiones: int) -> None:
+    for ventana in ("login", "aplicacion"):
+        tiempos = []
+        for _ in range(repeticiones):
+            salida = subprocess.run([sys.executable, __file__, "--hijo", ventana],
+                                    capture_output=True, text=True, check=True).stdout
+            tiempos.append(float(salida.strip().splitlines()[-1]))
+        print(f"{ventana:>10}: mediana {statistics.median(tiempos):7.1f} ms"
+              f"  (mín {min(tiempos):.1f}, máx {max(tiempos):.1f}, n={repeticiones})")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "--hijo":
+        medir_en_hijo(sys.argv[2])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
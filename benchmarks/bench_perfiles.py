@@ -0,0 +1,73 @@
+"""
+Benchmark de perfiles de rendimiento SQLite.
+
+Para cada perfil de `db.PERFILES_RENDIMIENTO` crea una base temporal, inserta
+registros de tiempo uno por uno (cada inserción hace commit, como la GUI) y luego
+mide lecturas con un hilo lector concurrente.
+
+Uso:
+    python benchmarks/bench_perfiles.py [n_escrituras]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db  # noqa: E402
+
+
+def medir_perfil(perfil: str, n_escrituras: int) -> dict:
+    directorio = tempfile.mkdtemp(prefix="bench_perfil_")
+    ruta = os.path.join(directorio, "bench.db")
+    db.configurar_perfil(perfil)
+    db.inicializar_bd(ruta_db=ruta)
+    dep = db.agregar_departamento("Bench", ruta_db=ruta)
+    proj = db.agregar_proyecto("Bench", ruta_db=ruta)
+    emp = db.agregar_empleado("Bench", "", "", "bench@ecotech.com", 1000.0, "x", dep, ruta_db=ruta)
+
+    # Lector concurrente: mide cuántas lecturas logra mientras se escribe
+    lecturas = [0]
+    detener = threading.Event()
+
+    def lector():
+        while not detener.is_set():
+            db.listar_proyectos(ruta_db=ruta)
+            lecturas[0] += 1
+
+    hilo = threading.Thread(target=lector, daemon=True)
+    hilo.start()
+    inicio = time.perf_counter()
+    for i in range(n_escrituras):
+        db.agregar_registro_tiempo(emp, proj, "2025-12-%02d" % (i % 28 + 1), 1.0, ruta_db=ruta)
+    duracion = time.perf_counter() - inicio
+    detener.set()
+    hilo.join()
+
+    db.cerrar_conexiones(ruta)
+    for sufijo in ("", "-wal", "-shm"):
+        try:
+            os.unlink(ruta + sufijo)
+        except OSError:
+            pass
+    os.rmdir(directorio)
+    return {
+        "perfil": perfil,
+        "escrituras_s": n_escrituras / duracion,
+        "lecturas_s": lecturas[0] / duracion,
+    }
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"{'Perfil':<14}{'Escrituras/s':>14}{'Lecturas/s':>14}")
+    for perfil in db.PERFILES_RENDIMIENTO:
+        r = medir_perfil(perfil, n)
+        print(f"{r['perfil']:<14}{r['escrituras_s']:>14.0f}{r['lecturas_s']:>14.0f}")
+    db.configurar_perfil("balanceado")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark de reportes: agregación en SQLite (`reportes.horas_por`) frente a
+traer todos los registros con `db.listar_registros()` y sumar en Python.
+
+Uso:
+    python benchmarks/bench_reportes.py [n_registros]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db  # noqa: E402
+import reportes  # noqa: E402
+
+
+def poblar(ruta: str, n_registros: int) -> None:
+    db.inicializar_bd(ruta_db=ruta)
+    db.agregar_proyectos((("Proyecto %d" % i, "") for i in range(50)), ruta_db=ruta)
+    db.agregar_empleados((("Empleado %d" % i, "", "", "e%d@ecotech.com" % i, 1000.0, "x", None)
+                          for i in range(500)), ruta_db=ruta)
+    aleatorio = random.Random(42)
+    registros = ((aleatorio.randint(1, 500), aleatorio.randint(1, 50),
+                  "2025-%02d-%02d" % (aleatorio.randint(1, 12), aleatorio.randint(1, 28)),
+                  aleatorio.choice((1.0, 2.0, 4.0, 8.0)))
+                 for _ in range(n_registros))
+    db.agregar_registros_tiempo(registros, ruta_db=ruta)
+
+
+def por_proyecto_en_python(ruta: str, desde: str, hasta: str) -> dict:
+    totales = defaultdict(float)
+    for _, _, proyecto_id, fecha, horas in db.listar_registros(ruta_db=ruta):
+        if desde <= fecha <= hasta:
+            totales[proyecto_id] += horas
+    return totales
+
+
+def medir(funcion, *args) -> float:
+    inicio = time.perf_counter()
+    funcion(*args)
+    return time.perf_counter() - inicio
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    directorio = tempfile.mkdtemp(prefix="bench_reportes_")
+    ruta = os.path.join(directorio, "bench.db")
+    poblar(ruta, n)
+
+    print(f"{n} registros")
+    print(f"{'Consulta':<28}{'Python (s)':>12}{'SQLite (s)':>12}")
+    t_py = medir(por_proyecto_en_python, ruta, "2025-01-01", "2025-12-31")
+    t_sql = medir(reportes.horas_por, "proyecto", "2025-01-01", "2025-12-31", None, None, ruta)
+    print(f"{'proyecto, año completo':<28}{t_py:>12.3f}{t_sql:>12.3f}")
+    t_py = medir(por_proyecto_en_python, ruta, "2025-03-01", "2025-03-31")
+    t_sql = medir(reportes.horas_por, "proyecto", "2025-03-01", "2025-03-31", None, None, ruta)
+    print(f"{'proyecto, un mes':<28}{t_py:>12.3f}{t_sql:>12.3f}")
+    for agrupacion in ("empleado", "departamento", "semana", "mes"):
+        t_sql = medir(reportes.horas_por, agrupacion, None, None, None, None, ruta)
+        print(f"{agrupacion:<28}{'':>12}{t_sql:>12.3f}")
+
+    db.cerrar_conexiones(ruta)
+    for sufijo in ("", "-wal", "-shm"):
+        try:
+            os.unlink(ruta + sufijo)
+        except OSError:
+            pass
+    os.rmdir(directorio)
+
+
+if __name__ == "__main__":
+    main()
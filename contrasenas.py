@@ -0,0 +1,205 @@
+"""
+Hash y verificación de contraseñas con formato versionado y costo calibrado.
+
+Un solo subsistema para los dos lados del proyecto (empleados en SQLite y
+usuarios en MySQL). Cada hash guardado indica su algoritmo y su costo:
+- '$pbkdf2-sha256$<iteraciones>$<sal hex>$<hash hex>' : PBKDF2-HMAC-SHA256 (librería estándar)
+- '$2b$<costo>$...'                                   : bcrypt (requiere el paquete `bcrypt`)
+- 64 caracteres hexadecimales                         : SHA-256 sin sal (formato antiguo, solo verificación)
+
+El costo de cada algoritmo se calibra midiendo este equipo para que un hash tarde
+alrededor de `OBJETIVO_MS` (variable HASH_OBJETIVO_MS), o se fija con
+`configurar` / variables de entorno. `necesita_rehash` indica si un hash quedó
+en otro formato o con bastante menos costo que el actual: al hacer login se
+puede rehacer con la contraseña recién verificada.
+"""
+import hashlib
+import hmac
+import math
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+try:
+    import bcrypt
+except ImportError:  # bcrypt es opcional: sin él se usa PBKDF2
+    bcrypt = None
+
+ALGORITMO_DEFAULT = "pbkdf2-sha256"
+OBJETIVO_MS = float(os.getenv("HASH_OBJETIVO_MS", "250"))
+# Pisos para que la calibración en un equipo lento no deje hashes débiles
+COSTO_MINIMO = {"pbkdf2-sha256": 100_000, "bcrypt": 10}
+COSTO_MAXIMO = {"pbkdf2-sha256": 10_000_000, "bcrypt": 16}
+# La calibración de PBKDF2 se redondea hacia abajo a múltiplos de este paso, y
+# solo se rehace un hash que cueste menos que esta fracción del costo actual:
+# cada proceso calibra por su cuenta y las mediciones varían algunos puntos, sin
+# esto un hash recién rehecho se volvería a rehacer en muchos logins siguientes
+PASO_PBKDF2 = 50_000
+TOLERANCIA_REHASH = 0.8
+# Costos fijos desde el entorno (si no están, se calibra)
+_VARIABLES_COSTO = {"pbkdf2-sha256": "HASH_ITERACIONES_PBKDF2", "bcrypt": "BCRYPT_COSTO"}
+
+_SHA256_ANTIGUO = re.compile(r"^[0-9a-f]{64}$")
+_costos: Dict[str, int] = {}
+_costos_lock = threading.Lock()
+_senuelos: Dict[Tuple[str, int], str] = {}
+
+
+def _validar_algoritmo(algoritmo: str) -> None:
+    if algoritmo not in COSTO_MINIMO:
+        raise ValueError(f"Algoritmo de hash desconocido: {algoritmo!r}")
+    if algoritmo == "bcrypt" and bcrypt is None:
+        raise RuntimeError("El paquete bcrypt no está instalado")
+
+
+def _pbkdf2(contrasena: str, sal: bytes, iteraciones: int) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", contrasena.encode("utf-8"), sal, iteraciones)
+
+
+def _medir_ms(algoritmo: str, costo: int) -> float:
+    inicio = time.perf_counter()
+    if algoritmo == "bcrypt":
+        bcrypt.hashpw(b"calibracion", bcrypt.gensalt(rounds=costo))
+    else:
+        _pbkdf2("calibracion", b"0" * 16, costo)
+    return (time.perf_counter() - inicio) * 1000
+
+
+def calibrar(algoritmo: str = ALGORITMO_DEFAULT, objetivo_ms: Optional[float] = None) -> int:
+    """Mide este equipo y fija el costo de `algoritmo` para que un hash tarde ~`objetivo_ms`.
+
+    PBKDF2 escala linealmente con las iteraciones; bcrypt duplica el tiempo por
+    cada punto de costo. El resultado queda entre COSTO_MINIMO y COSTO_MAXIMO.
+    """
+    _validar_algoritmo(algoritmo)
+    objetivo = objetivo_ms or OBJETIVO_MS
+    if algoritmo == "bcrypt":
+        base = 8
+        ms = max(_medir_ms(algoritmo, base), 1e-3)
+        costo = base + round(math.log2(objetivo / ms))
+    else:
+        base = 20_000
+        ms = max(_medir_ms(algoritmo, base), 1e-3)
+        costo = int(base * objetivo / ms) // PASO_PBKDF2 * PASO_PBKDF2
+    costo = max(COSTO_MINIMO[algoritmo], min(COSTO_MAXIMO[algoritmo], costo))
+    with _costos_lock:
+        _costos[algoritmo] = costo
+    return costo
+
+
+def configurar(algoritmo: str, costo: int) -> None:
+    """Fija el costo de `algoritmo` sin calibrar (iteraciones para PBKDF2, log2 de rondas para bcrypt)."""
+    if algoritmo not in COSTO_MINIMO:
+        raise ValueError(f"Algoritmo de hash desconocido: {algoritmo!r}")
+    with _costos_lock:
+        _costos[algoritmo] = int(costo)
+
+
+def costo_actual(algoritmo: str = ALGORITMO_DEFAULT) -> int:
+    """Costo con el que se generan los hashes nuevos (calibra la primera vez si hace falta)."""
+    with _costos_lock:
+        costo = _costos.get(algoritmo)
+    if costo is not None:
+        return costo
+    fijo = os.getenv(_VARIABLES_COSTO[algoritmo])
+    if fijo:
+        configurar(algoritmo, int(fijo))
+        return int(fijo)
+    return calibrar(algoritmo)
+
+
+def hashear(contrasena: str, algoritmo: str = ALGORITMO_DEFAULT, costo: Optional[int] = None) -> str:
+    """Devuelve el hash versionado de la contraseña, con sal aleatoria."""
+    if contrasena is None:
+        raise ValueError("La contraseña no puede ser None")
+    _validar_algoritmo(algoritmo)
+    costo = costo or costo_actual(algoritmo)
+    if algoritmo == "bcrypt":
+        return bcrypt.hashpw(contrasena.encode("utf-8"), bcrypt.gensalt(rounds=costo)).decode("utf-8")
+    sal = os.urandom(16)
+    return f"${algoritmo}${costo}${sal.hex()}${_pbkdf2(contrasena, sal, costo).hex()}"
+
+
+def identificar(hash_almacenado: str) -> Tuple[str, int]:
+    """Devuelve (algoritmo, costo) de un hash guardado; ('sha256', 0) para el formato antiguo.
+
+    Lanza ValueError si el formato no se reconoce.
+    """
+    if hash_almacenado and hash_almacenado.startswith("$pbkdf2-sha256$"):
+        return "pbkdf2-sha256", int(hash_almacenado.split("$")[2])
+    if hash_almacenado and hash_almacenado[:4] in ("$2a$", "$2b$", "$2y$"):
+        return "bcrypt", int(hash_almacenado[4:6])
+    if hash_almacenado and _SHA256_ANTIGUO.match(hash_almacenado):
+        return "sha256", 0
+    raise ValueError("Formato de hash de contraseña desconocido")
+
+
+def verificar(contrasena: str, hash_almacenado: str) -> bool:
+    """Verifica la contraseña contra un hash en cualquiera de los formatos soportados.
+
+    Devuelve False si no coincide o si el hash no tiene un formato reconocido.
+    """
+    if contrasena is None:
+        return False
+    try:
+        algoritmo, costo = identificar(hash_almacenado)
+    except ValueError:
+        return False
+    if algoritmo == "pbkdf2-sha256":
+        try:
+            _, _, _, sal, esperado = hash_almacenado.split("$")
+            return hmac.compare_digest(_pbkdf2(contrasena, bytes.fromhex(sal), costo).hex(), esperado)
+        except ValueError:
+            return False  # hash truncado o corrupto (partes de más o de menos, sal no hex, costo 0)
+    if algoritmo == "bcrypt":
+        if bcrypt is None:
+            raise RuntimeError("El paquete bcrypt no está instalado")
+        try:
+            return bcrypt.checkpw(contrasena.encode("utf-8"), hash_almacenado.encode("utf-8"))
+        except ValueError:
+            return False  # sal inválida
+    return hmac.compare_digest(hashlib.sha256(contrasena.encode("utf-8")).hexdigest(), hash_almacenado)
+
+
+def _trabajo(algoritmo: str, costo: int) -> float:
+    # bcrypt duplica el trabajo por cada punto de costo; PBKDF2 es lineal
+    return 2.0 ** costo if algoritmo == "bcrypt" else float(costo)
+
+
+def necesita_rehash(hash_almacenado: str, algoritmo: str = ALGORITMO_DEFAULT,
+                    costo: Optional[int] = None) -> bool:
+    """Indica si el hash usa otro algoritmo o cuesta menos que TOLERANCIA_REHASH del actual.
+
+    `costo` es el de referencia (por defecto `costo_actual(algoritmo)`). Con bcrypt
+    cualquier punto de costo menos ya queda por debajo de la tolerancia.
+    """
+    try:
+        actual, costo_hash = identificar(hash_almacenado)
+    except ValueError:
+        return True
+    if actual != algoritmo:
+        return True
+    referencia = costo or costo_actual(algoritmo)
+    return _trabajo(algoritmo, costo_hash) < TOLERANCIA_REHASH * _trabajo(algoritmo, referencia)
+
+
+def verificar_senuelo(contrasena: str, algoritmo: str = ALGORITMO_DEFAULT,
+                      costo: Optional[int] = None) -> bool:
+    """Hace el mismo trabajo que verificar un hash real de `algoritmo` y devuelve False.
+
+    Para usuarios inexistentes: el intento cuesta lo mismo que uno con contraseña
+    incorrecta, así ni el tiempo de respuesta delata qué cuentas existen ni se
+    ahorra CPU probando nombres al azar. `costo` debe ser el de los hashes reales
+    (por defecto `costo_actual(algoritmo)`).
+    """
+    clave = (algoritmo, costo or costo_actual(algoritmo))
+    with _costos_lock:
+        senuelo = _senuelos.get(clave)
+    if senuelo is None:
+        senuelo = hashear(os.urandom(16).hex(), algoritmo, clave[1])
+        with _costos_lock:
+            _senuelos[clave] = senuelo
+    verificar(contrasena or "", senuelo)
+    return False
@@ -2,47 +2,389 @@
 Módulo de acceso a datos (SQLite) y funciones de seguridad.
 
 Implementa:
-- Inicialización de la base de datos y creación de tablas
+- Pool de conexiones SQLite reutilizables por ruta de base de datos
+- Perfiles de rendimiento (PRAGMAs) aplicados a cada conexión nueva
+- Inicialización del esquema con migraciones versionadas (PRAGMA user_version)
 - CRUD básico para empleados, departamentos, proyectos y registros de tiempo
-- Hash y verificación de contraseñas con SHA-256
+- Listados en streaming (fetchmany) y paginados por clave (despues_de_id, limite)
+- Caché en memoria de departamentos y proyectos, invalidada por las escrituras
+- Inserción masiva por lotes (executemany) en una sola transacción
+- Resumen diario de horas mantenido por triggers, con reconstrucción y verificación
+- Búsqueda de texto completo (FTS5) sobre empleados y proyectos
+- Registro de cambios por fila (secuencia creciente escrita por triggers) para
+  refrescos incrementales
+- Hash y verificación de contraseñas (formato versionado, rehash al hacer login)
+- Pasarela `get_db()` para modelos.GestorUsuarios: `ejecutar_query` sobre un pool
+  compartido, con SQLite (ecotech.db) o MySQL (database.sql) como backend
 """
 import sqlite3
-from typing import Optional, List, Tuple
-import hashlib
+from abc import ABC, abstractmethod
+from typing import Optional, List, Tuple, Dict, Iterable, Iterator, Callable, Any
+from collections import OrderedDict
+from itertools import islice
+from contextlib import contextmanager
+import atexit
 import os
+import re
+import threading
+import time
+import contrasenas
 
 DB_RUTA_DEFAULT = os.path.join(os.path.dirname(__file__), "ecotech.db")
 
+TAMANO_POOL_DEFAULT = 5
+TIMEOUT_POOL_DEFAULT = 30.0
+INTERVALO_VERIFICACION_DEFAULT = 30.0
+TAMANO_LOTE_DEFAULT = 1000
+TAMANO_BLOQUE_DEFAULT = 500
+LIMITE_PAGINA_DEFAULT = 100
+TAMANO_CACHE_DEFAULT = 256
+CAMBIOS_CONSERVADOS_DEFAULT = 10000
+LIMITE_BUSQUEDA_DEFAULT = 200
 
-def obtener_conexion(ruta_db: str = DB_RUTA_DEFAULT):
-    """Devuelve una conexión a la base de datos SQLite."""
-    return sqlite3.connect(ruta_db)
 
+# Perfiles de rendimiento: PRAGMAs que se aplican a cada conexión al abrirla.
+# cache_size negativo = KiB; mmap_size en bytes; busy_timeout en milisegundos.
+PERFILES_RENDIMIENTO: Dict[str, Dict[str, object]] = {
+    # Valores por defecto de SQLite: máxima durabilidad, lectores bloquean al escritor
+    "seguro": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "temp_store": "DEFAULT",
+        "mmap_size": 0,
+        "cache_size": -2000,
+        "busy_timeout": 5000,
+    },
+    # WAL: lectores concurrentes no bloquean a la GUI; un solo fsync por checkpoint
+    "balanceado": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "temp_store": "MEMORY",
+        "mmap_size": 64 * 1024 * 1024,
+        "cache_size": -16000,
+        "busy_timeout": 5000,
+    },
+    # Importaciones masivas: sin fsync (se puede perder lo último ante un corte de luz)
+    "carga_masiva": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "temp_store": "MEMORY",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64000,
+        "busy_timeout": 30000,
+    },
+}
+_ALIAS_PERFILES = {"safe": "seguro", "balanced": "balanceado", "bulk-load": "carga_masiva"}
+_perfil_actual = os.getenv("DB_PERFIL_SQLITE", "balanceado")
 
-def inicializar_bd(ruta_db: str = DB_RUTA_DEFAULT):
-    """Crea las tablas necesarias si no existen."""
-    with obtener_conexion(ruta_db) as conn:
-        cursor = conn.cursor()
-        # Tabla de departamentos
-        cursor.execute("""
+
+class PoolAgotadoError(sqlite3.OperationalError):
+    """No hay conexiones disponibles en el pool (o el pool ya fue cerrado)."""
+    pass
+
+
+class ErrorBD(Exception):
+    """Error de la base de datos devuelto por la pasarela (`get_db`), sea cual sea el backend."""
+    pass
+
+
+class IntegridadError(ErrorBD):
+    """Se violó una restricción (UNIQUE, NOT NULL, clave foránea) al escribir."""
+    pass
+
+
+def _resolver_perfil(nombre: str) -> str:
+    nombre = _ALIAS_PERFILES.get(nombre, nombre)
+    if nombre not in PERFILES_RENDIMIENTO:
+        raise ValueError(f"Perfil de rendimiento desconocido: {nombre!r}")
+    return nombre
+
+
+def aplicar_perfil(conn: sqlite3.Connection, perfil: str) -> None:
+    """Aplica los PRAGMAs del perfil indicado a una conexión abierta."""
+    pragmas = PERFILES_RENDIMIENTO[_resolver_perfil(perfil)]
+    # busy_timeout primero para que el cambio de journal_mode espere si hay bloqueos
+    conn.execute(f"PRAGMA busy_timeout = {int(pragmas['busy_timeout'])}")
+    try:
+        conn.execute(f"PRAGMA journal_mode = {pragmas['journal_mode']}").fetchone()
+    except sqlite3.OperationalError:
+        # Otra conexión tiene la BD abierta en otro modo; se mantiene el actual
+        pass
+    conn.execute(f"PRAGMA synchronous = {pragmas['synchronous']}")
+    conn.execute(f"PRAGMA temp_store = {pragmas['temp_store']}")
+    conn.execute(f"PRAGMA mmap_size = {int(pragmas['mmap_size'])}")
+    conn.execute(f"PRAGMA cache_size = {int(pragmas['cache_size'])}")
+
+
+def configurar_perfil(perfil: str) -> None:
+    """Selecciona el perfil de rendimiento ('seguro', 'balanceado', 'carga_masiva').
+
+    También acepta los alias 'safe', 'balanced' y 'bulk-load'. Cierra los pools
+    abiertos para que las conexiones nuevas se creen con el perfil elegido.
+    """
+    global _perfil_actual
+    _perfil_actual = _resolver_perfil(perfil)
+    cerrar_conexiones()
+
+
+def perfil_actual() -> str:
+    """Devuelve el nombre del perfil de rendimiento en uso."""
+    return _resolver_perfil(_perfil_actual)
+
+
+def obtener_conexion(ruta_db: str = DB_RUTA_DEFAULT, perfil: Optional[str] = None):
+    """Abre una conexión nueva a la base de datos SQLite con el perfil de rendimiento.
+
+    Las funciones de este módulo no la usan directamente: piden una conexión
+    reutilizable con `conexion(ruta_db)`, que obtiene las suyas de aquí.
+    """
+    conn = sqlite3.connect(ruta_db, check_same_thread=False)
+    try:
+        aplicar_perfil(conn, perfil or _perfil_actual)
+    except Exception:
+        conn.close()
+        raise
+    return conn
+
+
+# ------------------ Pool de conexiones ------------------
+class PoolConexiones:
+    """Pool acotado de conexiones SQLite de larga duración para una misma ruta.
+
+    - Como máximo `tamano` conexiones abiertas; si todas están prestadas, se espera
+      hasta `timeout` segundos y luego se lanza `PoolAgotadoError`.
+    - Un hilo que ya tiene una conexión prestada la reutiliza en llamadas anidadas.
+    - Las conexiones ociosas por más de `intervalo_verificacion` segundos se
+      verifican con `SELECT 1` antes de reutilizarse; si fallan se reemplazan.
+    """
+
+    def __init__(self, ruta_db: str, tamano: int = TAMANO_POOL_DEFAULT,
+                 timeout: float = TIMEOUT_POOL_DEFAULT,
+                 intervalo_verificacion: float = INTERVALO_VERIFICACION_DEFAULT):
+        if tamano < 1:
+            raise ValueError("El tamaño del pool debe ser al menos 1")
+        self.ruta_db = ruta_db
+        self.tamano = tamano
+        self.timeout = timeout
+        self.intervalo_verificacion = intervalo_verificacion
+        self.estadisticas = {"creadas": 0, "reutilizadas": 0, "descartadas": 0, "esperas": 0}
+        self._ociosas: List[Tuple[sqlite3.Connection, float]] = []
+        self._abiertas = 0
+        self._cerrado = False
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+    @staticmethod
+    def _es_saludable(conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _adquirir(self) -> sqlite3.Connection:
+        limite = time.monotonic() + self.timeout
+        conn = None
+        with self._cond:
+            while True:
+                if self._cerrado:
+                    raise PoolAgotadoError(f"El pool de '{self.ruta_db}' está cerrado")
+                if self._ociosas:
+                    conn, ultimo_uso = self._ociosas.pop()
+                    break
+                if self._abiertas < self.tamano:
+                    self._abiertas += 1
+                    break
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    raise PoolAgotadoError(
+                        f"Sin conexiones libres en '{self.ruta_db}' tras {self.timeout}s (tamaño {self.tamano})")
+                self.estadisticas["esperas"] += 1
+                self._cond.wait(restante)
+
+        if conn is not None:
+            if time.monotonic() - ultimo_uso < self.intervalo_verificacion or self._es_saludable(conn):
+                self.estadisticas["reutilizadas"] += 1
+                return conn
+            # Conexión rota: se descarta y su cupo se usa para abrir otra
+            self.estadisticas["descartadas"] += 1
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+        try:
+            conn = obtener_conexion(self.ruta_db)
+        except Exception:
+            with self._cond:
+                self._abiertas -= 1
+                self._cond.notify()
+            raise
+        self.estadisticas["creadas"] += 1
+        return conn
+
+    def _liberar(self, conn: sqlite3.Connection) -> None:
+        with self._cond:
+            if self._cerrado:
+                conn.close()
+                self._abiertas -= 1
+            else:
+                self._ociosas.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def conexion(self):
+        """Presta una conexión durante el bloque `with`.
+
+        Al salir del bloque más externo se hace commit (o rollback si hubo una
+        excepción) y la conexión vuelve al pool en lugar de cerrarse.
+        """
+        prestada = getattr(self._local, "conn", None)
+        if prestada is not None:
+            yield prestada
+            return
+
+        conn = self._adquirir()
+        self._local.conn = conn
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+            raise
+        finally:
+            self._local.conn = None
+            self._liberar(conn)
+
+    def conexion_del_hilo(self) -> Optional[sqlite3.Connection]:
+        """Conexión que este hilo tiene prestada en un bloque `conexion()` abierto, o None."""
+        return getattr(self._local, "conn", None)
+
+    @contextmanager
+    def conexion_dedicada(self):
+        """Presta una conexión que no se comparte con las llamadas anidadas del hilo.
+
+        Pensada para lecturas largas (iteradores) que pueden quedar suspendidas o
+        consumirse desde otro hilo. No hace commit: al salir se descarta cualquier
+        transacción abierta y la conexión vuelve al pool. Si el hilo ya está dentro
+        de un bloque `conexion()`, se usa esa misma conexión para ver sus cambios.
+        """
+        prestada = getattr(self._local, "conn", None)
+        if prestada is not None:
+            yield prestada
+            return
+
+        conn = self._adquirir()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._liberar(conn)
+
+    def cerrar(self) -> None:
+        """Cierra las conexiones ociosas; las prestadas se cierran al devolverse."""
+        with self._cond:
+            self._cerrado = True
+            for conn, _ in self._ociosas:
+                conn.close()
+                self._abiertas -= 1
+            self._ociosas.clear()
+            self._cond.notify_all()
+
+    def estado(self) -> Dict[str, int]:
+        """Tamaño y conexiones abiertas y ociosas en este momento, más `estadisticas`."""
+        with self._cond:
+            return {**self.estadisticas, "tamano": self.tamano, "abiertas": self._abiertas,
+                    "ociosas": len(self._ociosas)}
+
+
+_pools: Dict[str, PoolConexiones] = {}
+_pools_lock = threading.Lock()
+_config_pool = {
+    "tamano": TAMANO_POOL_DEFAULT,
+    "timeout": TIMEOUT_POOL_DEFAULT,
+    "intervalo_verificacion": INTERVALO_VERIFICACION_DEFAULT,
+}
+
+
+def _clave_ruta(ruta_db: str) -> str:
+    return ruta_db if ruta_db == ":memory:" else os.path.abspath(ruta_db)
+
+
+def configurar_pool(tamano: Optional[int] = None, timeout: Optional[float] = None,
+                    intervalo_verificacion: Optional[float] = None) -> None:
+    """Cambia la configuración de los pools y cierra los existentes para aplicarla."""
+    if tamano is not None:
+        if tamano < 1:
+            raise ValueError("El tamaño del pool debe ser al menos 1")
+        _config_pool["tamano"] = tamano
+    if timeout is not None:
+        _config_pool["timeout"] = timeout
+    if intervalo_verificacion is not None:
+        _config_pool["intervalo_verificacion"] = intervalo_verificacion
+    cerrar_conexiones()
+
+
+def obtener_pool(ruta_db: str = DB_RUTA_DEFAULT) -> PoolConexiones:
+    """Devuelve (creándolo si hace falta) el pool asociado a `ruta_db`."""
+    clave = _clave_ruta(ruta_db)
+    with _pools_lock:
+        pool = _pools.get(clave)
+        if pool is None:
+            pool = PoolConexiones(ruta_db, **_config_pool)
+            _pools[clave] = pool
+        return pool
+
+
+def conexion(ruta_db: str = DB_RUTA_DEFAULT):
+    """Context manager que presta una conexión del pool de `ruta_db`."""
+    return obtener_pool(ruta_db).conexion()
+
+
+def cerrar_conexiones(ruta_db: Optional[str] = None) -> None:
+    """Cierra el pool de `ruta_db` (o todos si es None). Se llama al salir del proceso."""
+    with _pools_lock:
+        if ruta_db is None:
+            pools = list(_pools.values())
+            _pools.clear()
+        else:
+            pool = _pools.pop(_clave_ruta(ruta_db), None)
+            pools = [pool] if pool else []
+    for pool in pools:
+        pool.cerrar()
+    invalidar_cache(ruta_db=ruta_db)
+
+
+atexit.register(cerrar_conexiones)
+
+
+# ------------------ Migraciones de esquema ------------------
+# Cada migración es (versión, descripción, pasos). Un paso es una sentencia SQL o
+# una función que recibe la conexión. La última versión aplicada se guarda en
+# PRAGMA user_version. Agregar siempre al final, con versión consecutiva, y nunca
+# modificar una migración ya publicada.
+MIGRACIONES: List[Tuple[int, str, List]] = [
+    (1, "Tablas base", [
+        """
         CREATE TABLE IF NOT EXISTS departamentos (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             nombre TEXT NOT NULL UNIQUE,
             id_gerente INTEGER
         )
-        """)
-
-        # Tabla de proyectos
-        cursor.execute("""
+        """,
+        """
         CREATE TABLE IF NOT EXISTS proyectos (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             nombre TEXT NOT NULL,
             descripcion TEXT
         )
-        """)
-
-        # Tabla de empleados
-        cursor.execute("""
+        """,
+        """
         CREATE TABLE IF NOT EXISTS empleados (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             nombre TEXT NOT NULL,
@@ -54,10 +396,9 @@ def inicializar_bd(ruta_db: str = DB_RUTA_DEFAULT):
             departamento_id INTEGER,
             FOREIGN KEY(departamento_id) REFERENCES departamentos(id)
         )
-        """)
-
+        """,
         # Relación muchos-a-muchos empleados <-> proyectos
-        cursor.execute("""
+        """
         CREATE TABLE IF NOT EXISTS proyectos_empleados (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             empleado_id INTEGER NOT NULL,
@@ -66,10 +407,8 @@ def inicializar_bd(ruta_db: str = DB_RUTA_DEFAULT):
             FOREIGN KEY(empleado_id) REFERENCES empleados(id),
             FOREIGN KEY(proyecto_id) REFERENCES proyectos(id)
         )
-        """)
-
-        # Registros de tiempo
-        cursor.execute("""
+        """,
+        """
         CREATE TABLE IF NOT EXISTS registros_tiempo (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             empleado_id INTEGER NOT NULL,
@@ -79,64 +418,642 @@ def inicializar_bd(ruta_db: str = DB_RUTA_DEFAULT):
             FOREIGN KEY(empleado_id) REFERENCES empleados(id),
             FOREIGN KEY(proyecto_id) REFERENCES proyectos(id)
         )
-        """)
+        """,
+    ]),
+    # Los índices de registros_tiempo incluyen `horas` para que las sumas por
+    # empleado/proyecto y rango de fechas se resuelvan solo con el índice.
+    (2, "Índices secundarios", [
+        "CREATE INDEX IF NOT EXISTS idx_registros_empleado_fecha"
+        " ON registros_tiempo (empleado_id, fecha, horas)",
+        "CREATE INDEX IF NOT EXISTS idx_registros_proyecto_fecha"
+        " ON registros_tiempo (proyecto_id, fecha, horas)",
+        "CREATE INDEX IF NOT EXISTS idx_proyectos_empleados_proyecto"
+        " ON proyectos_empleados (proyecto_id)",
+        "CREATE INDEX IF NOT EXISTS idx_empleados_departamento"
+        " ON empleados (departamento_id)",
+    ]),
+    # Reportes por rango de fechas sin filtrar por empleado ni proyecto
+    (3, "Índice de registros por fecha", [
+        "CREATE INDEX IF NOT EXISTS idx_registros_fecha"
+        " ON registros_tiempo (fecha, empleado_id, proyecto_id, horas)",
+    ]),
+    # Resumen diario (empleado, proyecto, fecha) mantenido por triggers; los
+    # reportes lo leen en lugar de recorrer registros_tiempo fila por fila.
+    (4, "Resumen diario de horas", [
+        """
+        CREATE TABLE IF NOT EXISTS resumen_horas_diarias (
+            empleado_id INTEGER NOT NULL,
+            proyecto_id INTEGER NOT NULL,
+            fecha TEXT NOT NULL,
+            total_horas REAL NOT NULL,
+            cantidad INTEGER NOT NULL,
+            PRIMARY KEY (empleado_id, proyecto_id, fecha)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_resumen_proyecto_fecha"
+        " ON resumen_horas_diarias (proyecto_id, fecha, total_horas, cantidad)",
+        "CREATE INDEX IF NOT EXISTS idx_resumen_fecha"
+        " ON resumen_horas_diarias (fecha, total_horas, cantidad)",
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_resumen_insert AFTER INSERT ON registros_tiempo
+        BEGIN
+            INSERT INTO resumen_horas_diarias (empleado_id, proyecto_id, fecha, total_horas, cantidad)
+            VALUES (NEW.empleado_id, NEW.proyecto_id, NEW.fecha, NEW.horas, 1)
+            ON CONFLICT (empleado_id, proyecto_id, fecha) DO UPDATE
+            SET total_horas = total_horas + excluded.total_horas, cantidad = cantidad + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_resumen_delete AFTER DELETE ON registros_tiempo
+        BEGIN
+            UPDATE resumen_horas_diarias SET total_horas = total_horas - OLD.horas, cantidad = cantidad - 1
+            WHERE empleado_id = OLD.empleado_id AND proyecto_id = OLD.proyecto_id AND fecha = OLD.fecha;
+            DELETE FROM resumen_horas_diarias
+            WHERE empleado_id = OLD.empleado_id AND proyecto_id = OLD.proyecto_id AND fecha = OLD.fecha
+              AND cantidad <= 0;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_resumen_update
+        AFTER UPDATE OF empleado_id, proyecto_id, fecha, horas ON registros_tiempo
+        BEGIN
+            UPDATE resumen_horas_diarias SET total_horas = total_horas - OLD.horas, cantidad = cantidad - 1
+            WHERE empleado_id = OLD.empleado_id AND proyecto_id = OLD.proyecto_id AND fecha = OLD.fecha;
+            DELETE FROM resumen_horas_diarias
+            WHERE empleado_id = OLD.empleado_id AND proyecto_id = OLD.proyecto_id AND fecha = OLD.fecha
+              AND cantidad <= 0;
+            INSERT INTO resumen_horas_diarias (empleado_id, proyecto_id, fecha, total_horas, cantidad)
+            VALUES (NEW.empleado_id, NEW.proyecto_id, NEW.fecha, NEW.horas, 1)
+            ON CONFLICT (empleado_id, proyecto_id, fecha) DO UPDATE
+            SET total_horas = total_horas + excluded.total_horas, cantidad = cantidad + 1;
+        END
+        """,
+        lambda conn: _reconstruir_resumen(conn),
+    ]),
+    # Registro de cambios: cada INSERT/UPDATE/DELETE en las tablas listables deja
+    # (seq, tabla, fila_id, operacion). AUTOINCREMENT garantiza que seq nunca se
+    # reutiliza, aunque se purguen filas viejas.
+    (5, "Registro de cambios", [
+        """
+        CREATE TABLE IF NOT EXISTS cambios (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            tabla TEXT NOT NULL,
+            fila_id INTEGER NOT NULL,
+            operacion TEXT NOT NULL CHECK (operacion IN ('I', 'U', 'D'))
+        )
+        """,
+    ] + [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_cambios_{tabla}_{sufijo} AFTER {evento} ON {tabla}
+        BEGIN
+            INSERT INTO cambios (tabla, fila_id, operacion) VALUES ('{tabla}', {fila}.id, '{operacion}');
+        END
+        """
+        for tabla in ("departamentos", "proyectos", "empleados", "registros_tiempo")
+        for sufijo, evento, fila, operacion in (("insert", "INSERT", "NEW", "I"),
+                                                ("update", "UPDATE", "NEW", "U"),
+                                                ("delete", "DELETE", "OLD", "D"))
+    ]),
+    # Índices FTS5 (contenido externo) sincronizados por triggers; si SQLite no
+    # tiene FTS5 no se crean y `buscar` usa LIKE.
+    (6, "Búsqueda de texto completo", [
+        lambda conn: _crear_indices_busqueda(conn),
+    ]),
+    # Usuarios del sistema (modelos.GestorUsuarios), igual que en database.sql
+    (7, "Usuarios", [
+        """
+        CREATE TABLE IF NOT EXISTS usuarios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre_usuario TEXT NOT NULL UNIQUE,
+            password TEXT NOT NULL,
+            correo TEXT NOT NULL UNIQUE,
+            rol TEXT NOT NULL DEFAULT 'usuario',
+            fecha_creacion TEXT DEFAULT CURRENT_TIMESTAMP,
+            fecha_modificacion TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_usuarios_modificacion AFTER UPDATE ON usuarios
+        WHEN NEW.fecha_modificacion IS OLD.fecha_modificacion
+        BEGIN
+            UPDATE usuarios SET fecha_modificacion = CURRENT_TIMESTAMP WHERE id = NEW.id;
+        END
+        """,
+    ]),
+    # Listado de usuarios filtrado por rol y paginado por id (GestorUsuarios.listar)
+    (8, "Índice de usuarios por rol", [
+        "CREATE INDEX IF NOT EXISTS idx_usuarios_rol ON usuarios (rol, id)",
+    ]),
+    # Orden de las tablas de la GUI (consultar_ventana): cada índice termina
+    # implícitamente en el id, así que resuelve ORDER BY columna, id sin ordenar
+    (9, "Índices para ordenar listados", [
+        "CREATE INDEX IF NOT EXISTS idx_departamentos_gerente ON departamentos (id_gerente)",
+        "CREATE INDEX IF NOT EXISTS idx_proyectos_nombre ON proyectos (nombre)",
+        "CREATE INDEX IF NOT EXISTS idx_empleados_nombre ON empleados (nombre)",
+        "CREATE INDEX IF NOT EXISTS idx_empleados_salario ON empleados (salario)",
+        "CREATE INDEX IF NOT EXISTS idx_registros_orden_fecha ON registros_tiempo (fecha)",
+    ]),
+]
+
+
+# Columnas indexadas para búsqueda y su peso en el ranking (bm25)
+_COLUMNAS_BUSQUEDA = {
+    "empleados": (("nombre", 10.0), ("email", 5.0), ("telefono", 2.0), ("direccion", 1.0)),
+    "proyectos": (("nombre", 10.0), ("descripcion", 1.0)),
+}
+# Tablas chicas que se buscan siempre con LIKE, sin índice FTS5
+_COLUMNAS_BUSQUEDA_LIKE = {
+    "departamentos": ("nombre",),
+}
+
+
+def _crear_indices_busqueda(conn: sqlite3.Connection) -> None:
+    for tabla, pesos in _COLUMNAS_BUSQUEDA.items():
+        columnas = ", ".join(c for c, _ in pesos)
+        nuevas = ", ".join(f"NEW.{c}" for c, _ in pesos)
+        viejas = ", ".join(f"OLD.{c}" for c, _ in pesos)
+        try:
+            conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {tabla}_fts USING fts5("
+                         f"{columnas}, content='{tabla}', content_rowid='id',"
+                         " tokenize='unicode61 remove_diacritics 2', prefix='2 3')")
+        except sqlite3.OperationalError as e:
+            if "fts5" in str(e):
+                return  # SQLite compilado sin FTS5
+            raise
+        for sql in (
+            f"""CREATE TRIGGER IF NOT EXISTS trg_{tabla}_fts_insert AFTER INSERT ON {tabla} BEGIN
+                INSERT INTO {tabla}_fts (rowid, {columnas}) VALUES (NEW.id, {nuevas});
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS trg_{tabla}_fts_delete AFTER DELETE ON {tabla} BEGIN
+                INSERT INTO {tabla}_fts ({tabla}_fts, rowid, {columnas}) VALUES ('delete', OLD.id, {viejas});
+            END""",
+            f"""CREATE TRIGGER IF NOT EXISTS trg_{tabla}_fts_update AFTER UPDATE OF {columnas} ON {tabla} BEGIN
+                INSERT INTO {tabla}_fts ({tabla}_fts, rowid, {columnas}) VALUES ('delete', OLD.id, {viejas});
+                INSERT INTO {tabla}_fts (rowid, {columnas}) VALUES (NEW.id, {nuevas});
+            END""",
+            f"INSERT INTO {tabla}_fts ({tabla}_fts) VALUES ('rebuild')",
+        ):
+            conn.execute(sql)
+
 
+def version_esquema(ruta_db: str = DB_RUTA_DEFAULT) -> int:
+    """Devuelve la versión de esquema guardada en PRAGMA user_version."""
+    with conexion(ruta_db) as conn:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def inicializar_bd(ruta_db: str = DB_RUTA_DEFAULT) -> int:
+    """Crea o actualiza el esquema aplicando las migraciones pendientes.
+
+    Si el esquema ya está al día solo se lee PRAGMA user_version. Las migraciones
+    pendientes se aplican todas en una única transacción: si una falla, la base
+    queda en la versión anterior. Devuelve la versión final del esquema.
+    """
+    ultima = MIGRACIONES[-1][0]
+    with conexion(ruta_db) as conn:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= ultima:
+            return version
+
+        # BEGIN IMMEDIATE toma el bloqueo de escritura; se relee la versión por si
+        # otro proceso migró mientras tanto.
+        conn.execute("BEGIN IMMEDIATE")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for numero, _descripcion, pasos in MIGRACIONES:
+            if numero <= version:
+                continue
+            for paso in pasos:
+                if callable(paso):
+                    paso(conn)
+                else:
+                    conn.execute(paso)
+            version = numero
+        conn.execute(f"PRAGMA user_version = {int(version)}")
         conn.commit()
+        return version
 
 
 # ------------------ Seguridad de contraseñas ------------------
 def hash_contrasena(contrasena: str) -> str:
-    """Devuelve el hash SHA-256 hexadecimal de la contraseña.
+    """Devuelve el hash versionado de la contraseña (ver `contrasenas`).
 
     Usar este método antes de almacenar la contraseña en la BD.
     """
-    if contrasena is None:
-        raise ValueError("La contraseña no puede ser None")
-    h = hashlib.sha256()
-    h.update(contrasena.encode("utf-8"))
-    return h.hexdigest()
+    return contrasenas.hashear(contrasena)
 
 
 def verificar_contrasena(contrasena_plana: str, hash_almacenado: str) -> bool:
-    """Verifica si la contraseña en texto plano coincide con el hash almacenado."""
-    return hash_contrasena(contrasena_plana) == hash_almacenado
+    """Verifica si la contraseña en texto plano coincide con el hash almacenado.
+
+    Acepta hashes nuevos y los SHA-256 antiguos sin sal.
+    """
+    return contrasenas.verificar(contrasena_plana, hash_almacenado)
+
+
+def verificar_y_actualizar_contrasena(empleado_id: int, contrasena_plana: str, hash_almacenado: str,
+                                      ruta_db: str = DB_RUTA_DEFAULT) -> bool:
+    """Verifica la contraseña y, si es correcta y su hash quedó obsoleto, lo rehace.
+
+    Pensado para el login: es el único momento en que se tiene la contraseña en
+    claro para migrar un SHA-256 antiguo (o un costo menor al actual) sin pedir
+    nada al usuario. El UPDATE solo aplica si el hash no cambió entretanto.
+    """
+    if not contrasenas.verificar(contrasena_plana, hash_almacenado):
+        return False
+    if contrasenas.necesita_rehash(hash_almacenado):
+        nuevo = contrasenas.hashear(contrasena_plana)
+        with conexion(ruta_db) as conn:
+            conn.execute("UPDATE empleados SET password_hash = ? WHERE id = ? AND password_hash = ?",
+                         (nuevo, empleado_id, hash_almacenado))
+            conn.commit()
+    return True
+
+
+# ------------------ Caché de datos de referencia ------------------
+# Tablas cuyas consultas se guardan en caché (cambian poco y se leen en cada pestaña).
+_TABLAS_CACHEADAS = ("departamentos", "proyectos")
+
+
+class CacheReferencia:
+    """Caché LRU en memoria para consultas de tablas que cambian poco.
+
+    Las entradas se agrupan por (ruta de BD, tabla). Las escrituras de este módulo
+    invalidan el grupo de la tabla y suben su generación, así una lectura que
+    empezó antes de la escritura no guarda un resultado viejo. Los cambios hechos
+    por fuera de este módulo requieren llamar a `invalidar_cache`.
+    """
+
+    def __init__(self, tamano_maximo: int = TAMANO_CACHE_DEFAULT):
+        self.tamano_maximo = tamano_maximo
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._generaciones: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def obtener(self, ruta_db: str, tabla: str, clave: tuple, cargar: Callable[[], Any]) -> Any:
+        """Devuelve el valor guardado o lo calcula con `cargar()` y lo guarda."""
+        grupo = (_clave_ruta(ruta_db), tabla)
+        llave = grupo + (clave,)
+        with self._lock:
+            if llave in self._entradas:
+                self._entradas.move_to_end(llave)
+                self.aciertos += 1
+                return self._entradas[llave]
+            self.fallos += 1
+            generacion = self._generaciones.setdefault(grupo, 0)
+
+        valor = cargar()
+        with self._lock:
+            if self._generaciones[grupo] == generacion:
+                self._entradas[llave] = valor
+                while len(self._entradas) > self.tamano_maximo:
+                    self._entradas.popitem(last=False)
+        return valor
+
+    def invalidar(self, ruta_db: str, tabla: Optional[str] = None) -> None:
+        """Descarta las entradas de `tabla` (o de todas las tablas) para `ruta_db`."""
+        ruta = _clave_ruta(ruta_db)
+        tablas = (tabla,) if tabla else _TABLAS_CACHEADAS
+        with self._lock:
+            for t in tablas:
+                grupo = (ruta, t)
+                self._generaciones[grupo] = self._generaciones.get(grupo, 0) + 1
+            for llave in [k for k in self._entradas if k[0] == ruta and k[1] in tablas]:
+                del self._entradas[llave]
+
+    def limpiar(self) -> None:
+        with self._lock:
+            for grupo in self._generaciones:
+                self._generaciones[grupo] += 1
+            self._entradas.clear()
+
+    def estadisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return {"aciertos": self.aciertos, "fallos": self.fallos, "entradas": len(self._entradas)}
+
+
+_cache = CacheReferencia()
+
+
+def configurar_cache(tamano_maximo: int) -> None:
+    """Cambia el número máximo de entradas de la caché (y la vacía)."""
+    if tamano_maximo < 1:
+        raise ValueError("El tamaño de la caché debe ser al menos 1")
+    _cache.tamano_maximo = tamano_maximo
+    _cache.limpiar()
+
+
+def invalidar_cache(tabla: Optional[str] = None, ruta_db: Optional[str] = None) -> None:
+    """Invalida la caché de `tabla` en `ruta_db`; sin ruta, vacía toda la caché."""
+    if ruta_db is None:
+        _cache.limpiar()
+    else:
+        _cache.invalidar(ruta_db, tabla)
+
+
+def estadisticas_cache() -> Dict[str, int]:
+    """Devuelve los contadores de la caché: aciertos, fallos y entradas."""
+    return _cache.estadisticas()
+
+
+# ------------------ Listados en streaming y paginados ------------------
+# Columnas que devuelve cada listado, en el mismo orden que las funciones listar_*.
+_COLUMNAS_LISTADO = {
+    "departamentos": "id, nombre, id_gerente",
+    "proyectos": "id, nombre, descripcion",
+    "empleados": "id, nombre, direccion, telefono, email, salario, departamento_id",
+    "registros_tiempo": "id, empleado_id, proyecto_id, fecha, horas",
+}
+# Columnas por las que consultar_ventana puede ordenar: las que tienen un índice
+# (o UNIQUE) que las recorre en orden de (columna, id)
+_COLUMNAS_ORDENABLES = {
+    "departamentos": ("id", "nombre", "id_gerente"),
+    "proyectos": ("id", "nombre"),
+    "empleados": ("id", "nombre", "email", "salario", "departamento_id"),
+    "registros_tiempo": ("id", "fecha"),
+}
+
+
+def _iterar_tabla(tabla: str, despues_de_id: int, tamano_bloque: int, ruta_db: str) -> Iterator[Tuple]:
+    """Recorre la tabla en orden de id leyendo `tamano_bloque` filas a la vez.
+
+    Usa una conexión dedicada del pool mientras dura el recorrido; se devuelve
+    al agotar el iterador o al cerrarlo (p. ej. al salir de un `for` con break).
+    """
+    sql = f"SELECT {_COLUMNAS_LISTADO[tabla]} FROM {tabla} WHERE id > ? ORDER BY id"
+    with obtener_pool(ruta_db).conexion_dedicada() as conn:
+        cursor = conn.execute(sql, (despues_de_id,))
+        try:
+            while True:
+                filas = cursor.fetchmany(tamano_bloque)
+                if not filas:
+                    break
+                yield from filas
+        finally:
+            cursor.close()
+
+
+def _paginar_tabla(tabla: str, despues_de_id: int, limite: int, ruta_db: str) -> List[Tuple]:
+    """Devuelve hasta `limite` filas con id mayor que `despues_de_id` (paginación por clave).
+
+    Para pedir la página siguiente se pasa el id de la última fila recibida.
+    """
+    sql = f"SELECT {_COLUMNAS_LISTADO[tabla]} FROM {tabla} WHERE id > ? ORDER BY id LIMIT ?"
+    with conexion(ruta_db) as conn:
+        return conn.execute(sql, (despues_de_id, limite)).fetchall()
+
+
+def iterar_departamentos(despues_de_id: int = 0, tamano_bloque: int = TAMANO_BLOQUE_DEFAULT,
+                         ruta_db: str = DB_RUTA_DEFAULT) -> Iterator[Tuple]:
+    return _iterar_tabla("departamentos", despues_de_id, tamano_bloque, ruta_db)
+
+
+def iterar_proyectos(despues_de_id: int = 0, tamano_bloque: int = TAMANO_BLOQUE_DEFAULT,
+                     ruta_db: str = DB_RUTA_DEFAULT) -> Iterator[Tuple]:
+    return _iterar_tabla("proyectos", despues_de_id, tamano_bloque, ruta_db)
+
+
+def iterar_empleados(despues_de_id: int = 0, tamano_bloque: int = TAMANO_BLOQUE_DEFAULT,
+                     ruta_db: str = DB_RUTA_DEFAULT) -> Iterator[Tuple]:
+    return _iterar_tabla("empleados", despues_de_id, tamano_bloque, ruta_db)
+
+
+def iterar_registros(despues_de_id: int = 0, tamano_bloque: int = TAMANO_BLOQUE_DEFAULT,
+                     ruta_db: str = DB_RUTA_DEFAULT) -> Iterator[Tuple]:
+    return _iterar_tabla("registros_tiempo", despues_de_id, tamano_bloque, ruta_db)
+
+
+def paginar_departamentos(despues_de_id: int = 0, limite: int = LIMITE_PAGINA_DEFAULT,
+                          ruta_db: str = DB_RUTA_DEFAULT) -> List[Tuple]:
+    return _paginar_tabla("departamentos", despues_de_id, limite, ruta_db)
+
+
+def paginar_proyectos(despues_de_id: int = 0, limite: int = LIMITE_PAGINA_DEFAULT,
+                      ruta_db: str = DB_RUTA_DEFAULT) -> List[Tuple]:
+    return _paginar_tabla("proyectos", despues_de_id, limite, ruta_db)
+
+
+def paginar_empleados(despues_de_id: int = 0, limite: int = LIMITE_PAGINA_DEFAULT,
+                      ruta_db: str = DB_RUTA_DEFAULT) -> List[Tuple]:
+    return _paginar_tabla("empleados", despues_de_id, limite, ruta_db)
+
+
+def paginar_registros(despues_de_id: int = 0, limite: int = LIMITE_PAGINA_DEFAULT,
+                      ruta_db: str = DB_RUTA_DEFAULT) -> List[Tuple]:
+    return _paginar_tabla("registros_tiempo", despues_de_id, limite, ruta_db)
+
+
+def filtros_registros(fecha_desde: Optional[str], fecha_hasta: Optional[str],
+                       empleado_id: Optional[int], proyecto_id: Optional[int]) -> Tuple[str, list]:
+    """Arma la cláusula WHERE (sobre el alias `r` de registros_tiempo) y sus parámetros."""
+    condiciones = []
+    params: list = []
+    if fecha_desde:
+        condiciones.append("r.fecha >= ?")
+        params.append(fecha_desde)
+    if fecha_hasta:
+        condiciones.append("r.fecha <= ?")
+        params.append(fecha_hasta)
+    if empleado_id is not None:
+        condiciones.append("r.empleado_id = ?")
+        params.append(empleado_id)
+    if proyecto_id is not None:
+        condiciones.append("r.proyecto_id = ?")
+        params.append(proyecto_id)
+    return (f"WHERE {' AND '.join(condiciones)}" if condiciones else ""), params
+
+
+def iterar_registros_detallados(fecha_desde: Optional[str] = None, fecha_hasta: Optional[str] = None,
+                                empleado_id: Optional[int] = None, proyecto_id: Optional[int] = None,
+                                tamano_bloque: int = TAMANO_BLOQUE_DEFAULT,
+                                ruta_db: str = DB_RUTA_DEFAULT) -> Iterator[Tuple]:
+    """Recorre registros filtrados con los nombres ya unidos, en orden de id.
+
+    Filas: (id, empleado_id, nombre_empleado, proyecto_id, nombre_proyecto, fecha, horas).
+    """
+    where, params = filtros_registros(fecha_desde, fecha_hasta, empleado_id, proyecto_id)
+    sql = ("SELECT r.id, r.empleado_id, e.nombre, r.proyecto_id, p.nombre, r.fecha, r.horas"
+           " FROM registros_tiempo r"
+           " LEFT JOIN empleados e ON e.id = r.empleado_id"
+           " LEFT JOIN proyectos p ON p.id = r.proyecto_id"
+           f" {where} ORDER BY r.id")
+    with obtener_pool(ruta_db).conexion_dedicada() as conn:
+        cursor = conn.execute(sql, params)
+        try:
+            while True:
+                filas = cursor.fetchmany(tamano_bloque)
+                if not filas:
+                    break
+                yield from filas
+        finally:
+            cursor.close()
+
+
+def contar_registros(fecha_desde: Optional[str] = None, fecha_hasta: Optional[str] = None,
+                     empleado_id: Optional[int] = None, proyecto_id: Optional[int] = None,
+                     ruta_db: str = DB_RUTA_DEFAULT) -> int:
+    """Cuenta los registros que cumplen los filtros (resuelto con índices)."""
+    where, params = filtros_registros(fecha_desde, fecha_hasta, empleado_id, proyecto_id)
+    with conexion(ruta_db) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM registros_tiempo r {where}", params).fetchone()[0]
+
+
+def contar_filas(tabla: str, ruta_db: str = DB_RUTA_DEFAULT) -> int:
+    """Cuenta las filas de una de las tablas listables."""
+    if tabla not in _COLUMNAS_LISTADO:
+        raise ValueError(f"Tabla no listable: {tabla!r}")
+    with conexion(ruta_db) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+
+
+def columnas_ordenables(tabla: str) -> Tuple[str, ...]:
+    """Columnas de `tabla` por las que `consultar_ventana` puede ordenar."""
+    if tabla not in _COLUMNAS_ORDENABLES:
+        raise ValueError(f"Tabla no listable: {tabla!r}")
+    return _COLUMNAS_ORDENABLES[tabla]
+
+
+def _tramos_despues_de(columna: str, descendente: bool, valor: Any, fila_id: int) -> List[Tuple[str, list]]:
+    """Condiciones WHERE, en orden, para las filas que siguen a (valor, fila_id) en ORDER BY columna, id.
+
+    Los NULL van primero en orden ascendente y al final en descendente; cada
+    tramo por separado busca directo en el índice (un OR lo recorrería entero).
+    """
+    if columna == "id":
+        return [("id < ?" if descendente else "id > ?", [fila_id])]
+    if valor is None:
+        if descendente:
+            return [(f"{columna} IS NULL AND id < ?", [fila_id])]
+        return [(f"{columna} IS NULL AND id > ?", [fila_id]), (f"{columna} IS NOT NULL", [])]
+    if descendente:
+        return [(f"({columna}, id) < (?, ?)", [valor, fila_id]), (f"{columna} IS NULL", [])]
+    return [(f"({columna}, id) > (?, ?)", [valor, fila_id])]
+
+
+def consultar_ventana(tabla: str, desplazamiento: int, limite: int, ordenar_por: str = "id",
+                      descendente: bool = False, despues_de: Optional[Tuple[Any, int]] = None,
+                      ruta_db: str = DB_RUTA_DEFAULT) -> List[Tuple]:
+    """Devuelve `limite` filas a partir de la posición `desplazamiento` según el orden pedido.
+
+    Pensada para tablas de la GUI, que piden páginas consecutivas al desplazarse
+    pero también saltan a cualquier posición con la barra de scroll. Con
+    `despues_de` = (valor de `ordenar_por`, id) de la última fila de la página
+    anterior se pagina por clave y se ignora `desplazamiento`; sin él se usa
+    OFFSET. Solo se ordena por `columnas_ordenables(tabla)`, que tienen índice,
+    y el id desempata filas con el mismo valor de orden.
+    """
+    if ordenar_por not in columnas_ordenables(tabla):
+        raise ValueError(f"Columna de orden inválida para {tabla}: {ordenar_por!r}")
+    columnas = _COLUMNAS_LISTADO[tabla]
+    sentido = "DESC" if descendente else "ASC"
+    orden = f"{ordenar_por} {sentido}" if ordenar_por == "id" else f"{ordenar_por} {sentido}, id {sentido}"
+    with conexion(ruta_db) as conn:
+        if despues_de is None:
+            return conn.execute(f"SELECT {columnas} FROM {tabla} ORDER BY {orden} LIMIT ? OFFSET ?",
+                                (limite, desplazamiento)).fetchall()
+        filas: List[Tuple] = []
+        for where, params in _tramos_despues_de(ordenar_por, descendente, *despues_de):
+            filas += conn.execute(f"SELECT {columnas} FROM {tabla} WHERE {where} ORDER BY {orden} LIMIT ?",
+                                  params + [limite - len(filas)]).fetchall()
+            if len(filas) >= limite:
+                break
+        return filas
 
 
 # ------------------ Operaciones CRUD básicas ------------------
+# Fila completa de un empleado (incluye el hash de la contraseña)
+_COLUMNAS_EMPLEADO = "id, nombre, direccion, telefono, email, salario, password_hash, departamento_id"
+# Máximo de ids por consulta IN (...), por debajo del límite de parámetros de SQLite
+_IDS_POR_CONSULTA = 500
+
+
+def _obtener_por_ids(tabla: str, columnas: str, ids: Iterable[int], ruta_db: str) -> Dict[int, Tuple]:
+    """Devuelve {id: fila} para los ids que existan, con una consulta por clave primaria por cada bloque."""
+    ids = list(dict.fromkeys(ids))
+    filas: Dict[int, Tuple] = {}
+    with conexion(ruta_db) as conn:
+        for i in range(0, len(ids), _IDS_POR_CONSULTA):
+            bloque = ids[i:i + _IDS_POR_CONSULTA]
+            marcas = ", ".join("?" * len(bloque))
+            for fila in conn.execute(f"SELECT {columnas} FROM {tabla} WHERE id IN ({marcas})", bloque):
+                filas[fila[0]] = fila
+    return filas
+
+
+def obtener_empleados_por_ids(ids: Iterable[int], ruta_db: str = DB_RUTA_DEFAULT) -> Dict[int, Tuple]:
+    """Devuelve {id: fila completa} de los empleados pedidos que existan."""
+    return _obtener_por_ids("empleados", _COLUMNAS_EMPLEADO, ids, ruta_db)
+
+
+def obtener_departamentos_por_ids(ids: Iterable[int], ruta_db: str = DB_RUTA_DEFAULT) -> Dict[int, Tuple]:
+    """Devuelve {id: (id, nombre, id_gerente)} de los departamentos pedidos que existan."""
+    return _obtener_por_ids("departamentos", _COLUMNAS_LISTADO["departamentos"], ids, ruta_db)
+
+
+def obtener_proyectos_por_ids(ids: Iterable[int], ruta_db: str = DB_RUTA_DEFAULT) -> Dict[int, Tuple]:
+    """Devuelve {id: (id, nombre, descripcion)} de los proyectos pedidos que existan."""
+    return _obtener_por_ids("proyectos", _COLUMNAS_LISTADO["proyectos"], ids, ruta_db)
+
+
 def agregar_departamento(nombre: str, ruta_db: str = DB_RUTA_DEFAULT) -> int:
-    with obtener_conexion(ruta_db) as conn:
+    with conexion(ruta_db) as conn:
         cursor = conn.cursor()
         cursor.execute("INSERT INTO departamentos (nombre) VALUES (?)", (nombre,))
         conn.commit()
+        _cache.invalidar(ruta_db, "departamentos")
         return cursor.lastrowid
 
 
-def listar_departamentos(ruta_db: str = DB_RUTA_DEFAULT) -> List[Tuple]:
-    with obtener_conexion(ruta_db) as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, nombre, id_gerente FROM departamentos")
-        return cursor.fetchall()
+def listar_departamentos(ruta_db: str = DB_RUTA_DEFAULT, usar_cache: bool = True) -> List[Tuple]:
+    if not usar_cache:
+        return list(iterar_departamentos(ruta_db=ruta_db))
+    return list(_cache.obtener(ruta_db, "departamentos", ("listar",), lambda: list(iterar_departamentos(ruta_db=ruta_db))))
+
+
+def obtener_departamento(departamento_id: int, ruta_db: str = DB_RUTA_DEFAULT,
+                         usar_cache: bool = True) -> Optional[Tuple]:
+    """Devuelve (id, nombre, id_gerente) del departamento o None si no existe."""
+    def cargar():
+        with conexion(ruta_db) as conn:
+            return conn.execute("SELECT id, nombre, id_gerente FROM departamentos WHERE id = ?",
+                                (departamento_id,)).fetchone()
+    if not usar_cache:
+        return cargar()
+    return _cache.obtener(ruta_db, "departamentos", ("id", departamento_id), cargar)
 
 
 def agregar_proyecto(nombre: str, descripcion: str = "", ruta_db: str = DB_RUTA_DEFAULT) -> int:
-    with obtener_conexion(ruta_db) as conn:
+    with conexion(ruta_db) as conn:
         cursor = conn.cursor()
         cursor.execute("INSERT INTO proyectos (nombre, descripcion) VALUES (?, ?)", (nombre, descripcion))
         conn.commit()
+        _cache.invalidar(ruta_db, "proyectos")
         return cursor.lastrowid
 
 
-def listar_proyectos(ruta_db: str = DB_RUTA_DEFAULT) -> List[Tuple]:
-    with obtener_conexion(ruta_db) as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, nombre, descripcion FROM proyectos")
-        return cursor.fetchall()
+def listar_proyectos(ruta_db: str = DB_RUTA_DEFAULT, usar_cache: bool = True) -> List[Tuple]:
+    if not usar_cache:
+        return list(iterar_proyectos(ruta_db=ruta_db))
+    return list(_cache.obtener(ruta_db, "proyectos", ("listar",), lambda: list(iterar_proyectos(ruta_db=ruta_db))))
+
+
+def obtener_proyecto(proyecto_id: int, ruta_db: str = DB_RUTA_DEFAULT,
+                     usar_cache: bool = True) -> Optional[Tuple]:
+    """Devuelve (id, nombre, descripcion) del proyecto o None si no existe."""
+    def cargar():
+        with conexion(ruta_db) as conn:
+            return conn.execute("SELECT id, nombre, descripcion FROM proyectos WHERE id = ?",
+                                (proyecto_id,)).fetchone()
+    if not usar_cache:
+        return cargar()
+    return _cache.obtener(ruta_db, "proyectos", ("id", proyecto_id), cargar)
 
 
 def agregar_empleado(nombre: str, direccion: str, telefono: str, email: str,
                      salario: float, password_hash: str, departamento_id: Optional[int] = None,
                      ruta_db: str = DB_RUTA_DEFAULT) -> int:
-    with obtener_conexion(ruta_db) as conn:
+    with conexion(ruta_db) as conn:
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -150,21 +1067,24 @@ def agregar_empleado(nombre: str, direccion: str, telefono: str, email: str,
 
 
 def obtener_empleado_por_email(email: str, ruta_db: str = DB_RUTA_DEFAULT) -> Optional[Tuple]:
-    with obtener_conexion(ruta_db) as conn:
+    with conexion(ruta_db) as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT id, nombre, direccion, telefono, email, salario, password_hash, departamento_id FROM empleados WHERE email = ?", (email,))
+        cursor.execute(f"SELECT {_COLUMNAS_EMPLEADO} FROM empleados WHERE email = ?", (email,))
         return cursor.fetchone()
 
 
+def obtener_empleado(empleado_id: int, ruta_db: str = DB_RUTA_DEFAULT) -> Optional[Tuple]:
+    """Devuelve la fila completa del empleado (mismas columnas que `obtener_empleado_por_email`) o None."""
+    with conexion(ruta_db) as conn:
+        return conn.execute(f"SELECT {_COLUMNAS_EMPLEADO} FROM empleados WHERE id = ?", (empleado_id,)).fetchone()
+
+
 def listar_empleados(ruta_db: str = DB_RUTA_DEFAULT) -> List[Tuple]:
-    with obtener_conexion(ruta_db) as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, nombre, direccion, telefono, email, salario, departamento_id FROM empleados")
-        return cursor.fetchall()
+    return list(iterar_empleados(ruta_db=ruta_db))
 
 
 def asignar_empleado_a_proyecto(empleado_id: int, proyecto_id: int, ruta_db: str = DB_RUTA_DEFAULT) -> int:
-    with obtener_conexion(ruta_db) as conn:
+    with conexion(ruta_db) as conn:
         cursor = conn.cursor()
         cursor.execute("INSERT OR IGNORE INTO proyectos_empleados (empleado_id, proyecto_id) VALUES (?, ?)", (empleado_id, proyecto_id))
         conn.commit()
@@ -172,7 +1092,7 @@ def asignar_empleado_a_proyecto(empleado_id: int, proyecto_id: int, ruta_db: str
 
 
 def agregar_registro_tiempo(empleado_id: int, proyecto_id: int, fecha: str, horas: float, ruta_db: str = DB_RUTA_DEFAULT) -> int:
-    with obtener_conexion(ruta_db) as conn:
+    with conexion(ruta_db) as conn:
         cursor = conn.cursor()
         cursor.execute(
             "INSERT INTO registros_tiempo (empleado_id, proyecto_id, fecha, horas) VALUES (?, ?, ?, ?)",
@@ -183,10 +1103,7 @@ def agregar_registro_tiempo(empleado_id: int, proyecto_id: int, fecha: str, hora
 
 
 def listar_registros(ruta_db: str = DB_RUTA_DEFAULT) -> List[Tuple]:
-    with obtener_conexion(ruta_db) as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, empleado_id, proyecto_id, fecha, horas FROM registros_tiempo")
-        return cursor.fetchall()
+    return list(iterar_registros(ruta_db=ruta_db))
 
 
 # ------------------ Funciones adicionales (actualizar / eliminar / consultas) ------------------
@@ -194,7 +1111,7 @@ def actualizar_empleado(id_empleado: int, nombre: str, direccion: str, telefono:
                         email: str, salario: float, departamento_id: Optional[int],
                         ruta_db: str = DB_RUTA_DEFAULT) -> None:
     """Actualiza los datos de un empleado (sin cambiar contraseña)."""
-    with obtener_conexion(ruta_db) as conn:
+    with conexion(ruta_db) as conn:
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -210,7 +1127,7 @@ def actualizar_empleado(id_empleado: int, nombre: str, direccion: str, telefono:
 def actualizar_contrasena_empleado(id_empleado: int, nueva_contrasena: str, ruta_db: str = DB_RUTA_DEFAULT) -> None:
     """Actualiza la contraseña (almacenando su hash)."""
     hash_pw = hash_contrasena(nueva_contrasena)
-    with obtener_conexion(ruta_db) as conn:
+    with conexion(ruta_db) as conn:
         cursor = conn.cursor()
         cursor.execute("UPDATE empleados SET password_hash = ? WHERE id = ?", (hash_pw, id_empleado))
         conn.commit()
@@ -218,7 +1135,7 @@ def actualizar_contrasena_empleado(id_empleado: int, nueva_contrasena: str, ruta
 
 def eliminar_empleado(id_empleado: int, ruta_db: str = DB_RUTA_DEFAULT) -> None:
     """Elimina un empleado y sus asignaciones y registros relacionados."""
-    with obtener_conexion(ruta_db) as conn:
+    with conexion(ruta_db) as conn:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM proyectos_empleados WHERE empleado_id = ?", (id_empleado,))
         cursor.execute("DELETE FROM registros_tiempo WHERE empleado_id = ?", (id_empleado,))
@@ -227,14 +1144,14 @@ def eliminar_empleado(id_empleado: int, ruta_db: str = DB_RUTA_DEFAULT) -> None:
 
 
 def desasignar_empleado_de_proyecto(empleado_id: int, proyecto_id: int, ruta_db: str = DB_RUTA_DEFAULT) -> None:
-    with obtener_conexion(ruta_db) as conn:
+    with conexion(ruta_db) as conn:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM proyectos_empleados WHERE empleado_id = ? AND proyecto_id = ?", (empleado_id, proyecto_id))
         conn.commit()
 
 
 def obtener_proyectos_de_empleado(empleado_id: int, ruta_db: str = DB_RUTA_DEFAULT) -> List[Tuple]:
-    with obtener_conexion(ruta_db) as conn:
+    with conexion(ruta_db) as conn:
         cursor = conn.cursor()
         cursor.execute(
             "SELECT p.id, p.nombre, p.descripcion FROM proyectos p"
@@ -247,40 +1164,601 @@ def obtener_proyectos_de_empleado(empleado_id: int, ruta_db: str = DB_RUTA_DEFAU
 
 def asignar_gerente_departamento(departamento_id: int, gerente_id: Optional[int], ruta_db: str = DB_RUTA_DEFAULT) -> None:
     """Asigna (o elimina si gerente_id es None) el gerente de un departamento."""
-    with obtener_conexion(ruta_db) as conn:
+    with conexion(ruta_db) as conn:
         cursor = conn.cursor()
         cursor.execute("UPDATE departamentos SET id_gerente = ? WHERE id = ?", (gerente_id, departamento_id))
         conn.commit()
+        _cache.invalidar(ruta_db, "departamentos")
 
 
 def eliminar_departamento(departamento_id: int, ruta_db: str = DB_RUTA_DEFAULT) -> None:
     """Elimina un departamento; deja los empleados con departamento_id = NULL."""
-    with obtener_conexion(ruta_db) as conn:
+    with conexion(ruta_db) as conn:
         cursor = conn.cursor()
         cursor.execute("UPDATE empleados SET departamento_id = NULL WHERE departamento_id = ?", (departamento_id,))
         cursor.execute("DELETE FROM departamentos WHERE id = ?", (departamento_id,))
         conn.commit()
+        _cache.invalidar(ruta_db, "departamentos")
 
 
 def actualizar_departamento(departamento_id: int, nombre: str, ruta_db: str = DB_RUTA_DEFAULT) -> None:
-    with obtener_conexion(ruta_db) as conn:
+    with conexion(ruta_db) as conn:
         cursor = conn.cursor()
         cursor.execute("UPDATE departamentos SET nombre = ? WHERE id = ?", (nombre, departamento_id))
         conn.commit()
+        _cache.invalidar(ruta_db, "departamentos")
 
 
 def eliminar_proyecto(proyecto_id: int, ruta_db: str = DB_RUTA_DEFAULT) -> None:
     """Elimina un proyecto y sus asignaciones y registros relacionados."""
-    with obtener_conexion(ruta_db) as conn:
+    with conexion(ruta_db) as conn:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM proyectos_empleados WHERE proyecto_id = ?", (proyecto_id,))
         cursor.execute("DELETE FROM registros_tiempo WHERE proyecto_id = ?", (proyecto_id,))
         cursor.execute("DELETE FROM proyectos WHERE id = ?", (proyecto_id,))
         conn.commit()
+        _cache.invalidar(ruta_db, "proyectos")
 
 
 def actualizar_proyecto(proyecto_id: int, nombre: str, descripcion: str, ruta_db: str = DB_RUTA_DEFAULT) -> None:
-    with obtener_conexion(ruta_db) as conn:
+    with conexion(ruta_db) as conn:
         cursor = conn.cursor()
         cursor.execute("UPDATE proyectos SET nombre = ?, descripcion = ? WHERE id = ?", (nombre, descripcion, proyecto_id))
         conn.commit()
+        _cache.invalidar(ruta_db, "proyectos")
+
+
+# ------------------ Inserción masiva ------------------
+def _insertar_en_lotes(sql: str, filas: Iterable[Tuple], tamano_lote: int, ruta_db: str) -> List[Tuple[int, int]]:
+    """Inserta `filas` con executemany en lotes de `tamano_lote`, todo en una transacción.
+
+    Devuelve los rangos de ids insertados como [(primer_id, ultimo_id), ...]
+    (inclusive). Mientras dura la transacción nadie más puede escribir, así que
+    los ids de cada lote son consecutivos. Si una fila falla no se guarda nada.
+    """
+    if tamano_lote < 1:
+        raise ValueError("El tamaño de lote debe ser al menos 1")
+    rangos: List[Tuple[int, int]] = []
+    iterador = iter(filas)
+    with conexion(ruta_db) as conn:
+        # Dentro de una transacción del llamador se suma a ella: el commit lo hace él
+        propia = not conn.in_transaction
+        if propia:
+            conn.execute("BEGIN IMMEDIATE")
+        cursor = conn.cursor()
+        while True:
+            lote = list(islice(iterador, tamano_lote))
+            if not lote:
+                break
+            cursor.executemany(sql, lote)
+            insertadas = cursor.rowcount
+            if insertadas <= 0:
+                continue
+            ultimo = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            primero = ultimo - insertadas + 1
+            if rangos and rangos[-1][1] + 1 == primero:
+                rangos[-1] = (rangos[-1][0], ultimo)
+            else:
+                rangos.append((primero, ultimo))
+        if propia:
+            conn.commit()
+    return rangos
+
+
+def agregar_registros_tiempo(registros: Iterable[Tuple[int, int, str, float]],
+                             tamano_lote: int = TAMANO_LOTE_DEFAULT,
+                             ruta_db: str = DB_RUTA_DEFAULT) -> List[Tuple[int, int]]:
+    """Inserta tuplas (empleado_id, proyecto_id, fecha, horas) en una sola transacción."""
+    return _insertar_en_lotes(
+        "INSERT INTO registros_tiempo (empleado_id, proyecto_id, fecha, horas) VALUES (?, ?, ?, ?)",
+        registros, tamano_lote, ruta_db)
+
+
+def agregar_empleados(empleados: Iterable[Tuple], tamano_lote: int = TAMANO_LOTE_DEFAULT,
+                      ruta_db: str = DB_RUTA_DEFAULT) -> List[Tuple[int, int]]:
+    """Inserta tuplas (nombre, direccion, telefono, email, salario, password_hash, departamento_id)."""
+    return _insertar_en_lotes(
+        """
+        INSERT INTO empleados (nombre, direccion, telefono, email, salario, password_hash, departamento_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        empleados, tamano_lote, ruta_db)
+
+
+def agregar_proyectos(proyectos: Iterable[Tuple[str, str]], tamano_lote: int = TAMANO_LOTE_DEFAULT,
+                      ruta_db: str = DB_RUTA_DEFAULT) -> List[Tuple[int, int]]:
+    """Inserta tuplas (nombre, descripcion) en una sola transacción."""
+    rangos = _insertar_en_lotes(
+        "INSERT INTO proyectos (nombre, descripcion) VALUES (?, ?)",
+        proyectos, tamano_lote, ruta_db)
+    _cache.invalidar(ruta_db, "proyectos")
+    return rangos
+
+
+def asignar_empleados_a_proyectos(asignaciones: Iterable[Tuple[int, int]],
+                                  tamano_lote: int = TAMANO_LOTE_DEFAULT,
+                                  ruta_db: str = DB_RUTA_DEFAULT) -> List[Tuple[int, int]]:
+    """Inserta tuplas (empleado_id, proyecto_id); las asignaciones repetidas se ignoran."""
+    return _insertar_en_lotes(
+        "INSERT OR IGNORE INTO proyectos_empleados (empleado_id, proyecto_id) VALUES (?, ?)",
+        asignaciones, tamano_lote, ruta_db)
+
+
+# ------------------ Resumen diario de horas ------------------
+def _reconstruir_resumen(conn: sqlite3.Connection) -> None:
+    conn.execute("DELETE FROM resumen_horas_diarias")
+    conn.execute(
+        """
+        INSERT INTO resumen_horas_diarias (empleado_id, proyecto_id, fecha, total_horas, cantidad)
+        SELECT empleado_id, proyecto_id, fecha, SUM(horas), COUNT(*)
+        FROM registros_tiempo
+        GROUP BY empleado_id, proyecto_id, fecha
+        """
+    )
+
+
+def reconstruir_resumen_horas(ruta_db: str = DB_RUTA_DEFAULT) -> None:
+    """Recalcula `resumen_horas_diarias` completo desde `registros_tiempo`."""
+    with conexion(ruta_db) as conn:
+        propia = not conn.in_transaction
+        if propia:
+            conn.execute("BEGIN IMMEDIATE")
+        _reconstruir_resumen(conn)
+        if propia:
+            conn.commit()
+
+
+def verificar_resumen_horas(ruta_db: str = DB_RUTA_DEFAULT, tolerancia: float = 1e-6) -> List[Tuple]:
+    """Compara el resumen con `registros_tiempo` y devuelve las diferencias.
+
+    Cada diferencia es (empleado_id, proyecto_id, fecha, horas_esperadas,
+    horas_en_resumen, cantidad_esperada, cantidad_en_resumen); None indica que la
+    fila falta de ese lado. Lista vacía = resumen consistente.
+    """
+    with conexion(ruta_db) as conn:
+        return conn.execute(
+            """
+            WITH base AS (
+                SELECT empleado_id, proyecto_id, fecha, SUM(horas) AS total, COUNT(*) AS cantidad
+                FROM registros_tiempo GROUP BY empleado_id, proyecto_id, fecha
+            )
+            SELECT b.empleado_id, b.proyecto_id, b.fecha, b.total, r.total_horas, b.cantidad, r.cantidad
+            FROM base b
+            LEFT JOIN resumen_horas_diarias r
+              ON r.empleado_id = b.empleado_id AND r.proyecto_id = b.proyecto_id AND r.fecha = b.fecha
+            WHERE r.empleado_id IS NULL OR r.cantidad != b.cantidad OR abs(r.total_horas - b.total) > ?
+            UNION ALL
+            SELECT r.empleado_id, r.proyecto_id, r.fecha, NULL, r.total_horas, NULL, r.cantidad
+            FROM resumen_horas_diarias r
+            WHERE NOT EXISTS (
+                SELECT 1 FROM registros_tiempo t
+                WHERE t.empleado_id = r.empleado_id AND t.proyecto_id = r.proyecto_id AND t.fecha = r.fecha
+            )
+            """,
+            (tolerancia,)
+        ).fetchall()
+
+
+# ------------------ Registro de cambios ------------------
+# SQLite tiene un solo escritor a la vez, así que las secuencias se confirman en
+# orden: quien leyó hasta `seq` no se pierde cambios con una secuencia menor.
+def ultimo_cambio(ruta_db: str = DB_RUTA_DEFAULT) -> int:
+    """Devuelve la última secuencia asignada en el registro de cambios (0 si no hay)."""
+    with conexion(ruta_db) as conn:
+        fila = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'cambios'").fetchone()
+        return fila[0] if fila else 0
+
+
+def cambios_desde(seq: int, limite: Optional[int] = None,
+                  ruta_db: str = DB_RUTA_DEFAULT) -> List[Tuple[int, str, int, str]]:
+    """Devuelve los cambios con secuencia mayor que `seq`, en orden.
+
+    Filas: (seq, tabla, fila_id, operacion) con operacion 'I', 'U' o 'D'. Con
+    `limite` se devuelven como mucho esa cantidad (el llamador decide si le
+    conviene recargar todo en lugar de aplicar tantos cambios).
+    """
+    sql = "SELECT seq, tabla, fila_id, operacion FROM cambios WHERE seq > ? ORDER BY seq"
+    params: list = [seq]
+    if limite is not None:
+        sql += " LIMIT ?"
+        params.append(limite)
+    with conexion(ruta_db) as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+def cambios_perdidos(seq: int, ruta_db: str = DB_RUTA_DEFAULT) -> bool:
+    """Indica si ya se purgaron cambios posteriores a `seq` (hay que recargar todo)."""
+    with conexion(ruta_db) as conn:
+        primero = conn.execute("SELECT MIN(seq) FROM cambios").fetchone()[0]
+    ultimo = ultimo_cambio(ruta_db)
+    if primero is None:
+        return seq < ultimo
+    return primero > seq + 1
+
+
+def purgar_cambios(conservar: int = CAMBIOS_CONSERVADOS_DEFAULT, ruta_db: str = DB_RUTA_DEFAULT) -> int:
+    """Borra los cambios viejos dejando los últimos `conservar`. Devuelve cuántos borró."""
+    with conexion(ruta_db) as conn:
+        cur = conn.execute("DELETE FROM cambios WHERE seq <= ?", (ultimo_cambio(ruta_db) - conservar,))
+        conn.commit()
+        return cur.rowcount
+
+
+def obtener_filas(tabla: str, ids: Iterable[int], ruta_db: str = DB_RUTA_DEFAULT) -> Dict[int, Tuple]:
+    """Devuelve {id: fila} de una tabla listable para los ids pedidos que existan.
+
+    Las filas tienen las mismas columnas que los listados (`listar_*`).
+    """
+    if tabla not in _COLUMNAS_LISTADO:
+        raise ValueError(f"Tabla no listable: {tabla!r}")
+    return _obtener_por_ids(tabla, _COLUMNAS_LISTADO[tabla], ids, ruta_db)
+
+
+# ------------------ Búsqueda de texto completo ------------------
+def _terminos_busqueda(texto: str) -> List[str]:
+    return re.findall(r"\w+", texto or "")
+
+
+def buscar(texto: str, tabla: str = "empleados", limite: int = LIMITE_BUSQUEDA_DEFAULT,
+           ruta_db: str = DB_RUTA_DEFAULT) -> List[Tuple]:
+    """Busca `texto` en empleados, proyectos o departamentos; las filas más relevantes primero.
+
+    Cada palabra se busca como prefijo ("ana gar" encuentra "Ana García") y todas
+    deben aparecer en alguna columna; no distingue mayúsculas ni tildes. Las filas
+    tienen las mismas columnas que `listar_*`. Sin índice FTS5 (departamentos, o
+    SQLite sin FTS5) se usa LIKE, sin ranking.
+    """
+    if tabla in _COLUMNAS_BUSQUEDA:
+        pesos = _COLUMNAS_BUSQUEDA[tabla]
+        columnas_texto = [c for c, _ in pesos]
+    elif tabla in _COLUMNAS_BUSQUEDA_LIKE:
+        pesos = ()
+        columnas_texto = list(_COLUMNAS_BUSQUEDA_LIKE[tabla])
+    else:
+        raise ValueError(f"Tabla sin búsqueda: {tabla!r}")
+    terminos = _terminos_busqueda(texto)
+    if not terminos:
+        return []
+    columnas = ", ".join(f"t.{c.strip()}" for c in _COLUMNAS_LISTADO[tabla].split(","))
+    with conexion(ruta_db) as conn:
+        hay_fts = pesos and conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                         (f"{tabla}_fts",)).fetchone()
+        if hay_fts:
+            consulta = " ".join(f'"{t}"*' for t in terminos)
+            ranking = ", ".join(str(p) for _, p in pesos)
+            return conn.execute(
+                f"SELECT {columnas} FROM {tabla}_fts f JOIN {tabla} t ON t.id = f.rowid"
+                f" WHERE {tabla}_fts MATCH ? ORDER BY bm25({tabla}_fts, {ranking}) LIMIT ?",
+                (consulta, limite)).fetchall()
+
+        # '_' es un carácter de palabra: se escapa para que no sea comodín
+        una = "(" + " OR ".join(f"t.{c} LIKE ? ESCAPE '!'" for c in columnas_texto) + ")"
+        escapados = [t.replace('!', '!!').replace('%', '!%').replace('_', '!_') for t in terminos]
+        params = [f"%{t}%" for t in escapados for _ in columnas_texto]
+        return conn.execute(
+            f"SELECT {columnas} FROM {tabla} t WHERE {' AND '.join([una] * len(terminos))}"
+            " ORDER BY t.id LIMIT ?", params + [limite]).fetchall()
+
+
+def buscar_empleados(texto: str, limite: int = LIMITE_BUSQUEDA_DEFAULT,
+                     ruta_db: str = DB_RUTA_DEFAULT) -> List[Tuple]:
+    return buscar(texto, "empleados", limite, ruta_db)
+
+
+def buscar_proyectos(texto: str, limite: int = LIMITE_BUSQUEDA_DEFAULT,
+                     ruta_db: str = DB_RUTA_DEFAULT) -> List[Tuple]:
+    return buscar(texto, "proyectos", limite, ruta_db)
+
+
+def buscar_departamentos(texto: str, limite: int = LIMITE_BUSQUEDA_DEFAULT,
+                         ruta_db: str = DB_RUTA_DEFAULT) -> List[Tuple]:
+    return buscar(texto, "departamentos", limite, ruta_db)
+
+
+# ------------------ Pasarela para modelos.GestorUsuarios ------------------
+class PasarelaBD(ABC):
+    """Ejecuta consultas con `ejecutar_query` sobre conexiones prestadas de un pool.
+
+    Las consultas usan el marcador `%s` (estilo MySQL) en ambos backends. Semántica:
+    - Lecturas: devuelven una lista de dicts {columna: valor}.
+    - Escrituras: devuelven el id insertado (INSERT) o las filas afectadas. Con
+      `commit=True` se confirman al terminar; con `commit=False` se descartan,
+      salvo dentro de `transaccion()`, que confirma todo junto al salir del bloque.
+    - Los errores del driver se relanzan como `ErrorBD` (o `IntegridadError`).
+    - Si el hilo ya está dentro de una transacción del backend abierta por fuera
+      de la pasarela (`db.conexion()` en SQLite), se suma a ella igual que dentro
+      de `transaccion()`: no confirma ni descarta nada, lo decide ese bloque.
+
+    Es segura entre hilos: cada hilo usa su propia conexión del pool.
+    """
+
+    backend = ""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._contadores = {"consultas": 0, "escrituras": 0, "commits": 0, "rollbacks": 0}
+
+    @abstractmethod
+    def _prestar(self):
+        """Context manager que presta una conexión del pool del backend."""
+
+    @abstractmethod
+    def _errores_driver(self) -> Tuple[type, type]:
+        """(excepción base del driver, excepción de integridad del driver)."""
+
+    def _adaptar(self, query: str) -> str:
+        return query
+
+    def _conexion_externa(self):
+        """Conexión de una transacción que el hilo abrió fuera de la pasarela, o None."""
+        return None
+
+    def _conexion_actual(self):
+        return getattr(self._local, "conn", None) or self._conexion_externa()
+
+    def _sumar(self, clave: str) -> None:
+        with self._lock:
+            self._contadores[clave] += 1
+
+    @contextmanager
+    def _traducir_errores(self):
+        base, integridad = self._errores_driver()
+        try:
+            yield
+        except integridad as e:
+            raise IntegridadError(str(e)) from e
+        except base as e:
+            raise ErrorBD(str(e)) from e
+
+    def _ejecutar(self, conn, query: str, params) -> Tuple[Any, bool]:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(self._adaptar(query), tuple(params or ()))
+            if cursor.description is not None:
+                columnas = [d[0] for d in cursor.description]
+                self._sumar("consultas")
+                return [dict(zip(columnas, fila)) for fila in cursor.fetchall()], False
+            self._sumar("escrituras")
+            if query.lstrip()[:6].upper() == "INSERT":
+                return cursor.lastrowid, True
+            return cursor.rowcount, True
+        finally:
+            cursor.close()
+
+    def _ejecutar_muchos(self, conn, query: str, filas: List[Tuple]) -> int:
+        cursor = conn.cursor()
+        try:
+            cursor.executemany(self._adaptar(query), filas)
+            self._sumar("escrituras")
+            return cursor.rowcount
+        finally:
+            cursor.close()
+
+    def _confirmar(self, conn, commit: bool) -> None:
+        if commit:
+            conn.commit()
+            self._sumar("commits")
+        else:
+            conn.rollback()
+            self._sumar("rollbacks")
+
+    @contextmanager
+    def transaccion(self):
+        """Agrupa varias `ejecutar_query` del hilo en una sola transacción.
+
+        Se confirma al salir del bloque más externo o se deshace si hubo una excepción.
+        """
+        if getattr(self._local, "conn", None) is not None:
+            yield self
+            return
+        externa = self._conexion_externa()
+        if externa is not None:
+            # Dentro de un bloque ajeno: confirma o deshace quien lo abrió
+            self._local.conn = externa
+            try:
+                yield self
+            finally:
+                self._local.conn = None
+            return
+        with self._traducir_errores(), self._prestar() as conn:
+            self._local.conn = conn
+            try:
+                yield self
+                self._confirmar(conn, True)
+            except BaseException:
+                self._confirmar(conn, False)
+                raise
+            finally:
+                self._local.conn = None
+
+    def ejecutar_query(self, query: str, params: Optional[Iterable] = None, commit: bool = False):
+        """Ejecuta una consulta con marcadores `%s` y devuelve filas, id insertado o filas afectadas."""
+        conn = self._conexion_actual()
+        if conn is not None:
+            with self._traducir_errores():
+                return self._ejecutar(conn, query, params)[0]
+        with self._traducir_errores(), self._prestar() as conn:
+            try:
+                resultado, escritura = self._ejecutar(conn, query, params)
+            except BaseException:
+                self._confirmar(conn, False)
+                raise
+            if escritura:
+                self._confirmar(conn, commit)
+            return resultado
+
+    def ejecutar_muchos(self, query: str, filas: Iterable[Iterable], commit: bool = False) -> int:
+        """Ejecuta la misma escritura para cada fila de parámetros (executemany).
+
+        Devuelve las filas afectadas. Misma semántica de commit que `ejecutar_query`:
+        si una fila falla no se escribe ninguna (fuera de `transaccion()`).
+        """
+        filas = [tuple(f) for f in filas]
+        if not filas:
+            return 0
+        conn = self._conexion_actual()
+        if conn is not None:
+            with self._traducir_errores():
+                return self._ejecutar_muchos(conn, query, filas)
+        with self._traducir_errores(), self._prestar() as conn:
+            try:
+                resultado = self._ejecutar_muchos(conn, query, filas)
+            except BaseException:
+                self._confirmar(conn, False)
+                raise
+            self._confirmar(conn, commit)
+            return resultado
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Contadores de consultas y transacciones más el estado del pool."""
+        with self._lock:
+            return {"backend": self.backend, **self._contadores}
+
+    @abstractmethod
+    def cerrar(self) -> None:
+        """Cierra las conexiones del pool."""
+
+
+class PasarelaSQLite(PasarelaBD):
+    """Pasarela sobre el pool de conexiones de este módulo para `ruta_db`.
+
+    Comparte el pool con el resto de las funciones de db.py; la primera vez
+    aplica las migraciones pendientes (incluida la tabla usuarios).
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, ruta_db: str = DB_RUTA_DEFAULT):
+        super().__init__()
+        self.ruta_db = ruta_db
+        inicializar_bd(ruta_db)
+
+    def _prestar(self):
+        return conexion(self.ruta_db)
+
+    def _errores_driver(self) -> Tuple[type, type]:
+        return sqlite3.Error, sqlite3.IntegrityError
+
+    def _adaptar(self, query: str) -> str:
+        return query.replace("%s", "?")
+
+    def _conexion_externa(self):
+        return obtener_pool(self.ruta_db).conexion_del_hilo()
+
+    def estadisticas(self) -> Dict[str, Any]:
+        return {**super().estadisticas(), **obtener_pool(self.ruta_db).estado()}
+
+    def cerrar(self) -> None:
+        cerrar_conexiones(self.ruta_db)
+
+
+class PasarelaMySQL(PasarelaBD):
+    """Pasarela sobre un pool de mysql.connector (base creada con database.sql).
+
+    La configuración sale de `config` o de DB_HOST, DB_PORT, DB_USER, DB_PASSWORD
+    y DB_NAME (ver .env.example). Si las `tamano` conexiones están prestadas se
+    espera hasta `timeout` segundos. Requiere el paquete mysql-connector-python.
+    """
+
+    backend = "mysql"
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, tamano: int = TAMANO_POOL_DEFAULT,
+                 timeout: float = TIMEOUT_POOL_DEFAULT):
+        import mysql.connector
+        from mysql.connector import pooling
+        from mysql.connector.constants import ClientFlag
+        super().__init__()
+        if config is None:
+            try:
+                from dotenv import load_dotenv
+                load_dotenv()
+            except ImportError:
+                pass
+            config = {
+                "host": os.getenv("DB_HOST", "localhost"),
+                "port": int(os.getenv("DB_PORT", "3306")),
+                "user": os.getenv("DB_USER", "root"),
+                "password": os.getenv("DB_PASSWORD", ""),
+                "database": os.getenv("DB_NAME", "pepe123"),
+            }
+        self._errores = (mysql.connector.Error, mysql.connector.IntegrityError)
+        self.tamano = tamano
+        self.timeout = timeout
+        # FOUND_ROWS: un UPDATE informa las filas encontradas (como SQLite), no solo las que
+        # cambiaron, así "0 filas" significa siempre que el id no existe
+        self._pool = pooling.MySQLConnectionPool(pool_name=f"ecotech_{id(self)}", pool_size=tamano,
+                                                 autocommit=False, client_flags=[ClientFlag.FOUND_ROWS],
+                                                 **config)
+        # MySQLConnectionPool falla en vez de esperar cuando se agota: el semáforo acota y espera
+        self._cupos = threading.BoundedSemaphore(tamano)
+        self._estado_pool = {"prestamos": 0, "esperas": 0, "prestadas": 0}
+
+    @contextmanager
+    def _prestar(self):
+        if not self._cupos.acquire(blocking=False):
+            with self._lock:
+                self._estado_pool["esperas"] += 1
+            if not self._cupos.acquire(timeout=self.timeout):
+                raise ErrorBD(f"Sin conexiones MySQL libres tras {self.timeout}s (tamaño {self.tamano})")
+        try:
+            conn = self._pool.get_connection()
+        except BaseException:
+            self._cupos.release()
+            raise
+        with self._lock:
+            self._estado_pool["prestamos"] += 1
+            self._estado_pool["prestadas"] += 1
+        try:
+            yield conn
+        finally:
+            conn.close()  # en una conexión del pool, close() la devuelve al pool
+            with self._lock:
+                self._estado_pool["prestadas"] -= 1
+            self._cupos.release()
+
+    def _errores_driver(self) -> Tuple[type, type]:
+        return self._errores
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            estado = dict(self._estado_pool)
+        return {**super().estadisticas(), "tamano": self.tamano, **estado}
+
+    def cerrar(self) -> None:
+        # mysql.connector no cierra un pool entero; se vacían las conexiones ociosas
+        try:
+            self._pool._remove_connections()
+        except Exception:
+            pass
+
+
+_pasarelas: Dict[Tuple[str, str], PasarelaBD] = {}
+_pasarelas_lock = threading.Lock()
+
+
+def get_db(backend: Optional[str] = None, ruta_db: str = DB_RUTA_DEFAULT) -> PasarelaBD:
+    """Devuelve la pasarela compartida del backend ('sqlite' o 'mysql').
+
+    Por defecto se usa DB_BACKEND del entorno, o SQLite sobre `ruta_db`. Todas las
+    llamadas con los mismos argumentos devuelven el mismo objeto (y el mismo pool).
+    """
+    backend = (backend or os.getenv("DB_BACKEND", "sqlite")).lower()
+    if backend not in ("sqlite", "mysql"):
+        raise ValueError(f"Backend desconocido: {backend!r}. Use 'sqlite' o 'mysql'.")
+    clave = (backend, _clave_ruta(ruta_db) if backend == "sqlite" else "")
+    with _pasarelas_lock:
+        pasarela = _pasarelas.get(clave)
+        if pasarela is None:
+            pasarela = PasarelaSQLite(ruta_db) if backend == "sqlite" else PasarelaMySQL()
+            _pasarelas[clave] = pasarela
+        return pasarela
+
+
+def cerrar_pasarelas() -> None:
+    """Cierra y olvida todas las pasarelas creadas con `get_db`."""
+    with _pasarelas_lock:
+        pasarelas = list(_pasarelas.values())
+        _pasarelas.clear()
+    for pasarela in pasarelas:
+        pasarela.cerrar()
@@ -0,0 +1,96 @@
+"""
+Exportación de registros de tiempo a archivo, en streaming.
+
+Lee los registros por bloques desde la base de datos (con los nombres de
+empleado y proyecto ya unidos) y los escribe a medida que llegan, por lo que la
+memoria usada no depende de la cantidad de filas. Formatos soportados:
+- 'csv'     : CSV UTF-8 compatible con Excel
+- 'csv.gz'  : el mismo CSV comprimido con gzip
+- 'ndjson'  : un objeto JSON por línea
+
+No depende de tkinter: se puede usar desde la GUI (en un hilo aparte) o desde scripts.
+"""
+import csv
+import gzip
+import json
+import os
+from typing import Optional, Callable
+import db
+
+FORMATOS = ("csv", "csv.gz", "ndjson")
+ENCABEZADOS_CSV = ["ID", "Empleado ID", "Empleado", "Proyecto ID", "Proyecto", "Fecha", "Horas"]
+CLAVES_JSON = ["id", "empleado_id", "empleado", "proyecto_id", "proyecto", "fecha", "horas"]
+
+
+class ExportacionCancelada(Exception):
+    """La exportación se detuvo porque el callback de progreso devolvió False."""
+    pass
+
+
+def detectar_formato(ruta_salida: str) -> str:
+    """Deduce el formato a partir de la extensión del archivo (por defecto 'csv')."""
+    ruta = ruta_salida.lower()
+    if ruta.endswith(".csv.gz") or ruta.endswith(".gz"):
+        return "csv.gz"
+    if ruta.endswith(".ndjson") or ruta.endswith(".jsonl"):
+        return "ndjson"
+    return "csv"
+
+
+def _abrir_salida(ruta: str, formato: str):
+    if formato == "csv.gz":
+        return gzip.open(ruta, mode="wt", newline="", encoding="utf-8")
+    return open(ruta, mode="w", newline="", encoding="utf-8")
+
+
+def exportar_registros(ruta_salida: str, formato: Optional[str] = None,
+                       fecha_desde: Optional[str] = None, fecha_hasta: Optional[str] = None,
+                       empleado_id: Optional[int] = None, proyecto_id: Optional[int] = None,
+                       progreso: Optional[Callable[[int, int], Optional[bool]]] = None,
+                       tamano_bloque: int = db.TAMANO_BLOQUE_DEFAULT,
+                       ruta_db: str = db.DB_RUTA_DEFAULT) -> int:
+    """Exporta los registros que cumplen los filtros y devuelve la cantidad escrita.
+
+    `progreso(escritas, total)` se llama cada `tamano_bloque` filas y al terminar;
+    si devuelve False la exportación se cancela con `ExportacionCancelada`. Se
+    escribe primero a un archivo temporal, así `ruta_salida` nunca queda a medias.
+    """
+    formato = formato or detectar_formato(ruta_salida)
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de exportación desconocido: {formato!r}")
+
+    filtros = dict(fecha_desde=fecha_desde, fecha_hasta=fecha_hasta,
+                   empleado_id=empleado_id, proyecto_id=proyecto_id)
+    total = db.contar_registros(ruta_db=ruta_db, **filtros) if progreso else 0
+    ruta_temporal = ruta_salida + ".tmp"
+    escritas = 0
+    try:
+        with _abrir_salida(ruta_temporal, formato) as f:
+            if formato == "ndjson":
+                def escribir(fila):
+                    f.write(json.dumps(dict(zip(CLAVES_JSON, fila)), ensure_ascii=False) + "\n")
+            else:
+                escritor = csv.writer(f)
+                escritor.writerow(ENCABEZADOS_CSV)
+                escribir = escritor.writerow
+
+            filas = db.iterar_registros_detallados(tamano_bloque=tamano_bloque, ruta_db=ruta_db, **filtros)
+            try:
+                for fila in filas:
+                    escribir(fila)
+                    escritas += 1
+                    if progreso and escritas % tamano_bloque == 0 and progreso(escritas, total) is False:
+                        raise ExportacionCancelada(f"Exportación cancelada tras {escritas} filas")
+            finally:
+                filas.close()
+        os.replace(ruta_temporal, ruta_salida)
+    except BaseException:
+        try:
+            os.unlink(ruta_temporal)
+        except OSError:
+            pass
+        raise
+
+    if progreso:
+        progreso(escritas, total)
+    return escritas
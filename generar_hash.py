@@ -2,7 +2,7 @@
 Script auxiliar para generar hashes de contraseñas con bcrypt
 Útil para crear usuarios iniciales o resetear contraseñas
 """
-import bcrypt
+import contrasenas
 
 def generar_hash(password):
     """
@@ -14,15 +14,9 @@ def generar_hash(password):
     Returns:
         str: Hash bcrypt de la contraseña
     """
-    # Convertir la contraseña a bytes
-    password_bytes = password.encode('utf-8')
-    
-    # Generar salt y hash (factor de costo 12 para seguridad óptima)
-    salt = bcrypt.gensalt(rounds=12)
-    hash_generado = bcrypt.hashpw(password_bytes, salt)
-    
-    # Retornar como string
-    return hash_generado.decode('utf-8')
+    # Mismo subsistema que usa modelos.py: el costo sale de BCRYPT_COSTO o se
+    # calibra en este equipo (mínimo 10), así el hash no queda por debajo del actual
+    return contrasenas.hashear(password, 'bcrypt')
 
 if __name__ == "__main__":
     print("=" * 60)
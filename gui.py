@@ -7,37 +7,285 @@ Nota: la GUI está pensada como un punto de partida funcional para la evaluació
 import tkinter as tk
 from tkinter import messagebox
 from tkinter import ttk
-from tkinter import simpledialog
 import db
+import planilla
+import reportes
 import validaciones
-import csv
+import contrasenas
+import limitador
+import sesiones
+from tabla_virtual import TablaVirtual
+from tareas import EjecutorTareas, tarea_actual
 import os
+import sys
+import time
 from typing import Optional
 
+# Para arrancar más rápido, los módulos que solo usan algunas acciones
+# (diálogos, exportación con csv/gzip/json, subprocess) se importan dentro de
+# las funciones que los necesitan.
+
+# Cada cuánto se consultan cambios hechos por otros usuarios o procesos
+INTERVALO_SINCRONIZACION_MS = 2000
+# Con más cambios que estos conviene recargar las tablas en lugar de aplicarlos uno a uno
+LIMITE_CAMBIOS_INCREMENTAL = 500
+# Cada cuántas sincronizaciones se purga el registro de cambios (cargas masivas,
+# importaciones y la planilla lo hacen crecer mientras la aplicación está abierta)
+PURGA_CAMBIOS_CADA = 30
+# Espera tras la última tecla antes de lanzar la búsqueda
+RETARDO_BUSQUEDA_MS = 250
+
+
+def crear_tabla(master, tabla: str, columnas, ejecutor: Optional[EjecutorTareas] = None) -> TablaVirtual:
+    """Crea una TablaVirtual que lee `tabla` de la BD por ventanas paginadas."""
+    return TablaVirtual(
+        master, columnas,
+        contar=lambda: db.contar_filas(tabla),
+        cargar=lambda desde, limite, orden, desc, despues_de: db.consultar_ventana(
+            tabla, desde, limite, orden, desc, despues_de),
+        ejecutor=ejecutor,
+        ordenables=db.columnas_ordenables(tabla),
+    )
+
+
+class CajaBusqueda(ttk.Frame):
+    """Entrada de búsqueda que llama a `al_buscar(texto)` cuando se deja de escribir."""
+
+    def __init__(self, master, al_buscar, retardo_ms: int = RETARDO_BUSQUEDA_MS, **kwargs):
+        super().__init__(master, **kwargs)
+        self.al_buscar = al_buscar
+        self.retardo_ms = retardo_ms
+        self._pendiente = None
+        self.var = tk.StringVar()
+        ttk.Label(self, text="Buscar:").pack(side="left")
+        entrada = ttk.Entry(self, textvariable=self.var)
+        entrada.pack(side="left", fill="x", expand=1, padx=4)
+        entrada.bind("<Escape>", lambda e: self.var.set(""))
+        self.var.trace_add("write", self._al_escribir)
+
+    @property
+    def texto(self) -> str:
+        return self.var.get().strip()
+
+    def _al_escribir(self, *_):
+        if self._pendiente is not None:
+            self.after_cancel(self._pendiente)
+        self._pendiente = self.after(self.retardo_ms, self._disparar)
+
+    def _disparar(self):
+        self._pendiente = None
+        self.al_buscar(self.texto)
+
+
+def medir_primer_pintado(ventana: tk.Misc, nombre: str, inicio: float, al_medir=None) -> None:
+    """Informa cuánto tardó `ventana` en dibujarse por primera vez desde `inicio`.
+
+    `inicio` es un valor de time.perf_counter(). El tiempo se imprime en stderr
+    y, si se indica, se pasa en milisegundos a `al_medir(nombre, ms)`.
+    """
+    def mapeada(evento):
+        if evento.widget is not ventana:
+            return  # <Map> de un widget hijo
+        ventana.unbind("<Map>", ident)
+        ventana.after_idle(informar)  # después de que termine de dibujarse
+
+    def informar():
+        ms = (time.perf_counter() - inicio) * 1000
+        print(f"[arranque] {nombre}: primer pintado en {ms:.0f} ms", file=sys.stderr)
+        if al_medir:
+            al_medir(nombre, ms)
+
+    ident = ventana.bind("<Map>", mapeada, add="+")
+
+
+def mostrar_error(prefijo: str):
+    """Devuelve un callback `al_fallar` que muestra el error con un mensaje."""
+    return lambda e: messagebox.showerror("Error", f"{prefijo}: {e}")
+
 
 class Aplicacion(tk.Tk):
-    def __init__(self):
+    def __init__(self, token_sesion: Optional[str] = None):
         super().__init__()
-        self.title("EcoTech Solutions - Gestión de Empleados")
+        # Sesión abierta por el Login (nombre y rol quedan en memoria, sin consultar la BD)
+        self.token_sesion = token_sesion
+        self.volver_al_login = False
+        sesion = sesiones.obtener_almacen().obtener(token_sesion)
+        self.title("EcoTech Solutions - Gestión de Empleados" + (f" ({sesion.nombre})" if sesion else ""))
         self.geometry("800x500")
 
+        # Las consultas a la BD corren en segundo plano para no congelar la ventana
+        self.tareas = EjecutorTareas(self, al_cambiar_ocupado=self._mostrar_ocupado,
+                                     al_fallar=mostrar_error("Error en segundo plano"))
+        self.protocol("WM_DELETE_WINDOW", self._al_cerrar)
+        self.lbl_ocupado = ttk.Label(self, text="", anchor="w")
+        self.lbl_ocupado.pack(side="bottom", fill="x", padx=10)
+
         # Pestañas
         self.tabs = ttk.Notebook(self)
         self.frame_empleados = ttk.Frame(self.tabs)
         self.frame_departamentos = ttk.Frame(self.tabs)
         self.frame_proyectos = ttk.Frame(self.tabs)
         self.frame_registros = ttk.Frame(self.tabs)
+        self.frame_panel = ttk.Frame(self.tabs)
 
         self.tabs.add(self.frame_empleados, text="Empleados")
         self.tabs.add(self.frame_departamentos, text="Departamentos")
         self.tabs.add(self.frame_proyectos, text="Proyectos")
         self.tabs.add(self.frame_registros, text="Timesheets")
+        self.tabs.add(self.frame_panel, text="Panel")
         self.tabs.pack(expand=1, fill="both")
 
-        self._construir_tab_empleados()
-        self._construir_tab_departamentos()
-        self._construir_tab_proyectos()
-        self._construir_tab_registros()
+        # Cada pestaña se construye (y consulta la BD) recién la primera vez que se abre
+        self._pestanas_pendientes = {
+            str(self.frame_empleados): self._construir_tab_empleados,
+            str(self.frame_departamentos): self._construir_tab_departamentos,
+            str(self.frame_proyectos): self._construir_tab_proyectos,
+            str(self.frame_registros): self._construir_tab_registros,
+            str(self.frame_panel): self._construir_tab_panel,
+        }
+        self.tabs.bind("<<NotebookTabChanged>>", self._al_cambiar_pestana)
+        self.after_idle(self._al_cambiar_pestana)
+
+        # Tablas (ya construidas) que se actualizan con el registro de cambios de la BD
+        self._tablas = {}
+        self._buscadores = {}
+        self.ultimo_cambio: Optional[int] = None
+        self._sincronizacion = None
+        self._sincronizaciones = 0
+
+        def preparar():
+            db.purgar_cambios()
+            return db.ultimo_cambio()
+
+        self.tareas.ejecutar(preparar, al_terminar=self._iniciar_sincronizacion)
+
+    def _al_cambiar_pestana(self, _evento=None):
+        actual = self.tabs.select()
+        construir = self._pestanas_pendientes.pop(actual, None)
+        if construir:
+            construir()
+        if actual == str(self.frame_panel):
+            self.refrescar_panel()
+
+    def _registrar_tabla(self, nombre: str, tabla: TablaVirtual, buscador: Optional["CajaBusqueda"] = None):
+        """Suma la tabla de una pestaña recién construida a la sincronización y la llena."""
+        self._tablas[nombre] = tabla
+        if buscador is not None:
+            self._buscadores[nombre] = buscador
+        if self.ultimo_cambio is not None:
+            tabla.refrescar()  # si no, la llena _iniciar_sincronizacion
+
+    # ---------------- Sincronización incremental ----------------
+    def _iniciar_sincronizacion(self, seq: int):
+        """Carga las tablas completas una vez y desde ahí solo aplica cambios."""
+        self.ultimo_cambio = seq
+        for tabla in self._tablas.values():
+            tabla.refrescar()
+        self._programar_sincronizacion()
+
+    def _programar_sincronizacion(self):
+        def tic():
+            # El tic no cuenta como actividad: una sesión ociosa expira igual
+            if not self.sesion_vigente(renovar=False):
+                return
+            self.sincronizar()
+            self._programar_sincronizacion()
+        self._sincronizacion = self.after(INTERVALO_SINCRONIZACION_MS, tic)
+
+    def sincronizar(self):
+        """Aplica a las tablas solo los cambios registrados desde la última sincronización."""
+        if self.ultimo_cambio is None:
+            return
+        desde = self.ultimo_cambio
+        self._sincronizaciones += 1
+        purgar = self._sincronizaciones % PURGA_CAMBIOS_CADA == 0
+
+        def leer():
+            if purgar:
+                # Conserva los últimos cambios: si alguien se atrasa más, recarga todo
+                db.purgar_cambios()
+            cambios = db.cambios_desde(desde, limite=LIMITE_CAMBIOS_INCREMENTAL + 1)
+            if len(cambios) > LIMITE_CAMBIOS_INCREMENTAL or db.cambios_perdidos(desde):
+                return desde, db.ultimo_cambio(), None
+            if not cambios:
+                return desde, desde, {}
+            por_tabla = {}
+            for _seq, tabla, fila_id, operacion in cambios:
+                por_tabla.setdefault(tabla, []).append((fila_id, operacion))
+            filas = {tabla: db.obtener_filas(tabla, [i for i, op in lista if op == "U"])
+                     for tabla, lista in por_tabla.items()}
+            return desde, cambios[-1][0], {t: (lista, filas[t]) for t, lista in por_tabla.items()}
+
+        self.tareas.ejecutar(leer, clave="sincronizar", al_terminar=self._aplicar_sincronizacion)
+
+    def _aplicar_sincronizacion(self, resultado):
+        desde, hasta, por_tabla = resultado
+        if desde != self.ultimo_cambio:
+            return  # otra sincronización ya avanzó; la próxima retoma desde ahí
+        self.ultimo_cambio = hasta
+        if por_tabla is None:
+            for nombre in self._tablas:
+                self._recargar(nombre)
+            return
+        for nombre, (cambios, filas) in por_tabla.items():
+            if nombre in self._buscadores and self._buscadores[nombre].texto:
+                self.buscar(nombre)
+            elif nombre in self._tablas:
+                self._tablas[nombre].aplicar_cambios(cambios, filas)
+
+    def _recargar(self, nombre: str):
+        if nombre in self._buscadores and self._buscadores[nombre].texto:
+            self.buscar(nombre)
+        else:
+            self._tablas[nombre].refrescar()
+
+    # ---------------- Búsqueda ----------------
+    def buscar(self, nombre: str):
+        """Muestra en la tabla `nombre` los resultados de su caja de búsqueda (o la tabla completa)."""
+        texto = self._buscadores[nombre].texto
+        tabla = self._tablas[nombre]
+        if not texto:
+            tabla.mostrar_filas(None)
+            return
+
+        def mostrar(filas):
+            if self._buscadores[nombre].texto == texto:  # ignorar resultados de búsquedas ya superadas
+                tabla.mostrar_filas(filas)
+
+        self.tareas.ejecutar(db.buscar, texto, nombre, clave=("buscar", nombre), al_terminar=mostrar,
+                             al_fallar=mostrar_error("No se pudo buscar"))
+
+    def _mostrar_ocupado(self, ocupado: bool, pendientes: int):
+        """Indicador de ocupado: cursor de espera y cantidad de tareas en curso."""
+        self.config(cursor="watch" if ocupado else "")
+        self.lbl_ocupado.config(text=f"Procesando... ({pendientes})" if ocupado else "")
+
+    def sesion_vigente(self, renovar: bool = True) -> bool:
+        """Comprueba en memoria que la sesión del Login siga válida.
+
+        Si expiró o fue invalidada (p. ej. se editó o eliminó al empleado), avisa,
+        cierra la ventana y `iniciar_aplicacion` vuelve a mostrar el Login. Sin
+        token (aplicación abierta sin Login) no hay nada que comprobar.
+        """
+        if self.token_sesion is None:
+            return True
+        try:
+            sesiones.obtener_almacen().exigir_rol(self.token_sesion, renovar=renovar)
+            return True
+        except sesiones.SesionError as e:
+            if not self.volver_al_login:
+                self.volver_al_login = True
+                messagebox.showwarning("🔒 Sesión finalizada", str(e))
+                self._al_cerrar()
+            return False
+
+    def _al_cerrar(self):
+        if self._sincronizacion is not None:
+            self.after_cancel(self._sincronizacion)
+        self.tareas.cancelar_todo()
+        self.tareas.cerrar()
+        sesiones.obtener_almacen().cerrar(self.token_sesion)
+        self.destroy()
 
     # ---------------- Empleados ----------------
     def _construir_tab_empleados(self):
@@ -63,11 +311,15 @@ class Aplicacion(tk.Tk):
         lista_frame = ttk.LabelFrame(frame, text="Empleados registrados")
         lista_frame.pack(fill="both", expand=1, padx=10, pady=10)
 
-        self.lista_empleados = tk.Listbox(lista_frame)
-        self.lista_empleados.pack(side="left", fill="both", expand=1)
-        scrollbar = ttk.Scrollbar(lista_frame, orient="vertical", command=self.lista_empleados.yview)
-        scrollbar.pack(side="right", fill="y")
-        self.lista_empleados.config(yscrollcommand=scrollbar.set)
+        self.buscar_empleados = CajaBusqueda(lista_frame, lambda _: self.buscar("empleados"))
+        self.buscar_empleados.pack(fill="x", pady=(0, 4))
+        self.tabla_empleados = crear_tabla(lista_frame, "empleados", [
+            ("id", "ID", 50), ("nombre", "Nombre", 150), ("direccion", "Dirección", 150),
+            ("telefono", "Teléfono", 100), ("email", "Email", 180), ("salario", "Salario", 80),
+            ("departamento_id", "Dep.", 50),
+        ], ejecutor=self.tareas)
+        self.tabla_empleados.pack(fill="both", expand=1)
+        self._registrar_tabla("empleados", self.tabla_empleados, self.buscar_empleados)
 
         ttk.Button(frame, text="Refrescar lista", command=self.refrescar_lista_empleados).pack(pady=5)
         # Botones para acciones sobre empleado seleccionado
@@ -76,9 +328,9 @@ class Aplicacion(tk.Tk):
         ttk.Button(acciones_frame, text="Editar seleccionado", command=self.editar_empleado_seleccionado).pack(side="left", padx=6)
         ttk.Button(acciones_frame, text="Eliminar seleccionado", command=self.eliminar_empleado_seleccionado).pack(side="left", padx=6)
 
-        self.refrescar_lista_empleados()
-
     def crear_empleado(self):
+        if not self.sesion_vigente():
+            return
         nombre = self.entradas["Nombre"].get()
         direccion = self.entradas["Dirección"].get()
         telefono = self.entradas["Teléfono"].get()
@@ -104,9 +356,6 @@ class Aplicacion(tk.Tk):
             messagebox.showerror("Error", "La contraseña es obligatoria.")
             return
 
-        # Hash de contraseña
-        hash_pw = db.hash_contrasena(contrasena)
-
         # convertir departamento_id a int o None
         if departamento_id:
             try:
@@ -117,73 +366,40 @@ class Aplicacion(tk.Tk):
         else:
             departamento_id = None
 
-        try:
-            db.agregar_empleado(nombre, direccion, telefono, email, salario_f, hash_pw, departamento_id)
+        def guardar():
+            # Hash de contraseña
+            hash_pw = db.hash_contrasena(contrasena)
+            return db.agregar_empleado(nombre, direccion, telefono, email, salario_f, hash_pw, departamento_id)
+
+        def listo(_):
             messagebox.showinfo("Éxito", "Empleado creado correctamente.")
-            self.refrescar_lista_empleados()
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo crear empleado: {e}")
+            self.sincronizar()
 
-    def _parsear_id_desde_linea(self, linea: str) -> Optional[int]:
-        """Parsea una línea de la lista (formato '#id - ...') y devuelve el id como int."""
-        try:
-            if linea.startswith("#"):
-                parte = linea.split("-", 1)[0].strip()
-                return int(parte.lstrip("#"))
-        except Exception:
-            return None
-        return None
+        self.tareas.ejecutar(guardar, al_terminar=listo, al_fallar=mostrar_error("No se pudo crear empleado"))
 
     def editar_empleado_seleccionado(self):
-        sel = self.lista_empleados.curselection()
-        if not sel:
+        fila = self.tabla_empleados.seleccion()
+        if not fila:
             messagebox.showwarning("Atención", "Seleccione un empleado para editar.")
             return
-        linea = self.lista_empleados.get(sel[0])
-        emp_id = self._parsear_id_desde_linea(linea)
-        if emp_id is None:
-            messagebox.showerror("Error", "No se pudo obtener el ID del empleado seleccionado.")
-            return
+        emp_id = fila[0]
 
-        datos = db.obtener_empleado_por_email(linea.split("|")[1].split("-")[-1].strip())
-        # Si no conseguimos por email, obtendremos desde la lista completa
-        if not datos:
-            # buscar en listar_empleados
-            for e in db.listar_empleados():
-                if e[0] == emp_id:
-                    datos = e
-                    break
-
-        if not datos:
-            messagebox.showerror("Error", "No se encontraron datos del empleado.")
-            return
+        def abrir(datos):
+            if not datos:
+                messagebox.showerror("Error", "No se encontraron datos del empleado.")
+                return
+            self._abrir_editor_empleado(emp_id, datos)
 
-        # Datos: (id, nombre, direccion, telefono, email, salario, password_hash, departamento_id?) or listar_empleados form
-        # Intentar adaptar
-        if len(datos) >= 7 and isinstance(datos[0], int):
-            # usar obtener_por_email ruta (full)
-            try:
-                emp_full = db.obtener_empleado_por_email(datos[4])
-            except Exception:
-                emp_full = None
-        else:
-            emp_full = None
+        self.tareas.ejecutar(db.obtener_empleado, emp_id, al_terminar=abrir,
+                             al_fallar=mostrar_error("No se pudo leer el empleado"))
 
+    def _abrir_editor_empleado(self, emp_id: int, datos):
+        """Construye la ventana de edición con `datos` (fila completa de empleados)."""
         # Build editor
         editor = tk.Toplevel(self)
         editor.title("Editar empleado")
 
-        # Obtener valores base
-        # Intentar leer desde listar_empleados si emp_full no proporciona todo
-        if emp_full:
-            _, nombre, direccion, telefono, email, salario, password_hash, departamento_id = emp_full
-        else:
-            # fallback
-            for e in db.listar_empleados():
-                if e[0] == emp_id:
-                    _, nombre, direccion, telefono, email, salario, departamento_id = e
-                    password_hash = None
-                    break
+        _, nombre, direccion, telefono, email, salario, _password_hash, departamento_id = datos
 
         campos = {
             'Nombre': nombre,
@@ -207,6 +423,8 @@ class Aplicacion(tk.Tk):
         ent_pw.grid(row=len(campos), column=1, sticky='ew', padx=6, pady=3)
 
         def guardar_cambios():
+            if not self.sesion_vigente():
+                return
             try:
                 nuevo_nombre = entradas['Nombre'].get()
                 nueva_dir = entradas['Dirección'].get()
@@ -216,49 +434,57 @@ class Aplicacion(tk.Tk):
                 nuevo_dep = entradas['Departamento ID'].get() or None
                 if nuevo_dep is not None:
                     nuevo_dep = int(nuevo_dep)
+            except Exception as err:
+                messagebox.showerror('Error', f'No se pudo actualizar: {err}')
+                return
+            nueva_pw = ent_pw.get()
 
+            def guardar():
                 db.actualizar_empleado(emp_id, nuevo_nombre, nueva_dir, nuevo_tel, nuevo_email, nuevo_sal, nuevo_dep)
-                nueva_pw = ent_pw.get()
                 if nueva_pw:
                     db.actualizar_contrasena_empleado(emp_id, nueva_pw)
+                # Sus sesiones abiertas guardan datos viejos: deberá volver a ingresar
+                sesiones.obtener_almacen().invalidar_usuario("empleado", emp_id)
+
+            def listo(_):
                 messagebox.showinfo('Éxito', 'Empleado actualizado')
                 editor.destroy()
-                self.refrescar_lista_empleados()
-            except Exception as err:
-                messagebox.showerror('Error', f'No se pudo actualizar: {err}')
+                self.sincronizar()
+
+            self.tareas.ejecutar(guardar, al_terminar=listo, al_fallar=mostrar_error('No se pudo actualizar'))
 
         ttk.Button(editor, text='Guardar', command=guardar_cambios).grid(row=len(campos)+1, column=0, columnspan=2, pady=8)
 
     def eliminar_empleado_seleccionado(self):
-        sel = self.lista_empleados.curselection()
-        if not sel:
-            messagebox.showwarning('Atención', 'Seleccione un empleado para eliminar.')
+        if not self.sesion_vigente():
             return
-        linea = self.lista_empleados.get(sel[0])
-        emp_id = self._parsear_id_desde_linea(linea)
-        if emp_id is None:
-            messagebox.showerror('Error', 'No se pudo obtener el ID del empleado seleccionado.')
+        fila = self.tabla_empleados.seleccion()
+        if not fila:
+            messagebox.showwarning('Atención', 'Seleccione un empleado para eliminar.')
             return
+        emp_id = fila[0]
 
-        if not messagebox.askyesno('Confirmar', f'¿Eliminar empleado #{emp_id}? Esta acción es irreversible.'):
-            return
-        try:
-            db.eliminar_empleado(emp_id)
+        def confirmar(datos):
+            # Se confirma con los datos actuales de la BD, no con la fila mostrada
+            if not datos:
+                messagebox.showwarning('Atención', f'El empleado #{emp_id} ya no existe.')
+                self.sincronizar()
+                return
+            if not messagebox.askyesno('Confirmar', f'¿Eliminar empleado #{emp_id} ({datos[1]})? Esta acción es irreversible.'):
+                return
+            self.tareas.ejecutar(db.eliminar_empleado, emp_id, al_terminar=listo,
+                                 al_fallar=mostrar_error('No se pudo eliminar empleado'))
+
+        def listo(_):
+            sesiones.obtener_almacen().invalidar_usuario("empleado", emp_id)
             messagebox.showinfo('Éxito', 'Empleado eliminado.')
-            self.refrescar_lista_empleados()
-        except Exception as e:
-            messagebox.showerror('Error', f'No se pudo eliminar empleado: {e}')
+            self.sincronizar()
+
+        self.tareas.ejecutar(db.obtener_empleado, emp_id, al_terminar=confirmar,
+                             al_fallar=mostrar_error('No se pudo leer el empleado'))
 
     def refrescar_lista_empleados(self):
-        self.lista_empleados.delete(0, tk.END)
-        try:
-            empleados = db.listar_empleados()
-            for emp in empleados:
-                id_e, nombre, direccion, telefono, email, salario, dep = emp
-                texto = f"#{id_e} - {nombre} | {email} | Salario: {salario} | Dep: {dep or 'N/A'}"
-                self.lista_empleados.insert(tk.END, texto)
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo listar empleados: {e}")
+        self._recargar("empleados")
 
     # ---------------- Departamentos ----------------
     def _construir_tab_departamentos(self):
@@ -272,74 +498,83 @@ class Aplicacion(tk.Tk):
         formulario.columnconfigure(1, weight=1)
         ttk.Button(formulario, text="Crear departamento", command=self.crear_departamento).grid(row=1, column=0, columnspan=2, pady=6)
 
-        self.lista_departamentos = tk.Listbox(frame)
-        self.lista_departamentos.pack(fill="both", expand=1, padx=10, pady=10)
+        self.buscar_departamentos = CajaBusqueda(frame, lambda _: self.buscar("departamentos"))
+        self.buscar_departamentos.pack(fill="x", padx=10)
+        self.tabla_departamentos = crear_tabla(frame, "departamentos", [
+            ("id", "ID", 50), ("nombre", "Nombre", 250), ("id_gerente", "Gerente", 80),
+        ], ejecutor=self.tareas)
+        self.tabla_departamentos.pack(fill="both", expand=1, padx=10, pady=10)
+        self._registrar_tabla("departamentos", self.tabla_departamentos, self.buscar_departamentos)
         botones_dep = ttk.Frame(frame)
         botones_dep.pack()
         ttk.Button(botones_dep, text="Refrescar departamentos", command=self.refrescar_departamentos).pack(side="left", padx=4)
         ttk.Button(botones_dep, text="Asignar gerente", command=self.asignar_gerente_seleccionado).pack(side="left", padx=4)
         ttk.Button(botones_dep, text="Eliminar departamento", command=self.eliminar_departamento_seleccionado).pack(side="left", padx=4)
-        self.refrescar_departamentos()
 
     def crear_departamento(self):
+        if not self.sesion_vigente():
+            return
         nombre = self.ent_dep_nombre.get()
         if not validaciones.validar_no_vacio(nombre):
             messagebox.showerror("Error", "El nombre del departamento no puede estar vacío.")
             return
-        try:
-            db.agregar_departamento(nombre)
+        def listo(_):
             messagebox.showinfo("Éxito", "Departamento creado.")
-            self.refrescar_departamentos()
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo crear departamento: {e}")
+            self.sincronizar()
+
+        self.tareas.ejecutar(db.agregar_departamento, nombre, al_terminar=listo,
+                             al_fallar=mostrar_error("No se pudo crear departamento"))
 
     def refrescar_departamentos(self):
-        self.lista_departamentos.delete(0, tk.END)
-        for dep in db.listar_departamentos():
-            id_d, nombre, id_gerente = dep
-            self.lista_departamentos.insert(tk.END, f"#{id_d} - {nombre} | Gerente: {id_gerente or 'N/A'}")
+        self._recargar("departamentos")
 
     def asignar_gerente_seleccionado(self):
-        sel = self.lista_departamentos.curselection()
-        if not sel:
-            messagebox.showwarning('Atención', 'Seleccione un departamento.')
+        if not self.sesion_vigente():
             return
-        linea = self.lista_departamentos.get(sel[0])
-        try:
-            id_dep = int(linea.split('-')[0].strip().lstrip('#'))
-        except Exception:
-            messagebox.showerror('Error', 'No se pudo obtener el ID del departamento.')
+        fila = self.tabla_departamentos.seleccion()
+        if not fila:
+            messagebox.showwarning('Atención', 'Seleccione un departamento.')
             return
+        id_dep = fila[0]
 
+        from tkinter import simpledialog
         gerente_id = simpledialog.askinteger('Gerente', 'Ingrese ID de empleado que será gerente (vacío para eliminar):', parent=self)
-        try:
+        def asignar():
+            if gerente_id is not None and db.obtener_empleado(gerente_id) is None:
+                raise ValueError(f'No existe el empleado #{gerente_id}')
             db.asignar_gerente_departamento(id_dep, gerente_id)
+
+        def listo(_):
             messagebox.showinfo('Éxito', 'Gerente asignado.')
-            self.refrescar_departamentos()
-        except Exception as e:
-            messagebox.showerror('Error', f'No se pudo asignar gerente: {e}')
+            self.sincronizar()
+
+        self.tareas.ejecutar(asignar, al_terminar=listo, al_fallar=mostrar_error('No se pudo asignar gerente'))
 
     def eliminar_departamento_seleccionado(self):
-        sel = self.lista_departamentos.curselection()
-        if not sel:
-            messagebox.showwarning('Atención', 'Seleccione un departamento para eliminar.')
+        if not self.sesion_vigente():
             return
-        linea = self.lista_departamentos.get(sel[0])
-        try:
-            id_dep = int(linea.split('-')[0].strip().lstrip('#'))
-        except Exception:
-            messagebox.showerror('Error', 'No se pudo obtener el ID del departamento.')
+        fila = self.tabla_departamentos.seleccion()
+        if not fila:
+            messagebox.showwarning('Atención', 'Seleccione un departamento para eliminar.')
             return
+        id_dep = fila[0]
 
-        if not messagebox.askyesno('Confirmar', f'¿Eliminar departamento #{id_dep}?'):
-            return
-        try:
-            db.eliminar_departamento(id_dep)
+        def confirmar(datos):
+            if not datos:
+                messagebox.showwarning('Atención', f'El departamento #{id_dep} ya no existe.')
+                self.sincronizar()
+                return
+            if not messagebox.askyesno('Confirmar', f'¿Eliminar departamento #{id_dep} ({datos[1]})?'):
+                return
+            self.tareas.ejecutar(db.eliminar_departamento, id_dep, al_terminar=listo,
+                                 al_fallar=mostrar_error('No se pudo eliminar departamento'))
+
+        def listo(_):
             messagebox.showinfo('Éxito', 'Departamento eliminado.')
-            self.refrescar_departamentos()
-            self.refrescar_lista_empleados()
-        except Exception as e:
-            messagebox.showerror('Error', f'No se pudo eliminar departamento: {e}')
+            self.sincronizar()
+
+        self.tareas.ejecutar(db.obtener_departamento, id_dep, al_terminar=confirmar,
+                             al_fallar=mostrar_error('No se pudo leer el departamento'))
 
     # ---------------- Proyectos ----------------
     def _construir_tab_proyectos(self):
@@ -356,29 +591,32 @@ class Aplicacion(tk.Tk):
         formulario.columnconfigure(1, weight=1)
         ttk.Button(formulario, text="Crear proyecto", command=self.crear_proyecto).grid(row=2, column=0, columnspan=2, pady=6)
 
-        self.lista_proyectos = tk.Listbox(frame)
-        self.lista_proyectos.pack(fill="both", expand=1, padx=10, pady=10)
+        self.buscar_proyectos = CajaBusqueda(frame, lambda _: self.buscar("proyectos"))
+        self.buscar_proyectos.pack(fill="x", padx=10)
+        self.tabla_proyectos = crear_tabla(frame, "proyectos", [
+            ("id", "ID", 50), ("nombre", "Nombre", 200), ("descripcion", "Descripción", 350),
+        ], ejecutor=self.tareas)
+        self.tabla_proyectos.pack(fill="both", expand=1, padx=10, pady=10)
+        self._registrar_tabla("proyectos", self.tabla_proyectos, self.buscar_proyectos)
         ttk.Button(frame, text="Refrescar proyectos", command=self.refrescar_proyectos).pack()
-        self.refrescar_proyectos()
 
     def crear_proyecto(self):
+        if not self.sesion_vigente():
+            return
         nombre = self.ent_proj_nombre.get()
         descripcion = self.ent_proj_desc.get()
         if not validaciones.validar_no_vacio(nombre):
             messagebox.showerror("Error", "Nombre de proyecto obligatorio.")
             return
-        try:
-            db.agregar_proyecto(nombre, descripcion)
+        def listo(_):
             messagebox.showinfo("Éxito", "Proyecto creado.")
-            self.refrescar_proyectos()
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo crear proyecto: {e}")
+            self.sincronizar()
+
+        self.tareas.ejecutar(db.agregar_proyecto, nombre, descripcion, al_terminar=listo,
+                             al_fallar=mostrar_error("No se pudo crear proyecto"))
 
     def refrescar_proyectos(self):
-        self.lista_proyectos.delete(0, tk.END)
-        for p in db.listar_proyectos():
-            id_p, nombre, desc = p
-            self.lista_proyectos.insert(tk.END, f"#{id_p} - {nombre} | {desc}")
+        self._recargar("proyectos")
 
     # ---------------- Registros de tiempo ----------------
     def _construir_tab_registros(self):
@@ -402,15 +640,24 @@ class Aplicacion(tk.Tk):
         formulario.columnconfigure(1, weight=1)
         ttk.Button(formulario, text="Registrar horas", command=self.crear_registro).grid(row=4, column=0, columnspan=2, pady=6)
 
-        self.lista_registros = tk.Listbox(frame)
-        self.lista_registros.pack(fill="both", expand=1, padx=10, pady=10)
+        self.tabla_registros = crear_tabla(frame, "registros_tiempo", [
+            ("id", "ID", 60), ("empleado_id", "Empleado", 80), ("proyecto_id", "Proyecto", 80),
+            ("fecha", "Fecha", 100), ("horas", "Horas", 60),
+        ], ejecutor=self.tareas)
+        self.tabla_registros.pack(fill="both", expand=1, padx=10, pady=10)
+        self._registrar_tabla("registros_tiempo", self.tabla_registros)
         botones_reg = ttk.Frame(frame)
         botones_reg.pack()
         ttk.Button(botones_reg, text="Refrescar registros", command=self.refrescar_registros).pack(side="left", padx=4)
-        ttk.Button(botones_reg, text="Exportar Reporte", command=self.exportar_reporte).pack(side="left", padx=4)
-        self.refrescar_registros()
+        ttk.Button(botones_reg, text="Planilla semanal", command=lambda: VentanaPlanilla(self)).pack(side="left", padx=4)
+        self.btn_exportar = ttk.Button(botones_reg, text="Exportar Reporte", command=self.exportar_reporte)
+        self.btn_exportar.pack(side="left", padx=4)
+        self.lbl_estado_reg = ttk.Label(botones_reg, text="")
+        self.lbl_estado_reg.pack(side="left", padx=4)
 
     def crear_registro(self):
+        if not self.sesion_vigente():
+            return
         emp = self.ent_reg_emp.get()
         proj = self.ent_reg_proj.get()
         fecha = self.ent_reg_fecha.get()
@@ -431,60 +678,287 @@ class Aplicacion(tk.Tk):
             messagebox.showerror("Error", "Horas inválidas. Deben estar entre 0 y 24.")
             return
 
-        try:
-            db.agregar_registro_tiempo(emp_id, proj_id, fecha, float(horas))
+        def listo(_):
             messagebox.showinfo("Éxito", "Registro agregado.")
-            self.refrescar_registros()
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo agregar registro: {e}")
+            self.sincronizar()
+
+        self.tareas.ejecutar(db.agregar_registro_tiempo, emp_id, proj_id, fecha, float(horas), al_terminar=listo,
+                             al_fallar=mostrar_error("No se pudo agregar registro"))
 
     def refrescar_registros(self):
-        self.lista_registros.delete(0, tk.END)
-        for r in db.listar_registros():
-            idr, emp, proj, fecha, horas = r
-            self.lista_registros.insert(tk.END, f"#{idr} - Emp:{emp} | Proj:{proj} | {fecha} | {horas}h")
+        self.tabla_registros.refrescar()
 
     def exportar_reporte(self):
-        """Exporta todos los registros de tiempo a CSV compatible con Excel.
-        
-        TAREA 2: Genera 'reporte_timesheets.csv' e intenta abrirlo automáticamente.
+        """Exporta los registros de tiempo a CSV (Excel), CSV comprimido o NDJSON.
+
+        TAREA 2: el archivo se genera en un hilo aparte con el módulo `exportacion`
+        (sin bloquear la ventana) y al terminar se intenta abrir automáticamente.
         """
+        from tkinter import filedialog
+        import exportacion
+        ruta = filedialog.asksaveasfilename(
+            parent=self,
+            title="Exportar reporte",
+            initialdir=os.path.dirname(os.path.abspath(__file__)),
+            initialfile="reporte_timesheets.csv",
+            defaultextension=".csv",
+            filetypes=[("CSV (Excel)", "*.csv"), ("CSV comprimido", "*.csv.gz"), ("NDJSON", "*.ndjson")],
+        )
+        if not ruta:
+            return
+
+        def trabajo():
+            tarea = tarea_actual()
+
+            def progreso(escritas, total):
+                tarea.avisar_progreso(escritas, total)
+                return not tarea.cancelada
+
+            return exportacion.exportar_registros(ruta, progreso=progreso)
+
+        def avance(escritas, total):
+            self.lbl_estado_reg.config(text=f"Exportando... {escritas}/{total} filas")
+
+        def fin():
+            self.btn_exportar.config(text="Exportar Reporte", command=self.exportar_reporte)
+            self.lbl_estado_reg.config(text="")
+
+        def listo(filas):
+            fin()
+            messagebox.showinfo("✓ Exportado", f"Reporte generado exitosamente ({filas} filas):\n{ruta}\n\nAbriéndolo automáticamente...")
+            abrir_archivo(ruta)
+
+        def fallo(e):
+            fin()
+            if not isinstance(e, exportacion.ExportacionCancelada):
+                messagebox.showerror("Error", f"No se pudo exportar el reporte: {e}")
+
+        tarea = self.tareas.ejecutar(trabajo, al_terminar=listo, al_fallar=fallo, al_progreso=avance)
+
+        def cancelar():
+            tarea.cancelar()
+            fin()
+
+        self.btn_exportar.config(text="Cancelar exportación", command=cancelar)
+        self.lbl_estado_reg.config(text="Exportando...")
+
+    # ---------------- Panel ----------------
+    def _construir_tab_panel(self):
+        frame = self.frame_panel
+        cabecera = ttk.Frame(frame)
+        cabecera.pack(fill="x", padx=10, pady=6)
+        self.lbl_panel = ttk.Label(cabecera, text="")
+        self.lbl_panel.pack(side="left")
+        ttk.Button(cabecera, text="Actualizar", command=lambda: self.refrescar_panel(usar_cache=False)).pack(side="right")
+
+        cuerpo = ttk.Frame(frame)
+        cuerpo.pack(fill="both", expand=1, padx=10, pady=4)
+        cuerpo.columnconfigure((0, 1), weight=1)
+        cuerpo.rowconfigure((0, 1), weight=1)
+
+        def cuadro(fila, columna, titulo, columnas):
+            marco = ttk.LabelFrame(cuerpo, text=titulo)
+            marco.grid(row=fila, column=columna, sticky="nsew", padx=4, pady=4)
+            arbol = ttk.Treeview(marco, columns=[c for c, _ in columnas], show="headings", height=6)
+            for clave, ancho in columnas:
+                arbol.heading(clave, text=clave)
+                arbol.column(clave, width=ancho, stretch=True)
+            arbol.pack(fill="both", expand=1)
+            return arbol
+
+        self.arbol_horas_proyecto = cuadro(0, 0, "Horas por proyecto (semana)",
+                                           [("Proyecto", 160), ("Horas", 70), ("Registros", 70)])
+        self.arbol_top_empleados = cuadro(0, 1, "Empleados con más horas",
+                                          [("Empleado", 180), ("Horas", 70)])
+        self.arbol_utilizacion = cuadro(1, 0, "Utilización por departamento",
+                                        [("Departamento", 140), ("Empleados", 70), ("Horas", 60), ("Uso", 60)])
+        self.arbol_costo = cuadro(1, 1, "Costo por proyecto (salario × horas)",
+                                  [("Proyecto", 160), ("Horas", 70), ("Costo", 90)])
+
+    def refrescar_panel(self, usar_cache: bool = True):
+        """Calcula las cifras del panel en segundo plano (reutiliza las recientes si `usar_cache`)."""
+        self.tareas.ejecutar(reportes.panel, usar_cache=usar_cache, clave="panel", al_terminar=self._mostrar_panel,
+                             al_fallar=mostrar_error("No se pudo calcular el panel"))
+
+    def _mostrar_panel(self, datos):
+        self.lbl_panel.config(text=f"Semana del {datos['desde']} al {datos['hasta']}")
+
+        def llenar(arbol, filas):
+            arbol.delete(*arbol.get_children())
+            for fila in filas:
+                arbol.insert("", "end", values=["N/A" if v is None else v for v in fila])
+
+        llenar(self.arbol_horas_proyecto, [(f[1], f"{f[2]:.1f}", f[4]) for f in datos["horas_proyecto"]])
+        llenar(self.arbol_top_empleados, [(f[1], f"{f[2]:.1f}") for f in datos["top_empleados"]])
+        llenar(self.arbol_utilizacion, [(f[1], f[2], f"{f[3]:.1f}", None if f[5] is None else f"{f[5]:.0%}")
+                                        for f in datos["utilizacion"]])
+        llenar(self.arbol_costo, [(f[1], f"{f[2]:.1f}", f"{f[3]:,.0f}") for f in datos["costo_proyecto"]])
+
+
+class VentanaPlanilla(tk.Toplevel):
+    """Planilla tipo hoja de cálculo para cargar una semana de horas de un equipo.
+
+    Cada fila es (empleado, proyecto) con las horas de lunes a domingo. Al guardar
+    se validan todas las filas juntas y, si alguna tiene errores, se marcan en su
+    fila y no se guarda nada; si no, se guarda todo en una transacción.
+    """
+    FILAS_INICIALES = 10
+
+    def __init__(self, app: "Aplicacion"):
+        super().__init__(app)
+        self.app = app
+        self.title("Planilla semanal de horas")
+        self.geometry("900x500")
+        self.filas = []  # [(entrada_emp, entrada_proj, [entradas de horas], etiqueta_error)]
+
+        cabecera = ttk.Frame(self)
+        cabecera.pack(fill="x", padx=10, pady=6)
+        ttk.Label(cabecera, text="Semana (cualquier fecha, YYYY-MM-DD)").pack(side="left")
+        self.ent_fecha = ttk.Entry(cabecera, width=12)
+        self.ent_fecha.insert(0, reportes.semana_de()[0])
+        self.ent_fecha.pack(side="left", padx=4)
+        ttk.Label(cabecera, text="Departamento ID").pack(side="left", padx=(12, 0))
+        self.ent_dep = ttk.Entry(cabecera, width=6)
+        self.ent_dep.pack(side="left", padx=4)
+        ttk.Button(cabecera, text="Cargar equipo", command=self.cargar_equipo).pack(side="left")
+
+        # Área desplazable con la grilla de entradas
+        contenedor = ttk.Frame(self)
+        contenedor.pack(fill="both", expand=1, padx=10)
+        lienzo = tk.Canvas(contenedor, highlightthickness=0)
+        barra = ttk.Scrollbar(contenedor, orient="vertical", command=lienzo.yview)
+        self.grilla = ttk.Frame(lienzo)
+        self.grilla.bind("<Configure>", lambda e: lienzo.configure(scrollregion=lienzo.bbox("all")))
+        lienzo.create_window((0, 0), window=self.grilla, anchor="nw")
+        lienzo.configure(yscrollcommand=barra.set)
+        lienzo.pack(side="left", fill="both", expand=1)
+        barra.pack(side="right", fill="y")
+
+        for col, titulo in enumerate(("Empleado ID", "Proyecto ID") + planilla.DIAS_SEMANA + ("Errores",)):
+            ttk.Label(self.grilla, text=titulo).grid(row=0, column=col, padx=2)
+        for _ in range(self.FILAS_INICIALES):
+            self.agregar_fila()
+
+        pie = ttk.Frame(self)
+        pie.pack(fill="x", padx=10, pady=6)
+        ttk.Button(pie, text="Agregar fila", command=self.agregar_fila).pack(side="left")
+        self.btn_guardar = ttk.Button(pie, text="Guardar todo", command=self.guardar)
+        self.btn_guardar.pack(side="right")
+        self.lbl_estado = ttk.Label(pie, text="")
+        self.lbl_estado.pack(side="right", padx=8)
+
+    def agregar_fila(self, empleado_id="", proyecto_id=""):
+        fila = len(self.filas) + 1
+        ent_emp = ttk.Entry(self.grilla, width=10)
+        ent_emp.insert(0, "" if empleado_id is None else str(empleado_id))
+        ent_emp.grid(row=fila, column=0, padx=2, pady=1)
+        ent_proj = ttk.Entry(self.grilla, width=10)
+        ent_proj.insert(0, "" if proyecto_id is None else str(proyecto_id))
+        ent_proj.grid(row=fila, column=1, padx=2, pady=1)
+        horas = []
+        for dia in range(7):
+            ent = ttk.Entry(self.grilla, width=6)
+            ent.grid(row=fila, column=2 + dia, padx=1, pady=1)
+            horas.append(ent)
+        lbl_error = tk.Label(self.grilla, text="", fg="red", anchor="w", justify="left")
+        lbl_error.grid(row=fila, column=9, sticky="w", padx=4)
+        self.filas.append((ent_emp, ent_proj, horas, lbl_error))
+
+    def cargar_equipo(self):
+        """Reemplaza las filas vacías por (empleado, proyecto) del departamento indicado."""
         try:
-            registros = db.listar_registros()
-            ruta = os.path.join(os.path.dirname(__file__), "reporte_timesheets.csv")
-            
-            with open(ruta, mode='w', newline='', encoding='utf-8') as f:
-                escritor = csv.writer(f)
-                escritor.writerow(["ID", "Empleado ID", "Proyecto ID", "Fecha", "Horas"])
-                for reg in registros:
-                    escritor.writerow(reg)
-            
-            messagebox.showinfo("✓ Exportado", f"Reporte generado exitosamente:\n{ruta}\n\nAbriéndolo automáticamente...")
-            
-            # Abrir automáticamente el archivo CSV (Windows)
-            os.system(f'start "" "{ruta}"')
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo exportar el reporte: {e}")
-
-
-def iniciar_aplicacion():
-    app = Aplicacion()
+            dep_id = int(self.ent_dep.get())
+        except ValueError:
+            messagebox.showerror("Error", "Departamento ID debe ser un entero.", parent=self)
+            return
+
+        def mostrar(pares):
+            if not pares:
+                messagebox.showinfo("Planilla", "El departamento no tiene empleados.", parent=self)
+                return
+            libres = [f for f in self.filas if not f[0].get().strip() and not f[1].get().strip()]
+            for emp_id, proj_id in pares:
+                if libres:
+                    ent_emp, ent_proj, _, _ = libres.pop(0)
+                    ent_emp.insert(0, str(emp_id))
+                    ent_proj.insert(0, "" if proj_id is None else str(proj_id))
+                else:
+                    self.agregar_fila(emp_id, proj_id)
+
+        self.app.tareas.ejecutar(planilla.filas_equipo, dep_id, al_terminar=mostrar,
+                                 al_fallar=mostrar_error("No se pudo cargar el equipo"))
+
+    def guardar(self):
+        if not self.app.sesion_vigente():
+            return
+        fecha = self.ent_fecha.get().strip()
+        if not validaciones.validar_fecha_iso(fecha):
+            messagebox.showerror("Error", "Fecha inválida. Use formato YYYY-MM-DD.", parent=self)
+            return
+        datos = [(e.get(), p.get(), [h.get() for h in horas]) for e, p, horas, _ in self.filas]
+        self.btn_guardar.config(state="disabled")
+        self.lbl_estado.config(text="Guardando...")
+
+        def listo(resultado):
+            self.btn_guardar.config(state="normal")
+            guardados, errores = resultado
+            for indice, (_, _, _, lbl_error) in enumerate(self.filas):
+                lbl_error.config(text=" ".join(errores.get(indice, [])))
+            if errores:
+                self.lbl_estado.config(text=f"{len(errores)} fila(s) con errores; no se guardó nada.")
+                return
+            self.lbl_estado.config(text="")
+            messagebox.showinfo("Éxito", f"{guardados} registro(s) guardados.", parent=self)
+            self.app.sincronizar()
+            self.destroy()
+
+        def fallo(e):
+            self.btn_guardar.config(state="normal")
+            self.lbl_estado.config(text="")
+            messagebox.showerror("Error", f"No se pudo guardar la planilla: {e}", parent=self)
+
+        self.app.tareas.ejecutar(planilla.guardar_planilla, fecha, datos, al_terminar=listo, al_fallar=fallo)
+
+
+def abrir_archivo(ruta: str) -> None:
+    """Abre el archivo con la aplicación predeterminada del sistema operativo."""
+    try:
+        if hasattr(os, "startfile"):
+            os.startfile(ruta)  # Windows
+        else:
+            import subprocess
+            subprocess.Popen(["open" if sys.platform == "darwin" else "xdg-open", ruta])
+    except OSError:
+        pass
+
+
+def iniciar_aplicacion(medir_arranque: bool = False, token_sesion: Optional[str] = None):
+    inicio = time.perf_counter()
+    app = Aplicacion(token_sesion)
+    if medir_arranque:
+        medir_primer_pintado(app, "Aplicacion", inicio)
     app.mainloop()
+    if app.volver_al_login:
+        Login().mainloop()
 
 
 class Login(tk.Tk):
     """TAREA 1: Ventana de autenticación (Seguridad).
     
-    Solicita email y contraseña, valida contra la BD usando SHA-256,
-    y si es correcto, cierra login y abre la aplicación principal.
+    Solicita email y contraseña, valida contra la BD (hash versionado, con
+    límite de intentos) y, si es correcto, abre una sesión, cierra el login y
+    abre la aplicación principal.
     """
 
-    def __init__(self):
+    def __init__(self, medir_arranque: bool = False):
         super().__init__()
+        self.medir_arranque = medir_arranque
         self.title("🔒 Login - EcoTech Solutions")
         self.geometry("400x200")
         self.resizable(False, False)
+        # La consulta y verificación de la contraseña no bloquean la ventana
+        self.tareas = EjecutorTareas(self, max_hilos=1)
+        self.protocol("WM_DELETE_WINDOW", self._cerrar)
 
         frame = ttk.Frame(self, padding=20)
         frame.pack(expand=True, fill="both")
@@ -502,14 +976,15 @@ class Login(tk.Tk):
 
         botones = ttk.Frame(frame)
         botones.grid(row=2, column=0, columnspan=2, pady=20)
-        ttk.Button(botones, text="🔓 Ingresar", command=self.intentar_ingresar, width=12).pack(side="left", padx=8)
-        ttk.Button(botones, text="❌ Salir", command=self.destroy, width=12).pack(side="left", padx=8)
+        self.btn_ingresar = ttk.Button(botones, text="🔓 Ingresar", command=self.intentar_ingresar, width=12)
+        self.btn_ingresar.pack(side="left", padx=8)
+        ttk.Button(botones, text="❌ Salir", command=self._cerrar, width=12).pack(side="left", padx=8)
 
         # Enter = Ingresar
         self.bind('<Return>', lambda e: self.intentar_ingresar())
 
     def intentar_ingresar(self):
-        """TAREA 1: Validación de credenciales con seguridad SHA-256."""
+        """TAREA 1: Validación de credenciales (hash versionado, con límite de intentos)."""
         email = self.ent_email.get().strip()
         contrasena = self.ent_password.get()
 
@@ -517,30 +992,54 @@ class Login(tk.Tk):
             messagebox.showerror("❌ Error", "Email y contraseña son obligatorios.")
             return
 
-        try:
-            usuario = db.obtener_empleado_por_email(email)
-        except Exception as e:
+        def verificar():
+            try:
+                with limitador.obtener_limitador().intento(email):
+                    usuario = db.obtener_empleado_por_email(email)
+                    if not usuario:
+                        # Mismo costo que una contraseña incorrecta
+                        contrasenas.verificar_senuelo(contrasena)
+                        return "no_encontrado", None
+                    try:
+                        password_hash = usuario[6]
+                    except Exception:
+                        return "invalido", None
+                    # Si el hash es antiguo (SHA-256) o de menor costo, se rehace aquí mismo
+                    if db.verificar_y_actualizar_contrasena(usuario[0], contrasena, password_hash):
+                        return "ok", usuario
+                    return "incorrecta", None
+            except limitador.LoginLimitadoError as e:
+                return "limitado", str(e)
+
+        def resultado(respuesta):
+            self.btn_ingresar.config(state="normal")
+            estado, usuario = respuesta
+            if estado == "no_encontrado":
+                messagebox.showerror("❌ Error", "Usuario no encontrado.\n\nVerifique el email ingresado.")
+            elif estado == "invalido":
+                messagebox.showerror("❌ Error", "Registro de usuario inválido en la base de datos.")
+            elif estado == "incorrecta":
+                messagebox.showerror("❌ Acceso Denegado", "Contraseña incorrecta.\n\nIntente nuevamente.")
+            elif estado == "limitado":
+                messagebox.showwarning("⏳ Espere", usuario)
+            else:
+                # ✓ Login correcto: cerrar ventana de login y abrir aplicación principal
+                nombre_usuario = usuario[1]
+                token = sesiones.obtener_almacen().crear("empleado", usuario[0], nombre_usuario, "empleado")
+                messagebox.showinfo("✓ Bienvenido", f"Acceso concedido.\n\n¡Hola {nombre_usuario}!")
+                self._cerrar()
+                iniciar_aplicacion(self.medir_arranque, token)
+
+        def error(e):
+            self.btn_ingresar.config(state="normal")
             messagebox.showerror("❌ Error BD", f"Error al consultar la base de datos:\n{e}")
-            return
 
-        if not usuario:
-            messagebox.showerror("❌ Error", "Usuario no encontrado.\n\nVerifique el email ingresado.")
-            return
+        self.btn_ingresar.config(state="disabled")
+        self.tareas.ejecutar(verificar, clave="login", al_terminar=resultado, al_fallar=error)
 
-        try:
-            password_hash = usuario[6]
-        except Exception:
-            messagebox.showerror("❌ Error", "Registro de usuario inválido en la base de datos.")
-            return
-
-        if db.verificar_contrasena(contrasena, password_hash):
-            # ✓ Login correcto: cerrar ventana de login y abrir aplicación principal
-            nombre_usuario = usuario[1]
-            messagebox.showinfo("✓ Bienvenido", f"Acceso concedido.\n\n¡Hola {nombre_usuario}!")
-            self.destroy()
-            iniciar_aplicacion()
-        else:
-            messagebox.showerror("❌ Acceso Denegado", "Contraseña incorrecta.\n\nIntente nuevamente.")
+    def _cerrar(self):
+        self.tareas.cerrar()
+        self.destroy()
 
 
 if __name__ == "__main__":
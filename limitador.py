@@ -0,0 +1,173 @@
+"""
+Límite de intentos de login para que una ráfaga de contraseñas incorrectas no
+sature la CPU con hashes.
+
+Cada intento pasa por `LimitadorLogin.intento(cuenta)`, que aplica en orden:
+- Una cubeta de tokens por cuenta (email o nombre de usuario): pocos intentos
+  seguidos y luego uno cada tanto.
+- Una cubeta global para todo el proceso, que acota el total de intentos por
+  segundo aunque se prueben muchas cuentas distintas.
+- Un tope de hashes simultáneos: el intento espera turno hasta `espera_max`
+  segundos; si no lo consigue se rechaza en vez de encolarse sin fin.
+
+Los intentos rechazados lanzan `LoginLimitadoError` sin calcular ningún hash.
+Para usuarios inexistentes se usa `contrasenas.verificar_senuelo`, que cuesta lo
+mismo que una verificación real. `estadisticas()` cuenta permitidos, rechazados
+y encolados.
+
+Configuración por variables de entorno (ver .env.example) o `configurar_limitador`.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+INTENTOS_CUENTA = int(os.getenv("LOGIN_INTENTOS_CUENTA", "5"))
+RECARGA_CUENTA = float(os.getenv("LOGIN_RECARGA_CUENTA", str(1 / 12)))   # 5 por minuto
+INTENTOS_GLOBAL = int(os.getenv("LOGIN_INTENTOS_GLOBAL", "50"))
+RECARGA_GLOBAL = float(os.getenv("LOGIN_RECARGA_GLOBAL", "20"))
+HASHES_SIMULTANEOS = int(os.getenv("LOGIN_HASHES_SIMULTANEOS", str(os.cpu_count() or 1)))
+ESPERA_MAX = float(os.getenv("LOGIN_ESPERA_MAX", "2.0"))
+# Cuentas recordadas; las menos usadas se olvidan (vuelven con la cubeta llena)
+MAX_CUENTAS = 10000
+
+
+class LoginLimitadoError(Exception):
+    """El intento de login se rechazó por exceso de intentos; `reintentar_en` en segundos."""
+
+    def __init__(self, mensaje: str, reintentar_en: float = 0.0):
+        super().__init__(mensaje)
+        self.reintentar_en = reintentar_en
+
+
+class CubetaTokens:
+    """Cubeta de `capacidad` tokens que se rellena a `recarga` tokens por segundo."""
+
+    def __init__(self, capacidad: float, recarga: float):
+        if capacidad < 1 or recarga <= 0:
+            raise ValueError("La cubeta necesita capacidad >= 1 y recarga > 0")
+        self.capacidad = capacidad
+        self.recarga = recarga
+        self._tokens = float(capacidad)
+        self._ultima = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _rellenar(self) -> None:
+        ahora = time.monotonic()
+        self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultima) * self.recarga)
+        self._ultima = ahora
+
+    def tomar(self, n: float = 1) -> bool:
+        """Toma `n` tokens si los hay; devuelve False (sin tomar nada) si no alcanzan."""
+        with self._lock:
+            self._rellenar()
+            if self._tokens < n:
+                return False
+            self._tokens -= n
+            return True
+
+    def devolver(self, n: float = 1) -> None:
+        with self._lock:
+            self._tokens = min(self.capacidad, self._tokens + n)
+
+    def espera(self, n: float = 1) -> float:
+        """Segundos hasta que haya `n` tokens disponibles."""
+        with self._lock:
+            self._rellenar()
+            return max(0.0, (n - self._tokens) / self.recarga)
+
+
+class LimitadorLogin:
+    """Cubetas por cuenta y global más un tope de hashes simultáneos (ver el módulo)."""
+
+    def __init__(self, intentos_cuenta: int = INTENTOS_CUENTA, recarga_cuenta: float = RECARGA_CUENTA,
+                 intentos_global: int = INTENTOS_GLOBAL, recarga_global: float = RECARGA_GLOBAL,
+                 hashes_simultaneos: int = HASHES_SIMULTANEOS, espera_max: float = ESPERA_MAX,
+                 max_cuentas: int = MAX_CUENTAS):
+        self.intentos_cuenta = intentos_cuenta
+        self.recarga_cuenta = recarga_cuenta
+        self.espera_max = espera_max
+        self.max_cuentas = max_cuentas
+        self._global = CubetaTokens(intentos_global, recarga_global)
+        self._cuentas: "OrderedDict[str, CubetaTokens]" = OrderedDict()
+        self._hashes = threading.BoundedSemaphore(hashes_simultaneos)
+        self._lock = threading.Lock()
+        self._contadores = {"permitidos": 0, "rechazados_cuenta": 0, "rechazados_global": 0,
+                            "rechazados_espera": 0, "encolados": 0, "en_curso": 0}
+
+    def _sumar(self, clave: str, n: int = 1) -> None:
+        with self._lock:
+            self._contadores[clave] += n
+
+    def _cubeta(self, cuenta: str) -> CubetaTokens:
+        clave = (cuenta or "").strip().lower()
+        with self._lock:
+            cubeta = self._cuentas.get(clave)
+            if cubeta is None:
+                cubeta = CubetaTokens(self.intentos_cuenta, self.recarga_cuenta)
+                self._cuentas[clave] = cubeta
+                if len(self._cuentas) > self.max_cuentas:
+                    self._cuentas.popitem(last=False)
+            else:
+                self._cuentas.move_to_end(clave)
+            return cubeta
+
+    @contextmanager
+    def intento(self, cuenta: str) -> Iterator[None]:
+        """Reserva un intento de login para `cuenta` durante el bloque `with`.
+
+        Lanza `LoginLimitadoError` si la cuenta o el proceso superaron su ritmo,
+        o si no hubo turno para hashear en `espera_max` segundos.
+        """
+        cubeta = self._cubeta(cuenta)
+        if not cubeta.tomar():
+            self._sumar("rechazados_cuenta")
+            espera = cubeta.espera()
+            raise LoginLimitadoError(f"Demasiados intentos para esta cuenta. Espere {espera:.0f} s.", espera)
+        if not self._global.tomar():
+            cubeta.devolver()  # no fue culpa de esta cuenta
+            self._sumar("rechazados_global")
+            espera = self._global.espera()
+            raise LoginLimitadoError("Demasiados intentos de login en el sistema. Intente en unos segundos.",
+                                     espera)
+
+        if not self._hashes.acquire(blocking=False):
+            self._sumar("encolados")
+            if not self._hashes.acquire(timeout=self.espera_max):
+                self._sumar("rechazados_espera")
+                raise LoginLimitadoError("El servidor está ocupado verificando otros ingresos. Reintente.",
+                                         self.espera_max)
+        self._sumar("permitidos")
+        self._sumar("en_curso")
+        try:
+            yield
+        finally:
+            self._sumar("en_curso", -1)
+            self._hashes.release()
+
+    def estadisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._contadores, "cuentas": len(self._cuentas)}
+
+
+_limitador: Optional[LimitadorLogin] = None
+_limitador_lock = threading.Lock()
+
+
+def obtener_limitador() -> LimitadorLogin:
+    """Devuelve el limitador compartido por los logins del proceso (GUI y GestorUsuarios)."""
+    global _limitador
+    with _limitador_lock:
+        if _limitador is None:
+            _limitador = LimitadorLogin()
+        return _limitador
+
+
+def configurar_limitador(**opciones) -> LimitadorLogin:
+    """Reemplaza el limitador compartido por uno nuevo con `opciones` (ver `LimitadorLogin`)."""
+    global _limitador
+    with _limitador_lock:
+        _limitador = LimitadorLogin(**opciones)
+        return _limitador
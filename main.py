@@ -2,15 +2,27 @@
 Punto de entrada de la aplicación.
 Inicializa la base de datos y lanza la interfaz gráfica (ventana de login).
 """
+import time
+INICIO = time.perf_counter()  # antes de importar el resto, para medir el arranque completo
+
+import os
+import sys
 import db
-from gui import Login
+from gui import Login, medir_primer_pintado
+
 
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # Modo medición: imprime en stderr el tiempo hasta el primer pintado del
+    # Login (desde el inicio del proceso) y de la Aplicacion (desde que se crea).
+    medir = "--medir-arranque" in argv or os.getenv("ECOTECH_MEDIR_ARRANQUE") == "1"
 
-def main():
     # Inicializar la base de datos (archivo ecotech.db en el mismo directorio)
     db.inicializar_bd()
     # Abrir la ventana de login; al autenticarse, la GUI principal se iniciará.
-    login = Login()
+    login = Login(medir_arranque=medir)
+    if medir:
+        medir_primer_pintado(login, "Login", INICIO)
     login.mainloop()
 
 
@@ -1,7 +1,136 @@
 # Modelos para manejar usuarios y la BD
-import bcrypt
-from db import get_db
-from mysql.connector import Error
+import csv
+import os
+import threading
+from collections import namedtuple
+from functools import lru_cache
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+import contrasenas
+import limitador
+import sesiones
+import validaciones
+from db import get_db, ErrorBD, IntegridadError
+
+# Config del hasheo de passwords (se puede ajustar con variables de entorno)
+# Cada punto de costo duplica el tiempo. Si BCRYPT_COSTO no esta, contrasenas lo
+# calibra midiendo el equipo (~HASH_OBJETIVO_MS por hash, 250 ms por defecto)
+COSTO_BCRYPT = int(os.getenv('BCRYPT_COSTO')) if os.getenv('BCRYPT_COSTO') else None
+# Cuantos hashes pueden correr a la vez (bcrypt suelta el GIL, asi que los hilos sirven)
+TRABAJADORES_HASH = int(os.getenv('BCRYPT_TRABAJADORES', str(min(4, os.cpu_count() or 1))))
+# Hilos del gestor para las variantes *_async (consulta a la BD + esperar el hash)
+HILOS_GESTOR = int(os.getenv('GESTOR_HILOS', '8'))
+
+# Columnas que se pueden pedir en GestorUsuarios.listar (password solo con incluir_hash=True)
+COLUMNAS_USUARIO = ('id', 'nombre_usuario', 'correo', 'rol', 'fecha_creacion', 'fecha_modificacion')
+COLUMNAS_LISTADO = ('id', 'nombre_usuario', 'correo', 'rol')
+LIMITE_LISTADO = 100
+# Filas por transaccion en la importacion masiva (importar_csv)
+TAMANO_LOTE_IMPORTACION = 500
+# Cuantos nombres/correos se consultan por IN (...) al buscar los que ya existen
+_IDS_POR_CONSULTA = 500
+
+
+# Estas dos van sueltas (no como metodos) para que el pool de procesos pueda enviarlas
+# (el hasheo en si esta en contrasenas.py, el mismo que usa db.py para empleados)
+def _hashear(password, costo):
+    return contrasenas.hashear(password, 'bcrypt', costo)
+
+
+def _verificar(password, hash_str):
+    return contrasenas.verificar(password, hash_str)
+
+
+# Servicio que corre bcrypt en un pool (hilos o procesos) y devuelve Futures
+class ServicioHash:
+    def __init__(self, trabajadores=None, costo=None, usar_procesos=False):
+        self.trabajadores = trabajadores or TRABAJADORES_HASH
+        # Sin costo fijo se usa el calibrado por contrasenas al momento de cada hash
+        self._costo = costo or COSTO_BCRYPT
+        if usar_procesos:
+            self._pool = ProcessPoolExecutor(max_workers=self.trabajadores)
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.trabajadores, thread_name_prefix='bcrypt')
+
+    # Costo con el que se generan los hashes nuevos
+    def costo(self):
+        return self._costo or contrasenas.costo_actual('bcrypt')
+
+    # Si el hash es de otro formato o tiene bastante menos costo que el actual hay que rehacerlo
+    def necesita_rehash(self, hash_str):
+        return contrasenas.necesita_rehash(hash_str, 'bcrypt', self.costo())
+
+    # Devuelve un Future con el hash del password
+    # (el costo viaja con cada tarea: los procesos hijos no calibran)
+    def hashear(self, password):
+        return self._pool.submit(_hashear, password, self.costo())
+
+    # Devuelve un Future con True/False
+    def verificar(self, password, hash_str):
+        return self._pool.submit(_verificar, password, hash_str)
+    
+    # Future que tarda lo mismo que verificar() y siempre da False (usuarios inexistentes)
+    # (con el mismo costo que los hashes de este servicio, y sin calibrar en los hijos)
+    def verificar_senuelo(self, password):
+        return self._pool.submit(contrasenas.verificar_senuelo, password, 'bcrypt', self.costo())
+
+    def cerrar(self, esperar=True):
+        self._pool.shutdown(wait=esperar)
+
+
+# Un solo servicio compartido por todo el programa
+_servicio_hash = None
+_servicio_lock = threading.Lock()
+
+
+def obtener_servicio_hash():
+    global _servicio_hash
+    with _servicio_lock:
+        if _servicio_hash is None:
+            _servicio_hash = ServicioHash()
+        return _servicio_hash
+
+
+# Cambiar tamano del pool, costo o tipo de pool (cierra el servicio anterior)
+def configurar_servicio_hash(trabajadores=None, costo=None, usar_procesos=False):
+    global _servicio_hash
+    with _servicio_lock:
+        anterior = _servicio_hash
+        _servicio_hash = ServicioHash(trabajadores, costo, usar_procesos)
+    if anterior is not None:
+        anterior.cerrar(esperar=False)
+    return _servicio_hash
+
+
+# Hilos para las variantes *_async de GestorUsuarios: uno solo para todos los
+# gestores (igual que el servicio de hash y la pasarela), creado al primer uso
+_ejecutor_gestor = None
+_ejecutor_lock = threading.Lock()
+
+
+def obtener_ejecutor_gestor():
+    global _ejecutor_gestor
+    with _ejecutor_lock:
+        if _ejecutor_gestor is None:
+            _ejecutor_gestor = ThreadPoolExecutor(max_workers=HILOS_GESTOR, thread_name_prefix='gestor')
+        return _ejecutor_gestor
+
+
+# Cambiar la cantidad de hilos (cierra el ejecutor anterior cuando termina lo pendiente)
+def configurar_ejecutor_gestor(hilos=None):
+    global _ejecutor_gestor
+    with _ejecutor_lock:
+        anterior = _ejecutor_gestor
+        _ejecutor_gestor = ThreadPoolExecutor(max_workers=hilos or HILOS_GESTOR, thread_name_prefix='gestor')
+    if anterior is not None:
+        anterior.shutdown(wait=False)
+    return _ejecutor_gestor
+
+
+# Un tipo de fila (namedtuple, solo lectura) por cada combinacion de columnas pedida
+@lru_cache(maxsize=None)
+def _tipo_fila(columnas):
+    return namedtuple('FilaUsuario', columnas)
+
 
 # Excepciones para errores de usuarios
 class UsuarioError(Exception):
@@ -22,19 +151,38 @@ class Usuario:
         if password:
             self.set_password(password)
     
-    # Hashear password con bcrypt
+    # Hashear password con bcrypt (espera al servicio de hash)
     def set_password(self, password):
-        pw_bytes = password.encode('utf-8')
-        salt = bcrypt.gensalt(rounds=12)
-        self._pass_hash = bcrypt.hashpw(pw_bytes, salt).decode('utf-8')
+        self._pass_hash = obtener_servicio_hash().hashear(password).result()
+    
+    # Igual pero sin esperar: devuelve un Future que se completa recien despues de
+    # guardar el hash (el Future del servicio despierta a quien espera antes de
+    # correr sus callbacks, asi que no se puede devolver ese directamente)
+    def set_password_async(self, password):
+        resultado = Future()
+        
+        def guardar(f):
+            try:
+                hash_str = f.result()
+            except BaseException as e:
+                resultado.set_exception(e)
+                return
+            self._pass_hash = hash_str
+            resultado.set_result(hash_str)
+        obtener_servicio_hash().hashear(password).add_done_callback(guardar)
+        return resultado
     
     # Verificar si el password es correcto
     def check_password(self, password):
+        return self.check_password_async(password).result()
+    
+    # Igual pero devuelve un Future con True/False
+    def check_password_async(self, password):
         if not self._pass_hash:
-            return False
-        pw_bytes = password.encode('utf-8')
-        hash_bytes = self._pass_hash.encode('utf-8')
-        return bcrypt.checkpw(pw_bytes, hash_bytes)
+            futuro = Future()
+            futuro.set_result(False)
+            return futuro
+        return obtener_servicio_hash().verificar(password, self._pass_hash)
     
     # Obtener el hash para guardarlo en BD
     def get_hash(self):
@@ -49,16 +197,28 @@ class Usuario:
 
 # Clase para manejar todo el CRUD de usuarios
 class GestorUsuarios:
-    def __init__(self):
-        self.db = get_db()
+    def __init__(self, db=None, almacen_sesiones=None):
+        # Todos los gestores comparten la misma pasarela (y su pool de conexiones);
+        # el backend sale de DB_BACKEND (sqlite por defecto, o mysql)
+        self.db = db or get_db()
+        # Y el mismo almacen de sesiones (token -> usuario y rol en memoria)
+        self.sesiones = almacen_sesiones if almacen_sesiones is not None else sesiones.obtener_almacen()
+    
+    # Para login_async y compania: asi la GUI o un servidor no se traban
+    # esperando a bcrypt y varios usuarios pueden autenticarse a la vez
+    # (la pasarela presta una conexion distinta a cada hilo). Es el ejecutor
+    # compartido: crear muchos gestores no crea mas hilos ni hay que cerrarlos
+    @property
+    def _ejecutor(self):
+        return obtener_ejecutor_gestor()
     
     # Agregar usuario nuevo
     def agregar_usuario(self, usuario):
         try:
-            # Verificar que no exista
-            if self._existe_usuario(usuario.nombre_usuario, usuario.correo):
-                raise UsuarioError(f"El usuario '{usuario.nombre_usuario}' o correo ya existe")
+            if not usuario.get_hash():
+                raise UsuarioError(f"El usuario '{usuario.nombre_usuario}' no tiene password")
             
+            # Un solo INSERT: si el nombre o el correo ya existen lo avisan los UNIQUE
             query = "INSERT INTO usuarios (nombre_usuario, password, correo, rol) VALUES (%s, %s, %s, %s)"
             params = (
                 usuario.nombre_usuario,
@@ -73,14 +233,103 @@ class GestorUsuarios:
             return id_nuevo
         except UsuarioError:
             raise
-        except Error as e:
+        except IntegridadError:
+            raise UsuarioError(f"El usuario '{usuario.nombre_usuario}' o correo ya existe")
+        except ErrorBD as e:
             raise UsuarioError(f"Error agregando usuario: {e}")
     
-    # Ver si un usuario ya existe
-    def _existe_usuario(self, nombre, correo):
-        query = "SELECT id FROM usuarios WHERE nombre_usuario = %s OR correo = %s"
-        result = self.db.ejecutar_query(query, (nombre, correo))
-        return len(result) > 0
+    # Alta masiva desde un CSV (ruta o archivo abierto) con columnas nombre_usuario,
+    # correo, password y rol (opcional). Los passwords se hashean en paralelo en el
+    # servicio de hash mientras se van insertando lotes ya listos, cada lote en una
+    # transaccion. Las lineas con error se saltan y el resto se importa.
+    # Devuelve (creados, errores) con errores = {numero de linea: motivo}
+    def importar_csv(self, origen, tamano_lote=TAMANO_LOTE_IMPORTACION, rol_por_defecto='usuario'):
+        if isinstance(origen, (str, os.PathLike)):
+            with open(origen, newline='', encoding='utf-8') as archivo:
+                return self.importar_csv(archivo, tamano_lote, rol_por_defecto)
+        
+        lector = csv.DictReader(origen)
+        faltan = {'nombre_usuario', 'correo', 'password'} - set(lector.fieldnames or ())
+        if faltan:
+            raise UsuarioError(f"Faltan columnas en el CSV: {', '.join(sorted(faltan))}")
+        
+        errores = {}
+        candidatos = []  # (linea, nombre, correo, password, rol)
+        nombres, correos = {}, {}
+        for fila in lector:
+            linea = lector.line_num
+            nombre = (fila['nombre_usuario'] or '').strip()
+            correo = (fila['correo'] or '').strip()
+            rol = (fila.get('rol') or '').strip() or rol_por_defecto
+            if not nombre or not fila['password']:
+                errores[linea] = "Faltan nombre_usuario o password"
+            elif not validaciones.validar_email(correo):
+                errores[linea] = f"Correo invalido: {correo}"
+            elif nombre in nombres or correo in correos:
+                errores[linea] = f"Repite usuario o correo de la linea {nombres.get(nombre) or correos[correo]}"
+            else:
+                nombres[nombre] = correos[correo] = linea
+                candidatos.append((linea, nombre, correo, fila['password'], rol))
+        
+        creados = 0
+        futuros = []
+        try:
+            # Los que ya estan en la BD se descartan antes de gastar CPU hasheando
+            nombres_bd, correos_bd = self._existentes(nombres, correos)
+            validos = []
+            for linea, nombre, correo, password, rol in candidatos:
+                if nombre in nombres_bd or correo in correos_bd:
+                    errores[linea] = "El usuario o correo ya existe"
+                else:
+                    validos.append((linea, nombre, correo, password, rol))
+            
+            # Se encolan todos los hashes; cada lote se inserta apenas estan los suyos
+            servicio = obtener_servicio_hash()
+            futuros = [servicio.hashear(password) for _, _, _, password, _ in validos]
+            for inicio in range(0, len(validos), tamano_lote):
+                lote = validos[inicio:inicio + tamano_lote]
+                filas = [(nombre, futuro.result(), correo, rol) for (_, nombre, correo, _, rol), futuro
+                         in zip(lote, futuros[inicio:inicio + tamano_lote])]
+                creados += self._insertar_lote(lote, filas, errores)
+        except ErrorBD as e:
+            raise UsuarioError(f"Error importando ({creados} usuarios ya guardados): {e}")
+        finally:
+            for futuro in futuros:
+                futuro.cancel()
+        print(f"Importacion: {creados} usuarios creados, {len(errores)} lineas con error")
+        return creados, dict(sorted(errores.items()))
+    
+    def _insertar_lote(self, lote, filas, errores):
+        query = "INSERT INTO usuarios (nombre_usuario, password, correo, rol) VALUES (%s, %s, %s, %s)"
+        try:
+            return self.db.ejecutar_muchos(query, filas, commit=True)
+        except IntegridadError:
+            pass
+        # Alguien creo uno de estos usuarios mientras tanto (o difiere solo en
+        # mayusculas y la BD no distingue): el lote se inserta de a uno
+        creados = 0
+        for (linea, *_), fila in zip(lote, filas):
+            try:
+                self.db.ejecutar_query(query, fila, commit=True)
+                creados += 1
+            except IntegridadError:
+                errores[linea] = "El usuario o correo ya existe"
+        return creados
+    
+    # Nombres y correos (de los pedidos) que ya estan en la tabla, en consultas de a _IDS_POR_CONSULTA
+    def _existentes(self, nombres, correos):
+        nombres, correos = list(nombres), list(correos)
+        nombres_bd, correos_bd = set(), set()
+        for inicio in range(0, max(len(nombres), len(correos)), _IDS_POR_CONSULTA):
+            parte_n = nombres[inicio:inicio + _IDS_POR_CONSULTA] or [None]
+            parte_c = correos[inicio:inicio + _IDS_POR_CONSULTA] or [None]
+            query = (f"SELECT nombre_usuario, correo FROM usuarios"
+                     f" WHERE nombre_usuario IN ({', '.join(['%s'] * len(parte_n))})"
+                     f" OR correo IN ({', '.join(['%s'] * len(parte_c))})")
+            for datos in self.db.ejecutar_query(query, tuple(parte_n + parte_c)):
+                nombres_bd.add(datos['nombre_usuario'])
+                correos_bd.add(datos['correo'])
+        return nombres_bd, correos_bd
     
     # Buscar usuario por nombre
     def buscar_por_nombre(self, nombre):
@@ -102,7 +351,7 @@ class GestorUsuarios:
             return usr
         except UsuarioError:
             raise
-        except Error as e:
+        except ErrorBD as e:
             raise UsuarioError(f"Error buscando: {e}")
     
     # Buscar por ID
@@ -125,10 +374,44 @@ class GestorUsuarios:
             return usr
         except UsuarioError:
             raise
-        except Error as e:
+        except ErrorBD as e:
             raise UsuarioError(f"Error: {e}")
     
-    # Listar todos
+    # Listado paginado por id (despues_de_id = ultimo id de la pagina anterior)
+    # Solo trae las columnas pedidas y devuelve FilaUsuario (namedtuple), no Usuario:
+    # sirve para tablas y combos sin cargar hashes. Filtros opcionales por rol
+    # exacto y por nombre (prefijo de nombre_usuario)
+    def listar(self, despues_de_id=0, limite=LIMITE_LISTADO, rol=None, nombre=None,
+               columnas=COLUMNAS_LISTADO, incluir_hash=False):
+        columnas = tuple(columnas)
+        permitidas = COLUMNAS_USUARIO + (('password',) if incluir_hash else ())
+        invalidas = [c for c in columnas if c not in permitidas]
+        if invalidas:
+            raise UsuarioError(f"Columnas no permitidas en el listado: {', '.join(invalidas)}")
+        if 'id' not in columnas:
+            columnas = ('id',) + columnas  # hace falta para pedir la pagina siguiente
+        
+        condiciones = ["id > %s"]
+        params = [despues_de_id]
+        if rol:
+            condiciones.append("rol = %s")
+            params.append(rol)
+        if nombre:
+            # '!' como escape sirve igual en MySQL y SQLite
+            prefijo = nombre.replace('!', '!!').replace('%', '!%').replace('_', '!_')
+            condiciones.append("nombre_usuario LIKE %s ESCAPE '!'")
+            params.append(prefijo + '%')
+        params.append(int(limite))
+        
+        query = (f"SELECT {', '.join(columnas)} FROM usuarios WHERE {' AND '.join(condiciones)}"
+                 " ORDER BY id LIMIT %s")
+        try:
+            tipo = _tipo_fila(columnas)
+            return [tipo(*(datos[c] for c in columnas)) for datos in self.db.ejecutar_query(query, tuple(params))]
+        except ErrorBD as e:
+            raise UsuarioError(f"Error listando: {e}")
+    
+    # Listar todos (Usuario completos con hash; para mostrar datos usar listar())
     def listar_todos(self):
         try:
             query = "SELECT * FROM usuarios ORDER BY id"
@@ -145,14 +428,13 @@ class GestorUsuarios:
                 usr.set_hash(datos['password'])
                 usuarios.append(usr)
             return usuarios
-        except Error as e:
+        except ErrorBD as e:
             raise UsuarioError(f"Error listando: {e}")
     
     # Modificar datos de un usuario
+    # (un solo UPDATE: si no toco ninguna fila es que el id no existe)
     def modificar(self, id_usr, nuevo_correo=None, nuevo_rol=None, nuevo_pass=None):
         try:
-            usuario = self.buscar_por_id(id_usr)
-            
             campos = []
             params = []
             
@@ -165,9 +447,8 @@ class GestorUsuarios:
                 params.append(nuevo_rol)
             
             if nuevo_pass:
-                usr_temp = Usuario('temp', 'temp@t.com', password=nuevo_pass)
                 campos.append("password = %s")
-                params.append(usr_temp.get_hash())
+                params.append(obtener_servicio_hash().hashear(nuevo_pass).result())
             
             if not campos:
                 print("No hay nada que modificar")
@@ -178,40 +459,59 @@ class GestorUsuarios:
             query = f"UPDATE usuarios SET {', '.join(campos)} WHERE id = %s"
             filas = self.db.ejecutar_query(query, tuple(params), commit=True)
             
-            if filas > 0:
-                print(f"Usuario ID {id_usr} modificado")
-                return True
-            return False
+            if filas == 0:
+                raise UsuarioError(f"Usuario ID {id_usr} no encontrado")
+            # Las sesiones abiertas tienen el rol viejo en cache: se cierran
+            self.sesiones.invalidar_usuario('usuario', id_usr)
+            print(f"Usuario ID {id_usr} modificado")
+            return True
         except UsuarioError:
             raise
-        except Error as e:
+        except IntegridadError:
+            raise UsuarioError(f"El correo '{nuevo_correo}' ya esta en uso")
+        except ErrorBD as e:
             raise UsuarioError(f"Error modificando: {e}")
     
-    # Eliminar usuario
+    # Eliminar usuario (un solo DELETE, igual que modificar)
     def eliminar(self, id_usr):
         try:
-            usuario = self.buscar_por_id(id_usr)
-            
             query = "DELETE FROM usuarios WHERE id = %s"
             filas = self.db.ejecutar_query(query, (id_usr,), commit=True)
             
-            if filas > 0:
-                print(f"Usuario '{usuario.nombre_usuario}' eliminado")
-                return True
-            return False
+            if filas == 0:
+                raise UsuarioError(f"Usuario ID {id_usr} no encontrado")
+            self.sesiones.invalidar_usuario('usuario', id_usr)
+            print(f"Usuario ID {id_usr} eliminado")
+            return True
         except UsuarioError:
             raise
-        except Error as e:
+        except ErrorBD as e:
             raise UsuarioError(f"Error eliminando: {e}")
     
     # Login - verificar usuario y password
+    # Pasa por el limitador compartido (mismo que la GUI): si la cuenta o el sistema
+    # superan su ritmo de intentos se rechaza sin calcular ningun hash
     def login(self, nombre, password):
+        try:
+            with limitador.obtener_limitador().intento(nombre):
+                return self._login(nombre, password)
+        except limitador.LoginLimitadoError as e:
+            raise UsuarioError(str(e))
+    
+    def _login(self, nombre, password):
         try:
             # print(f"Intentando login con: {nombre}")  # debug
-            usuario = self.buscar_por_nombre(nombre)
+            try:
+                usuario = self.buscar_por_nombre(nombre)
+            except UsuarioError as e:
+                # Usuario inexistente: se gasta lo mismo que con un password incorrecto
+                if "no encontrado" in str(e):
+                    obtener_servicio_hash().verificar_senuelo(password).result()
+                raise
             
             if usuario.check_password(password):
                 print(f"Login OK: {nombre}")
+                self._rehash_si_hace_falta(usuario, password)
                 return usuario
             else:
                 raise UsuarioError("Password incorrecto")
@@ -222,6 +522,62 @@ class GestorUsuarios:
         except Exception as e:
             raise UsuarioError(f"Error en login: {e}")
 
+    # Login que ademas abre una sesion: devuelve un token para las operaciones siguientes
+    def iniciar_sesion(self, nombre, password):
+        usuario = self.login(nombre, password)
+        return self.sesiones.crear('usuario', usuario.id, usuario.nombre_usuario, usuario.rol)
+    
+    def cerrar_sesion(self, token):
+        self.sesiones.cerrar(token)
+    
+    # Chequeos de permisos: se resuelven en memoria con el token, sin ir a la tabla usuarios.
+    # sesion() devuelve Sesion(origen, usuario_id, nombre, rol) o None si expiro
+    def sesion(self, token):
+        return self.sesiones.obtener(token)
+    
+    def tiene_rol(self, token, *roles):
+        return self.sesiones.tiene_rol(token, *roles)
+    
+    # Igual pero lanza UsuarioError si no hay sesion o el rol no alcanza
+    def exigir_rol(self, token, *roles):
+        try:
+            return self.sesiones.exigir_rol(token, *roles)
+        except sesiones.SesionError as e:
+            raise UsuarioError(str(e))
+    
+    # Si el hash guardado tiene menos costo que el actual (o es de otro formato)
+    # se rehace con el password que acabamos de verificar. Si falla no importa,
+    # el login ya fue correcto y se reintenta la proxima vez
+    def _rehash_si_hace_falta(self, usuario, password):
+        viejo = usuario.get_hash()
+        servicio = obtener_servicio_hash()
+        if not servicio.necesita_rehash(viejo):
+            return
+        try:
+            nuevo = servicio.hashear(password).result()
+            self.db.ejecutar_query("UPDATE usuarios SET password = %s WHERE id = %s AND password = %s",
+                                   (nuevo, usuario.id, viejo), commit=True)
+            usuario.set_hash(nuevo)
+        except ErrorBD as e:
+            print(f"No se pudo actualizar el hash de {usuario.nombre_usuario}: {e}")
+
+    # Versiones que no bloquean: devuelven un Future con el mismo resultado
+    # (o la misma UsuarioError) que la funcion normal
+    def login_async(self, nombre, password):
+        return self._ejecutor.submit(self.login, nombre, password)
+    
+    def modificar_async(self, id_usr, nuevo_correo=None, nuevo_rol=None, nuevo_pass=None):
+        return self._ejecutor.submit(self.modificar, id_usr, nuevo_correo, nuevo_rol, nuevo_pass)
+    
+    def agregar_usuario_async(self, usuario):
+        return self._ejecutor.submit(self.agregar_usuario, usuario)
+    
+    def iniciar_sesion_async(self, nombre, password):
+        return self._ejecutor.submit(self.iniciar_sesion, nombre, password)
+    
+    def importar_csv_async(self, origen, tamano_lote=TAMANO_LOTE_IMPORTACION, rol_por_defecto='usuario'):
+        return self._ejecutor.submit(self.importar_csv, origen, tamano_lote, rol_por_defecto)
+
 # Codigo viejo que no funciono bien
 # def verificar_pass_manual(hash_bd, pass_texto):
 #     # esto no servia, mejor usar bcrypt directo
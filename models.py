@@ -38,7 +38,7 @@ class Empleado(Persona):
     Atributos adicionales:
         id_empleado (int) - puede ser None hasta guardarlo en la BD
         salario (float)
-        password_hash (str) - el hash SHA-256 de la contraseña
+        password_hash (str) - el hash versionado de la contraseña (ver contrasenas.py)
         departamento_id (int | None)
     """
 
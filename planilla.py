@@ -0,0 +1,147 @@
+"""
+Planilla semanal de horas: carga de registros de tiempo en bloque.
+
+Cada fila de la planilla es (empleado, proyecto) con las horas de los siete días
+de una semana (lunes a domingo); cada celda con horas es un registro. Se validan
+todas las filas de una vez (formato, existencia de empleados y proyectos, tope
+de 24 h por empleado y día) y, si no hay errores, se guardan en una única
+transacción con `db.agregar_registros_tiempo`.
+
+No depende de tkinter: la GUI solo arma las filas con el texto de las celdas.
+"""
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+import db
+import validaciones
+
+DIAS_SEMANA = ("Lun", "Mar", "Mié", "Jue", "Vie", "Sáb", "Dom")
+
+# (texto empleado_id, texto proyecto_id, textos de horas de lunes a domingo)
+FilaPlanilla = Tuple[str, str, Sequence[str]]
+
+
+def fechas_semana(fecha: str) -> List[str]:
+    """Devuelve las 7 fechas (lunes a domingo) de la semana que contiene `fecha` (YYYY-MM-DD)."""
+    dia = date.fromisoformat(fecha)
+    lunes = dia - timedelta(days=dia.weekday())
+    return [(lunes + timedelta(days=i)).isoformat() for i in range(7)]
+
+
+def filas_equipo(departamento_id: int, ruta_db: str = db.DB_RUTA_DEFAULT) -> List[Tuple[int, Optional[int]]]:
+    """Devuelve (empleado_id, proyecto_id) para precargar la planilla de un departamento.
+
+    Una fila por cada proyecto asignado a cada empleado del departamento; los
+    empleados sin proyectos aparecen una vez con proyecto None.
+    """
+    with db.conexion(ruta_db) as conn:
+        return conn.execute(
+            "SELECT e.id, pe.proyecto_id FROM empleados e"
+            " LEFT JOIN proyectos_empleados pe ON pe.empleado_id = e.id"
+            " WHERE e.departamento_id = ? ORDER BY e.id, pe.proyecto_id",
+            (departamento_id,)).fetchall()
+
+
+def _entero(texto: str) -> Optional[int]:
+    try:
+        return int(str(texto).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def _horas_registradas(empleado_ids, fecha_desde: str, fecha_hasta: str,
+                       ruta_db: str) -> Dict[Tuple[int, str], float]:
+    """{(empleado_id, fecha): horas ya guardadas} en el rango, leído del resumen diario."""
+    ids = list(empleado_ids)
+    if not ids:
+        return {}
+    marcas = ", ".join("?" * len(ids))
+    with db.conexion(ruta_db) as conn:
+        filas = conn.execute(
+            "SELECT empleado_id, fecha, SUM(total_horas) FROM resumen_horas_diarias"
+            f" WHERE empleado_id IN ({marcas}) AND fecha BETWEEN ? AND ? GROUP BY empleado_id, fecha",
+            ids + [fecha_desde, fecha_hasta]).fetchall()
+    return {(emp_id, fecha): horas for emp_id, fecha, horas in filas}
+
+
+def validar_planilla(fecha: str, filas: Sequence[FilaPlanilla],
+                     ruta_db: str = db.DB_RUTA_DEFAULT) -> Tuple[List[Tuple], Dict[int, List[str]]]:
+    """Valida la planilla completa de la semana de `fecha`.
+
+    Devuelve (registros, errores): `registros` son tuplas (empleado_id,
+    proyecto_id, fecha, horas) de las filas sin errores, listas para insertar, y
+    `errores` es {índice de fila: [mensajes]}. Las filas sin horas se ignoran.
+    Los ids y las horas ya registradas se consultan una vez para toda la planilla.
+    """
+    if not validaciones.validar_fecha_iso(fecha):
+        raise ValueError(f"Fecha inválida: {fecha!r}. Use formato YYYY-MM-DD.")
+    fechas = fechas_semana(fecha)
+    errores: Dict[int, List[str]] = {}
+    candidatas = []  # (índice, empleado_id, proyecto_id, [(fecha, horas)])
+
+    for indice, (texto_emp, texto_proj, textos_horas) in enumerate(filas):
+        celdas = [(fechas[i], str(t).strip().replace(",", ".")) for i, t in enumerate(textos_horas)
+                  if str(t or "").strip()]
+        if not celdas:
+            continue
+        mensajes = []
+        emp_id, proj_id = _entero(texto_emp), _entero(texto_proj)
+        if emp_id is None:
+            mensajes.append("Empleado ID debe ser un entero.")
+        if proj_id is None:
+            mensajes.append("Proyecto ID debe ser un entero.")
+        horas = []
+        for dia, texto in celdas:
+            if validaciones.validar_horas(texto):
+                horas.append((dia, float(texto)))
+            else:
+                mensajes.append(f"{DIAS_SEMANA[fechas.index(dia)]}: horas inválidas ({texto}).")
+        if mensajes:
+            errores[indice] = mensajes
+        else:
+            candidatas.append((indice, emp_id, proj_id, horas))
+
+    empleados = db.obtener_empleados_por_ids({c[1] for c in candidatas}, ruta_db=ruta_db)
+    proyectos = db.obtener_proyectos_por_ids({c[2] for c in candidatas}, ruta_db=ruta_db)
+    vistas: Dict[Tuple[int, int], int] = {}
+    total_dia = _horas_registradas(empleados, fechas[0], fechas[-1], ruta_db)
+    aceptadas = []
+    for indice, emp_id, proj_id, horas in candidatas:
+        mensajes = []
+        if emp_id not in empleados:
+            mensajes.append(f"No existe el empleado #{emp_id}.")
+        if proj_id not in proyectos:
+            mensajes.append(f"No existe el proyecto #{proj_id}.")
+        if (emp_id, proj_id) in vistas:
+            mensajes.append(f"Repite empleado y proyecto de la fila {vistas[(emp_id, proj_id)] + 1}.")
+        vistas.setdefault((emp_id, proj_id), indice)
+        if mensajes:
+            errores[indice] = mensajes
+            continue
+        for dia, h in horas:
+            total_dia[(emp_id, dia)] = total_dia.get((emp_id, dia), 0.0) + h
+        aceptadas.append((indice, emp_id, proj_id, horas))
+
+    # Tope diario por empleado: lo ya registrado más todas sus filas de la planilla
+    registros = []
+    for indice, emp_id, proj_id, horas in aceptadas:
+        dias = [DIAS_SEMANA[fechas.index(d)] for d, _ in horas if total_dia[(emp_id, d)] > 24]
+        if dias:
+            errores[indice] = [f"El empleado #{emp_id} supera 24 h el {', '.join(dias)}."]
+        else:
+            registros.extend((emp_id, proj_id, dia, h) for dia, h in horas)
+    return registros, errores
+
+
+def guardar_planilla(fecha: str, filas: Sequence[FilaPlanilla],
+                     ruta_db: str = db.DB_RUTA_DEFAULT) -> Tuple[int, Dict[int, List[str]]]:
+    """Valida y guarda la planilla. Devuelve (registros guardados, errores por fila).
+
+    Si alguna fila tiene errores no se guarda nada, para que la planilla se corrija
+    y se vuelva a enviar completa; si no, todo va en una sola transacción.
+    """
+    registros, errores = validar_planilla(fecha, filas, ruta_db=ruta_db)
+    if errores:
+        return 0, errores
+    if registros:
+        db.agregar_registros_tiempo(registros, ruta_db=ruta_db)
+    return len(registros), {}
@@ -0,0 +1,239 @@
+"""
+Reportes de horas calculados dentro de SQLite.
+
+Suma, promedio y cantidad de `horas` de `registros_tiempo` agrupados por
+empleado, proyecto, departamento, semana ISO o mes, con filtros opcionales de
+rango de fechas, empleado y proyecto. Se calculan sobre `resumen_horas_diarias`
+y solo viaja a Python una fila por grupo.
+
+`panel` junta las cifras del tablero de la GUI (horas por proyecto, empleados
+con más horas, utilización por departamento y costo por proyecto) y las guarda
+unos segundos en caché para que abrir la pestaña no recalcule todo cada vez.
+
+Uso como script para mantener el resumen en bases existentes:
+    python reportes.py verificar [ruta_db]
+    python reportes.py reconstruir [ruta_db]
+"""
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, Optional, List, Tuple
+import db
+
+TTL_PANEL_DEFAULT = 30.0
+HORAS_JORNADA_DEFAULT = 8.0
+
+# Jueves de la semana ISO de la fecha: su año y su número de día dan año y semana ISO
+_JUEVES_ISO = "date(r.fecha, '-3 days', 'weekday 4')"
+_SEMANA_ISO = (f"printf('%s-W%02d', strftime('%Y', {_JUEVES_ISO}),"
+               f" (CAST(strftime('%j', {_JUEVES_ISO}) AS INTEGER) - 1) / 7 + 1)")
+
+# agrupación -> (expresión de la clave, tabla para resolver el nombre o None)
+_AGRUPACIONES = {
+    "empleado": ("r.empleado_id", "empleados"),
+    "proyecto": ("r.proyecto_id", "proyectos"),
+    "departamento": ("r.empleado_id", None),
+    "semana": (_SEMANA_ISO, None),
+    "mes": ("substr(r.fecha, 1, 7)", None),
+}
+
+
+def horas_por(agrupacion: str, fecha_desde: Optional[str] = None, fecha_hasta: Optional[str] = None,
+              empleado_id: Optional[int] = None, proyecto_id: Optional[int] = None,
+              ruta_db: str = db.DB_RUTA_DEFAULT) -> List[Tuple]:
+    """Devuelve filas (clave, etiqueta, total_horas, promedio_horas, cantidad).
+
+    `agrupacion` es 'empleado', 'proyecto', 'departamento', 'semana' (clave
+    'YYYY-Www' ISO 8601) o 'mes' (clave 'YYYY-MM'). Para empleado, proyecto y
+    departamento la etiqueta es el nombre; para los periodos es la misma clave.
+    Las fechas son inclusivas en formato YYYY-MM-DD. Filas ordenadas por clave.
+    """
+    if agrupacion not in _AGRUPACIONES:
+        raise ValueError(f"Agrupación desconocida: {agrupacion!r}")
+    expresion, tabla_nombres = _AGRUPACIONES[agrupacion]
+
+    where, params = db.filtros_registros(fecha_desde, fecha_hasta, empleado_id, proyecto_id)
+
+    # Se agrega primero sobre el resumen diario (una fila por empleado, proyecto
+    # y fecha, mantenida por triggers) y los nombres se unen después, una vez por grupo.
+    agregado = (f"SELECT {expresion} AS clave, SUM(r.total_horas) AS total, SUM(r.cantidad) AS cantidad"
+                f" FROM resumen_horas_diarias r {where} GROUP BY clave")
+
+    if agrupacion == "departamento":
+        sql = (f"SELECT e.departamento_id, d.nombre, SUM(a.total), SUM(a.total) / SUM(a.cantidad), SUM(a.cantidad)"
+               f" FROM ({agregado}) a"
+               f" LEFT JOIN empleados e ON e.id = a.clave"
+               f" LEFT JOIN departamentos d ON d.id = e.departamento_id"
+               f" GROUP BY e.departamento_id ORDER BY e.departamento_id")
+    elif tabla_nombres:
+        sql = (f"SELECT a.clave, t.nombre, a.total, a.total / a.cantidad, a.cantidad"
+               f" FROM ({agregado}) a LEFT JOIN {tabla_nombres} t ON t.id = a.clave ORDER BY a.clave")
+    else:
+        sql = f"SELECT clave, clave, total, total / cantidad, cantidad FROM ({agregado}) ORDER BY clave"
+
+    with db.conexion(ruta_db) as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+def horas_por_empleado(fecha_desde: Optional[str] = None, fecha_hasta: Optional[str] = None,
+                       ruta_db: str = db.DB_RUTA_DEFAULT) -> List[Tuple]:
+    return horas_por("empleado", fecha_desde, fecha_hasta, ruta_db=ruta_db)
+
+
+def horas_por_proyecto(fecha_desde: Optional[str] = None, fecha_hasta: Optional[str] = None,
+                       ruta_db: str = db.DB_RUTA_DEFAULT) -> List[Tuple]:
+    return horas_por("proyecto", fecha_desde, fecha_hasta, ruta_db=ruta_db)
+
+
+def horas_por_departamento(fecha_desde: Optional[str] = None, fecha_hasta: Optional[str] = None,
+                           ruta_db: str = db.DB_RUTA_DEFAULT) -> List[Tuple]:
+    return horas_por("departamento", fecha_desde, fecha_hasta, ruta_db=ruta_db)
+
+
+def horas_por_semana(fecha_desde: Optional[str] = None, fecha_hasta: Optional[str] = None,
+                     ruta_db: str = db.DB_RUTA_DEFAULT) -> List[Tuple]:
+    return horas_por("semana", fecha_desde, fecha_hasta, ruta_db=ruta_db)
+
+
+def horas_por_mes(fecha_desde: Optional[str] = None, fecha_hasta: Optional[str] = None,
+                  ruta_db: str = db.DB_RUTA_DEFAULT) -> List[Tuple]:
+    return horas_por("mes", fecha_desde, fecha_hasta, ruta_db=ruta_db)
+
+
+def semana_de(dia: Optional[date] = None) -> Tuple[str, str]:
+    """Devuelve (lunes, domingo) de la semana de `dia` (por defecto hoy) en formato YYYY-MM-DD."""
+    dia = dia or date.today()
+    lunes = dia - timedelta(days=dia.weekday())
+    return lunes.isoformat(), (lunes + timedelta(days=6)).isoformat()
+
+
+def dias_habiles(fecha_desde: str, fecha_hasta: str) -> int:
+    """Cantidad de días de lunes a viernes entre dos fechas (inclusive)."""
+    desde, hasta = date.fromisoformat(fecha_desde), date.fromisoformat(fecha_hasta)
+    total = (hasta - desde).days + 1
+    if total <= 0:
+        return 0
+    semanas, resto = divmod(total, 7)
+    return semanas * 5 + sum(1 for i in range(resto) if (desde.weekday() + i) % 7 < 5)
+
+
+def top_empleados(limite: int = 10, fecha_desde: Optional[str] = None, fecha_hasta: Optional[str] = None,
+                  ruta_db: str = db.DB_RUTA_DEFAULT) -> List[Tuple]:
+    """Devuelve (empleado_id, nombre, total_horas) de los `limite` empleados con más horas."""
+    where, params = db.filtros_registros(fecha_desde, fecha_hasta, None, None)
+    sql = ("SELECT a.empleado_id, e.nombre, a.total FROM ("
+           f" SELECT r.empleado_id, SUM(r.total_horas) AS total FROM resumen_horas_diarias r {where}"
+           " GROUP BY r.empleado_id ORDER BY total DESC, r.empleado_id LIMIT ?"
+           ") a LEFT JOIN empleados e ON e.id = a.empleado_id ORDER BY a.total DESC, a.empleado_id")
+    with db.conexion(ruta_db) as conn:
+        return conn.execute(sql, params + [limite]).fetchall()
+
+
+def utilizacion_departamentos(fecha_desde: str, fecha_hasta: str,
+                              horas_jornada: float = HORAS_JORNADA_DEFAULT,
+                              ruta_db: str = db.DB_RUTA_DEFAULT) -> List[Tuple]:
+    """Devuelve (departamento_id, nombre, empleados, horas, capacidad, utilizacion) por departamento.
+
+    La capacidad es empleados × días hábiles del rango × `horas_jornada`, y la
+    utilización es horas / capacidad (None si el departamento no tiene empleados).
+    """
+    where, params = db.filtros_registros(fecha_desde, fecha_hasta, None, None)
+    sql = ("SELECT d.id, d.nombre, COUNT(e.id), COALESCE(SUM(h.total), 0) FROM departamentos d"
+           " LEFT JOIN empleados e ON e.departamento_id = d.id"
+           " LEFT JOIN ("
+           f"  SELECT r.empleado_id, SUM(r.total_horas) AS total FROM resumen_horas_diarias r {where}"
+           "  GROUP BY r.empleado_id"
+           " ) h ON h.empleado_id = e.id"
+           " GROUP BY d.id ORDER BY d.nombre")
+    with db.conexion(ruta_db) as conn:
+        filas = conn.execute(sql, params).fetchall()
+    dias = dias_habiles(fecha_desde, fecha_hasta)
+    resultado = []
+    for dep_id, nombre, empleados, horas in filas:
+        capacidad = empleados * dias * horas_jornada
+        resultado.append((dep_id, nombre, empleados, horas, capacidad, horas / capacidad if capacidad else None))
+    return resultado
+
+
+def costo_por_proyecto(fecha_desde: Optional[str] = None, fecha_hasta: Optional[str] = None,
+                       ruta_db: str = db.DB_RUTA_DEFAULT) -> List[Tuple]:
+    """Devuelve (proyecto_id, nombre, total_horas, costo) ordenado por costo descendente.
+
+    El costo es la suma de horas × `salario` de cada empleado (el salario se toma
+    como valor por hora; empleados sin salario no suman costo).
+    """
+    where, params = db.filtros_registros(fecha_desde, fecha_hasta, None, None)
+    sql = ("SELECT a.proyecto_id, p.nombre, SUM(a.total), COALESCE(SUM(a.total * e.salario), 0) FROM ("
+           f" SELECT r.proyecto_id, r.empleado_id, SUM(r.total_horas) AS total FROM resumen_horas_diarias r {where}"
+           " GROUP BY r.proyecto_id, r.empleado_id"
+           ") a LEFT JOIN empleados e ON e.id = a.empleado_id"
+           " LEFT JOIN proyectos p ON p.id = a.proyecto_id"
+           " GROUP BY a.proyecto_id ORDER BY 4 DESC, a.proyecto_id")
+    with db.conexion(ruta_db) as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+_cache_panel: Dict[Tuple, Tuple[float, Dict[str, Any]]] = {}
+_cache_panel_lock = threading.Lock()
+
+
+def panel(dia: Optional[date] = None, limite_top: int = 10, ttl: float = TTL_PANEL_DEFAULT,
+          usar_cache: bool = True, ruta_db: str = db.DB_RUTA_DEFAULT) -> Dict[str, Any]:
+    """Cifras del tablero para la semana de `dia` (por defecto la actual).
+
+    Devuelve un dict con 'desde', 'hasta', 'horas_proyecto' (filas de
+    `horas_por_proyecto` ordenadas por horas), 'top_empleados', 'utilizacion' y
+    'costo_proyecto'. El resultado se reutiliza durante `ttl` segundos.
+    """
+    desde, hasta = semana_de(dia)
+    clave = (ruta_db, desde, limite_top)
+    ahora = time.monotonic()
+    if usar_cache:
+        with _cache_panel_lock:
+            guardado = _cache_panel.get(clave)
+        if guardado and guardado[0] > ahora:
+            return guardado[1]
+
+    # Una sola transacción de lectura: las cuatro cifras salen de la misma foto de la BD
+    with db.conexion(ruta_db) as conn:
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        resultado = {
+            "desde": desde,
+            "hasta": hasta,
+            "horas_proyecto": sorted(horas_por_proyecto(desde, hasta, ruta_db=ruta_db), key=lambda f: -f[2]),
+            "top_empleados": top_empleados(limite_top, desde, hasta, ruta_db=ruta_db),
+            "utilizacion": utilizacion_departamentos(desde, hasta, ruta_db=ruta_db),
+            "costo_proyecto": costo_por_proyecto(desde, hasta, ruta_db=ruta_db),
+        }
+    with _cache_panel_lock:
+        _cache_panel[clave] = (ahora + ttl, resultado)
+    return resultado
+
+
+def invalidar_panel() -> None:
+    """Descarta las cifras del tablero guardadas en caché."""
+    with _cache_panel_lock:
+        _cache_panel.clear()
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) < 2 or argv[1] not in ("verificar", "reconstruir"):
+        print("Uso: python reportes.py verificar|reconstruir [ruta_db]")
+        return 2
+    ruta = argv[2] if len(argv) > 2 else db.DB_RUTA_DEFAULT
+    db.inicializar_bd(ruta)
+    if argv[1] == "reconstruir":
+        db.reconstruir_resumen_horas(ruta)
+        print("Resumen diario reconstruido.")
+        return 0
+    diferencias = db.verificar_resumen_horas(ruta)
+    for dif in diferencias:
+        print("Diferencia:", dif)
+    print("Resumen consistente." if not diferencias else f"{len(diferencias)} diferencias encontradas.")
+    return 1 if diferencias else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,161 @@
+"""
+Sesiones autenticadas en memoria: después de un login correcto se emite un token
+opaco y el usuario y su rol quedan en caché, así las comprobaciones de permisos
+no vuelven a consultar la base de datos.
+
+- `AlmacenSesiones.crear(origen, usuario_id, nombre, rol)` devuelve el token.
+  `origen` distingue a los empleados de ecotech.db ("empleado", login de la GUI)
+  de los usuarios de modelos.GestorUsuarios ("usuario").
+- `obtener`, `tiene_rol` y `exigir_rol` son búsquedas O(1) en un dict.
+- Las sesiones sin uso por más de `inactividad` segundos expiran; si hay más de
+  `tamano_maximo` se descartan las usadas hace más tiempo (LRU).
+- `invalidar_usuario` cierra todas las sesiones de un usuario; se llama cuando
+  se lo modifica o elimina, para que un rol viejo no quede vigente en caché.
+"""
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from typing import Dict, Optional, Set, Tuple
+
+TAMANO_MAXIMO_DEFAULT = int(os.getenv("SESIONES_MAXIMO", "1000"))
+INACTIVIDAD_DEFAULT = float(os.getenv("SESIONES_INACTIVIDAD_S", "1800"))
+
+# Datos cacheados de la sesión (solo lectura)
+Sesion = namedtuple("Sesion", "origen usuario_id nombre rol")
+
+
+class SesionError(Exception):
+    """Token inexistente, expirado o sin el rol requerido."""
+    pass
+
+
+class AlmacenSesiones:
+    """Sesiones por token en un LRU con expiración por inactividad (ver el módulo)."""
+
+    def __init__(self, tamano_maximo: int = TAMANO_MAXIMO_DEFAULT, inactividad: float = INACTIVIDAD_DEFAULT):
+        if tamano_maximo < 1:
+            raise ValueError("El almacén de sesiones necesita al menos un lugar")
+        self.tamano_maximo = tamano_maximo
+        self.inactividad = inactividad
+        # token -> (sesión, último uso); el orden es de menos a más reciente
+        self._sesiones: "OrderedDict[str, Tuple[Sesion, float]]" = OrderedDict()
+        self._por_usuario: Dict[Tuple[str, int], Set[str]] = {}
+        self._lock = threading.Lock()
+        self.estadisticas = {"creadas": 0, "aciertos": 0, "fallos": 0, "expiradas": 0,
+                             "expulsadas": 0, "invalidadas": 0}
+
+    def _quitar(self, token: str) -> None:
+        sesion, _ = self._sesiones.pop(token)
+        clave = (sesion.origen, sesion.usuario_id)
+        tokens = self._por_usuario.get(clave)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._por_usuario[clave]
+
+    def crear(self, origen: str, usuario_id: int, nombre: str, rol: str) -> str:
+        """Abre una sesión para el usuario ya autenticado y devuelve su token."""
+        token = secrets.token_urlsafe(32)
+        with self._lock:
+            self._sesiones[token] = (Sesion(origen, usuario_id, nombre, rol), time.monotonic())
+            self._por_usuario.setdefault((origen, usuario_id), set()).add(token)
+            self.estadisticas["creadas"] += 1
+            while len(self._sesiones) > self.tamano_maximo:
+                self._quitar(next(iter(self._sesiones)))
+                self.estadisticas["expulsadas"] += 1
+        return token
+
+    def obtener(self, token: Optional[str], renovar: bool = True) -> Optional[Sesion]:
+        """Devuelve la sesión del token, o None si no es válida.
+
+        Con `renovar` (acciones del usuario) reinicia su plazo de inactividad; los
+        chequeos periódicos pasan False para no mantener viva una sesión ociosa.
+        """
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._sesiones.get(token) if token else None
+            if entrada is None:
+                self.estadisticas["fallos"] += 1
+                return None
+            sesion, ultimo_uso = entrada
+            if ahora - ultimo_uso > self.inactividad:
+                self._quitar(token)
+                self.estadisticas["expiradas"] += 1
+                self.estadisticas["fallos"] += 1
+                return None
+            if renovar:
+                self._sesiones[token] = (sesion, ahora)
+                self._sesiones.move_to_end(token)
+            self.estadisticas["aciertos"] += 1
+            return sesion
+
+    def tiene_rol(self, token: Optional[str], *roles: str) -> bool:
+        """True si la sesión es válida y su rol es uno de `roles` (o cualquiera si no se indican)."""
+        sesion = self.obtener(token)
+        return sesion is not None and (not roles or sesion.rol in roles)
+
+    def exigir_rol(self, token: Optional[str], *roles: str, renovar: bool = True) -> Sesion:
+        """Como `tiene_rol`, pero devuelve la sesión o lanza `SesionError`."""
+        sesion = self.obtener(token, renovar)
+        if sesion is None:
+            raise SesionError("Sesión inválida o expirada. Vuelva a ingresar.")
+        if roles and sesion.rol not in roles:
+            raise SesionError(f"El rol '{sesion.rol}' no tiene permiso para esta operación.")
+        return sesion
+
+    def cerrar(self, token: Optional[str]) -> None:
+        """Cierra una sesión (logout). No hace nada si el token no existe."""
+        with self._lock:
+            if token in self._sesiones:
+                self._quitar(token)
+
+    def invalidar_usuario(self, origen: str, usuario_id: int) -> int:
+        """Cierra todas las sesiones del usuario; devuelve cuántas había."""
+        with self._lock:
+            tokens = list(self._por_usuario.get((origen, usuario_id), ()))
+            for token in tokens:
+                self._quitar(token)
+            self.estadisticas["invalidadas"] += len(tokens)
+            return len(tokens)
+
+    def purgar_expiradas(self) -> int:
+        """Quita las sesiones vencidas por inactividad (las demás expiran al consultarlas)."""
+        limite = time.monotonic() - self.inactividad
+        with self._lock:
+            # El orden es por último uso: las vencidas están todas al principio
+            vencidas = []
+            for token, (_, uso) in self._sesiones.items():
+                if uso >= limite:
+                    break
+                vencidas.append(token)
+            for token in vencidas:
+                self._quitar(token)
+            self.estadisticas["expiradas"] += len(vencidas)
+            return len(vencidas)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sesiones)
+
+
+_almacen: Optional[AlmacenSesiones] = None
+_almacen_lock = threading.Lock()
+
+
+def obtener_almacen() -> AlmacenSesiones:
+    """Devuelve el almacén de sesiones compartido por la GUI y GestorUsuarios."""
+    global _almacen
+    with _almacen_lock:
+        if _almacen is None:
+            _almacen = AlmacenSesiones()
+        return _almacen
+
+
+def configurar_almacen(**opciones) -> AlmacenSesiones:
+    """Reemplaza el almacén compartido por uno nuevo y vacío con `opciones`."""
+    global _almacen
+    with _almacen_lock:
+        _almacen = AlmacenSesiones(**opciones)
+        return _almacen
@@ -0,0 +1,389 @@
+"""
+Tabla virtualizada para tkinter (Treeview que solo carga las filas visibles).
+
+`TablaVirtual` muestra tablas de cualquier tamaño: en el Treeview solo existen
+las filas que caben en pantalla, y al desplazarse se piden a la base de datos
+por páginas (guardando unas pocas en una caché). Con un `EjecutorTareas` las
+páginas se cargan en segundo plano y, mientras tanto, las filas que faltan se
+muestran como "…". Las columnas se ordenan haciendo clic en el encabezado; el
+orden lo resuelve la consulta SQL.
+
+`aplicar_cambios` actualiza la tabla a partir del registro de cambios de la BD
+sin volver a contar ni recargar todo: su costo depende del tamaño del cambio.
+`mostrar_filas` muestra en su lugar una lista fija (p. ej. resultados de búsqueda).
+"""
+import tkinter as tk
+from tkinter import ttk
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# cargar(desplazamiento, limite, ordenar_por, descendente, despues_de) -> filas
+# `despues_de` es (valor de orden, id) de la última fila de la página anterior
+# cuando está en caché (para paginar por clave), o None para usar el desplazamiento
+CargarFilas = Callable[[int, int, str, bool, Optional[Tuple]], List[Tuple]]
+
+
+class CachePaginas:
+    """Caché LRU de páginas de filas de tamaño fijo.
+
+    No depende de tkinter: `filas(inicio, cantidad)` arma la ventana pedida a
+    partir de las páginas guardadas y llama a `cargar` solo para las que faltan.
+    """
+
+    def __init__(self, cargar: Callable[[int, int], List[Tuple]], tamano_pagina: int = 100,
+                 max_paginas: int = 10):
+        self.cargar = cargar
+        self.tamano_pagina = tamano_pagina
+        self.max_paginas = max_paginas
+        self._paginas: "OrderedDict[int, List[Tuple]]" = OrderedDict()
+
+    def _pagina(self, numero: int) -> List[Tuple]:
+        if numero in self._paginas:
+            self._paginas.move_to_end(numero)
+            return self._paginas[numero]
+        filas = self.cargar(numero * self.tamano_pagina, self.tamano_pagina)
+        self.guardar(numero, filas)
+        return filas
+
+    def guardar(self, numero: int, filas: List[Tuple]) -> None:
+        """Guarda la página `numero` (cargada aparte, p. ej. en segundo plano)."""
+        self._paginas[numero] = filas
+        self._paginas.move_to_end(numero)
+        while len(self._paginas) > self.max_paginas:
+            self._paginas.popitem(last=False)
+
+    def ultima_fila(self, numero: int) -> Optional[Tuple]:
+        """Última fila de la página `numero` si está guardada y completa."""
+        pagina = self._paginas.get(numero)
+        if pagina is None or len(pagina) < self.tamano_pagina:
+            return None
+        return pagina[-1]
+
+    def faltantes(self, inicio: int, cantidad: int) -> List[int]:
+        """Números de las páginas que `filas(inicio, cantidad)` tendría que cargar."""
+        faltan: List[int] = []
+        fin = inicio + cantidad
+        numero = inicio // self.tamano_pagina
+        while numero * self.tamano_pagina < fin:
+            pagina = self._paginas.get(numero)
+            if pagina is None:
+                faltan.append(numero)
+            elif len(pagina) < self.tamano_pagina:
+                break
+            numero += 1
+        return faltan
+
+    def guardadas(self, inicio: int, cantidad: int) -> List[Optional[Tuple]]:
+        """Como `filas` pero sin cargar nada: las filas de páginas que faltan son None."""
+        resultado: List[Optional[Tuple]] = []
+        for indice in range(inicio, inicio + cantidad):
+            numero, posicion = divmod(indice, self.tamano_pagina)
+            pagina = self._paginas.get(numero)
+            if pagina is None:
+                resultado.append(None)
+            elif posicion < len(pagina):
+                resultado.append(pagina[posicion])
+            else:
+                break
+        return resultado
+
+    def filas(self, inicio: int, cantidad: int) -> List[Tuple]:
+        resultado: List[Tuple] = []
+        fin = inicio + cantidad
+        numero = inicio // self.tamano_pagina
+        while numero * self.tamano_pagina < fin:
+            pagina = self._pagina(numero)
+            base = numero * self.tamano_pagina
+            resultado.extend(pagina[max(inicio - base, 0):fin - base])
+            if len(pagina) < self.tamano_pagina:
+                break
+            numero += 1
+        return resultado
+
+    def reemplazar(self, filas_por_id: Dict[int, Tuple]) -> None:
+        """Actualiza en las páginas guardadas las filas cuyo id (primera columna) está en `filas_por_id`."""
+        for pagina in self._paginas.values():
+            for i, fila in enumerate(pagina):
+                nueva = filas_por_id.get(fila[0])
+                if nueva is not None:
+                    pagina[i] = nueva
+
+    def limpiar(self) -> None:
+        self._paginas.clear()
+
+
+class TablaVirtual(ttk.Frame):
+    """Treeview con scroll virtual y columnas ordenables.
+
+    Args:
+        columnas: lista de (columna_sql, título, ancho). La primera debe ser el id.
+        contar: función sin argumentos que devuelve el total de filas.
+        cargar: función (desplazamiento, limite, ordenar_por, descendente, despues_de) -> filas.
+        ordenables: columnas por las que se puede ordenar (todas si es None).
+        ejecutor: `tareas.EjecutorTareas` opcional; si se indica, `refrescar()`
+            y las páginas que pide el desplazamiento o el orden se cargan en
+            segundo plano (una carga pendiente por tabla).
+    """
+
+    def __init__(self, master, columnas: Sequence[Tuple[str, str, int]], contar: Callable[[], int],
+                 cargar: CargarFilas, tamano_pagina: int = 100, max_paginas: int = 10,
+                 ejecutor=None, ordenables: Optional[Iterable[str]] = None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.columnas = list(columnas)
+        self.contar = contar
+        self.cargar = cargar
+        self.ejecutor = ejecutor
+        self.ordenar_por = self.columnas[0][0]
+        self.descendente = False
+        self.total = 0
+        self.inicio = 0
+        self.visibles = 1
+        self._filas: List[Optional[Tuple]] = []  # None: fila aún sin cargar
+        self._refresco_pendiente = False
+        # Cambia cada vez que se descarta la caché: las cargas viejas se ignoran
+        self._version = 0
+        self._fijas: Optional[List[Tuple]] = None
+        self._cache = CachePaginas(self._cargar_pagina, tamano_pagina, max_paginas)
+
+        claves = [c[0] for c in self.columnas]
+        self.arbol = ttk.Treeview(self, columns=claves, show="headings", selectmode="browse")
+        ordenables = set(claves if ordenables is None else ordenables)
+        for clave, titulo, ancho in self.columnas:
+            if clave in ordenables:
+                self.arbol.heading(clave, text=titulo, command=lambda c=clave: self.ordenar(c))
+            else:
+                self.arbol.heading(clave, text=titulo)
+            self.arbol.column(clave, width=ancho, stretch=True)
+        self.barra = ttk.Scrollbar(self, orient="vertical", command=self._al_desplazar)
+        self.arbol.pack(side="left", fill="both", expand=1)
+        self.barra.pack(side="right", fill="y")
+
+        self.arbol.bind("<Configure>", self._al_redimensionar)
+        self.arbol.bind("<MouseWheel>", lambda e: self._mover(-1 if e.delta > 0 else 1, "units"))
+        self.arbol.bind("<Button-4>", lambda e: self._mover(-1, "units"))
+        self.arbol.bind("<Button-5>", lambda e: self._mover(1, "units"))
+        self.arbol.bind("<Prior>", lambda e: self._mover(-1, "pages"))
+        self.arbol.bind("<Next>", lambda e: self._mover(1, "pages"))
+        self.arbol.bind("<Up>", lambda e: self._mover_seleccion(-1))
+        self.arbol.bind("<Down>", lambda e: self._mover_seleccion(1))
+
+    # ---- API pública ----
+    def refrescar(self, total: Optional[int] = None) -> None:
+        """Vuelve a contar las filas, descarta la caché y redibuja la ventana actual.
+
+        Si se pasa `total` no se cuenta de nuevo. Con ejecutor, la consulta corre
+        en segundo plano y varios refrescos seguidos se fusionan en uno solo.
+        """
+        self._fijas = None
+        contar = self.contar if total is None else (lambda: total)
+        if self.ejecutor is None:
+            self.total = contar()
+            self._limpiar_cache()
+            self._pintar()
+            return
+
+        inicio, visibles = self.inicio, self.visibles
+        orden = (self.ordenar_por, self.descendente)
+
+        def precargar():
+            total = contar()
+            desde = max(0, min(inicio, total - visibles))
+            return orden, total, desde, self.cargar(desde, visibles, *orden, None)
+
+        self._refresco_pendiente = True
+        self.ejecutor.ejecutar(precargar, clave=("refrescar", id(self)), al_terminar=self._aplicar_precarga)
+
+    def aplicar_cambios(self, cambios: Iterable[Tuple[int, str]], filas: Dict[int, Tuple]) -> None:
+        """Aplica cambios de fila sin recontar la tabla.
+
+        Args:
+            cambios: (fila_id, operacion) en orden, con operacion 'I', 'U' o 'D'.
+            filas: {id: fila} con el estado actual de las filas que siguen existiendo.
+
+        Si solo hubo modificaciones y el orden es por id, se reemplazan las filas
+        en pantalla y en la caché. Si hubo altas o bajas (o el orden puede haber
+        cambiado) se ajusta el total y se recarga solo la ventana visible.
+        """
+        existencia: Dict[int, Tuple[bool, bool]] = {}  # id -> (existía antes, existe ahora)
+        for fila_id, operacion in cambios:
+            antes = existencia[fila_id][0] if fila_id in existencia else operacion != "I"
+            existencia[fila_id] = (antes, operacion != "D")
+        if not existencia:
+            return
+
+        solo_modificaciones = all(antes and ahora for antes, ahora in existencia.values())
+        if solo_modificaciones and self.ordenar_por == self.columnas[0][0]:
+            self._cache.reemplazar(filas)
+            self._pintar(filas=[f if f is None else filas.get(f[0], f) for f in self._filas],
+                         seleccionar=self._indice_seleccionado())
+            return
+        if self._refresco_pendiente:
+            # self.total todavía no refleja el refresco en curso: contar de nuevo
+            self.refrescar()
+            return
+        delta = sum(int(ahora) - int(antes) for antes, ahora in existencia.values())
+        self.refrescar(total=max(0, self.total + delta))
+
+    def _aplicar_precarga(self, resultado) -> None:
+        orden, total, desde, filas = resultado
+        self._refresco_pendiente = False
+        if self._fijas is not None:
+            return  # se pasó a mostrar una lista fija mientras tanto
+        if orden != (self.ordenar_por, self.descendente):
+            return  # el usuario cambió el orden mientras tanto; ordenar() ya repintó
+        self.total = total
+        self.inicio = desde
+        self._limpiar_cache()
+        self._pintar(filas=filas)
+
+    def mostrar_filas(self, filas: Optional[List[Tuple]]) -> None:
+        """Muestra una lista fija de filas en lugar de la tabla; con None vuelve a la tabla.
+
+        Las filas se muestran en el orden recibido hasta que se ordene por una columna.
+        """
+        self.inicio = 0
+        if filas is None:
+            self.refrescar()
+            return
+        self._fijas = list(filas)
+        self.total = len(self._fijas)
+        self._limpiar_cache()
+        self._pintar()
+
+    def ordenar(self, columna: str) -> None:
+        """Ordena por `columna`; un segundo clic en la misma columna invierte el sentido."""
+        if columna == self.ordenar_por:
+            self.descendente = not self.descendente
+        else:
+            self.ordenar_por, self.descendente = columna, False
+        for clave, titulo, _ in self.columnas:
+            marca = (" ▼" if self.descendente else " ▲") if clave == self.ordenar_por else ""
+            self.arbol.heading(clave, text=titulo + marca)
+        if self._fijas is not None:
+            indice = [c[0] for c in self.columnas].index(columna)
+            self._fijas.sort(key=lambda f: (f[indice] is None, f[indice] if f[indice] is not None else 0),
+                             reverse=self.descendente)
+        self.inicio = 0
+        self._limpiar_cache()
+        self._pintar()
+
+    def seleccion(self) -> Optional[Tuple]:
+        """Devuelve la fila seleccionada (tupla original de la consulta) o None.
+
+        También es None si la fila seleccionada todavía se está cargando.
+        """
+        sel = self.arbol.selection()
+        if not sel:
+            return None
+        indice = self.arbol.index(sel[0])
+        return self._filas[indice] if indice < len(self._filas) else None
+
+    # ---- Internos ----
+    def _cargar_pagina(self, desde: int, limite: int) -> List[Tuple]:
+        if self._fijas is not None:
+            return self._fijas[desde:desde + limite]
+        anterior = self._cache.ultima_fila(desde // limite - 1) if desde else None
+        return self.cargar(desde, limite, self.ordenar_por, self.descendente, self._clave_orden(anterior))
+
+    def _clave_orden(self, fila: Optional[Tuple]) -> Optional[Tuple]:
+        """(valor de la columna de orden, id) de `fila`, para pedir las filas que le siguen."""
+        if fila is None:
+            return None
+        indice = [c[0] for c in self.columnas].index(self.ordenar_por)
+        return fila[indice], fila[0]
+
+    def _limpiar_cache(self) -> None:
+        self._version += 1
+        self._cache.limpiar()
+
+    def _ventana(self) -> List[Optional[Tuple]]:
+        """Filas de la ventana actual; si faltan páginas, las pide en segundo plano."""
+        if self.ejecutor is None or self._fijas is not None:
+            return self._cache.filas(self.inicio, self.visibles)
+        if not self.total:
+            return []
+        faltan = self._cache.faltantes(self.inicio, self.visibles)
+        if not faltan:
+            return self._cache.filas(self.inicio, self.visibles)
+
+        version, orden = self._version, (self.ordenar_por, self.descendente)
+        tamano = self._cache.tamano_pagina
+        indice = [c[0] for c in self.columnas].index(self.ordenar_por)
+        anteriores = {n: self._cache.ultima_fila(n - 1) for n in faltan if n}
+
+        def cargar():
+            paginas = {}
+            for n in faltan:
+                # Si la página anterior está (en caché o recién cargada) se pagina por clave
+                previa = paginas.get(n - 1)
+                anterior = previa[-1] if previa and len(previa) == tamano else anteriores.get(n)
+                despues_de = None if anterior is None else (anterior[indice], anterior[0])
+                paginas[n] = self.cargar(n * tamano, tamano, *orden, despues_de)
+            return version, paginas
+
+        # Con la misma clave, los desplazamientos seguidos se fusionan en la última carga
+        self.ejecutor.ejecutar(cargar, clave=("paginas", id(self)), al_terminar=self._aplicar_paginas)
+        return self._cache.guardadas(self.inicio, min(self.visibles, self.total - self.inicio))
+
+    def _aplicar_paginas(self, resultado) -> None:
+        version, paginas = resultado
+        if version != self._version:
+            return  # se refrescó, ordenó o filtró mientras tanto
+        for numero, filas in paginas.items():
+            self._cache.guardar(numero, filas)
+        self._pintar(seleccionar=self._indice_seleccionado())
+
+    def _indice_seleccionado(self) -> Optional[int]:
+        sel = self.arbol.selection()
+        return self.arbol.index(sel[0]) if sel else None
+
+    def _pintar(self, seleccionar: Optional[int] = None, filas: Optional[List[Tuple]] = None) -> None:
+        self.inicio = max(0, min(self.inicio, self.total - self.visibles))
+        self._filas = filas if filas is not None else self._ventana()
+        self.arbol.delete(*self.arbol.get_children())
+        for fila in self._filas:
+            if fila is None:
+                self.arbol.insert("", "end", values=["…"] + [""] * (len(self.columnas) - 1))
+            else:
+                self.arbol.insert("", "end", values=["N/A" if v is None else v for v in fila])
+        if seleccionar is not None and self._filas:
+            item = self.arbol.get_children()[max(0, min(seleccionar, len(self._filas) - 1))]
+            self.arbol.selection_set(item)
+            self.arbol.focus(item)
+        if self.total:
+            self.barra.set(self.inicio / self.total, min(1.0, (self.inicio + self.visibles) / self.total))
+        else:
+            self.barra.set(0.0, 1.0)
+
+    def _al_redimensionar(self, evento) -> None:
+        alto_fila = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        visibles = max(1, (evento.height - alto_fila) // alto_fila)
+        if visibles != self.visibles:
+            self.visibles = visibles
+            self._pintar()
+
+    def _al_desplazar(self, accion, cantidad, unidad=None) -> None:
+        if accion == "moveto":
+            self.inicio = int(float(cantidad) * self.total)
+            self._pintar()
+        else:
+            self._mover(int(cantidad), unidad)
+
+    def _mover(self, cantidad: int, unidad: str) -> str:
+        paso = self.visibles if unidad == "pages" else 1
+        self.inicio += cantidad * paso
+        self._pintar()
+        return "break"
+
+    def _mover_seleccion(self, delta: int) -> str:
+        sel = self.arbol.selection()
+        indice = self.arbol.index(sel[0]) + delta if sel else 0
+        if 0 <= indice < len(self._filas):
+            item = self.arbol.get_children()[indice]
+            self.arbol.selection_set(item)
+            self.arbol.focus(item)
+            self.arbol.see(item)
+        else:
+            self.inicio += delta
+            self._pintar(seleccionar=0 if delta < 0 else self.visibles - 1)
+        return "break"
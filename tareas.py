@@ -0,0 +1,198 @@
+"""
+Ejecución de tareas en segundo plano para la GUI de tkinter.
+
+Tkinter no es seguro entre hilos: los widgets solo se tocan desde el hilo del
+mainloop. `EjecutorTareas` corre las funciones (consultas a la BD, hash de
+contraseñas, exportaciones) en un pool de hilos y entrega los resultados al
+hilo de la GUI con `after()`, donde se llaman los callbacks.
+
+Además:
+- Coalescencia: tareas con la misma `clave` que aún no empezaron se fusionan
+  (p. ej. varios "refrescar" seguidos se ejecutan una sola vez).
+- Cancelación: `Tarea.cancelar()` evita que empiece o descarta su resultado;
+  las tareas largas pueden consultar `tarea_actual().cancelada`.
+- Indicador de ocupado: `al_cambiar_ocupado(ocupado, pendientes)`.
+"""
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+
+_local = threading.local()
+
+
+def tarea_actual() -> Optional["Tarea"]:
+    """Devuelve la tarea que se está ejecutando en el hilo actual (o None)."""
+    return getattr(_local, "tarea", None)
+
+
+class Tarea:
+    """Una función enviada al `EjecutorTareas` y sus callbacks."""
+
+    def __init__(self, ejecutor: "EjecutorTareas", funcion: Callable, args: tuple, kwargs: dict,
+                 clave: Optional[Hashable], al_terminar: Optional[Callable[[Any], None]],
+                 al_fallar: Optional[Callable[[BaseException], None]],
+                 al_progreso: Optional[Callable[..., None]]):
+        self._ejecutor = ejecutor
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.clave = clave
+        self.al_terminar = al_terminar
+        self.al_fallar = al_fallar
+        self.al_progreso = al_progreso
+        self.estado = "pendiente"  # pendiente | ejecutando | terminada | cancelada
+        self._cancelada = threading.Event()
+
+    @property
+    def cancelada(self) -> bool:
+        return self._cancelada.is_set()
+
+    def cancelar(self) -> None:
+        """Pide cancelar la tarea: si no empezó no se ejecuta, y sus callbacks no se llaman."""
+        self._cancelada.set()
+
+    def avisar_progreso(self, *datos) -> None:
+        """Desde el hilo de trabajo: envía `datos` a `al_progreso` en el hilo de la GUI."""
+        self._ejecutor._resultados.put((self, "progreso", datos))
+
+
+class EjecutorTareas:
+    """Pool de hilos cuyos resultados se entregan en el hilo de tkinter.
+
+    `ejecutar` debe llamarse desde el hilo de la GUI. Los callbacks (`al_terminar`,
+    `al_fallar`, `al_progreso`, `al_cambiar_ocupado`) también corren en ese hilo.
+    """
+
+    def __init__(self, raiz, max_hilos: int = 2, intervalo_ms: int = 50,
+                 al_cambiar_ocupado: Optional[Callable[[bool, int], None]] = None,
+                 al_fallar: Optional[Callable[[BaseException], None]] = None):
+        self.raiz = raiz
+        self.intervalo_ms = intervalo_ms
+        self.al_cambiar_ocupado = al_cambiar_ocupado
+        self.al_fallar = al_fallar
+        self._hilos = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="gui-tarea")
+        self._resultados: "queue.Queue" = queue.Queue()
+        self._pendientes_por_clave: Dict[Hashable, Tarea] = {}
+        self._sin_entregar: Set[Tarea] = set()
+        self._lock = threading.Lock()
+        self._sondeo = None
+        self._cerrado = False
+
+    @property
+    def pendientes(self) -> int:
+        """Tareas enviadas cuyo resultado todavía no se entregó."""
+        return len(self._sin_entregar)
+
+    def ejecutar(self, funcion: Callable, *args, clave: Optional[Hashable] = None,
+                 al_terminar: Optional[Callable[[Any], None]] = None,
+                 al_fallar: Optional[Callable[[BaseException], None]] = None,
+                 al_progreso: Optional[Callable[..., None]] = None, **kwargs) -> Tarea:
+        """Ejecuta `funcion(*args, **kwargs)` en segundo plano.
+
+        Si ya hay una tarea pendiente (no iniciada) con la misma `clave`, se
+        reemplazan su función y callbacks por los nuevos y se devuelve esa tarea.
+        """
+        if self._cerrado:
+            raise RuntimeError("El ejecutor de tareas está cerrado")
+        with self._lock:
+            if clave is not None:
+                previa = self._pendientes_por_clave.get(clave)
+                if previa is not None and previa.estado == "pendiente" and not previa.cancelada:
+                    previa.funcion, previa.args, previa.kwargs = funcion, args, kwargs
+                    previa.al_terminar, previa.al_fallar, previa.al_progreso = al_terminar, al_fallar, al_progreso
+                    return previa
+            tarea = Tarea(self, funcion, args, kwargs, clave, al_terminar, al_fallar, al_progreso)
+            if clave is not None:
+                self._pendientes_por_clave[clave] = tarea
+            self._sin_entregar.add(tarea)
+        self._hilos.submit(self._correr, tarea)
+        self._avisar_ocupado()
+        self._programar_sondeo()
+        return tarea
+
+    def cancelar_todo(self) -> None:
+        """Cancela todas las tareas pendientes o en curso."""
+        with self._lock:
+            tareas = list(self._sin_entregar)
+        for tarea in tareas:
+            tarea.cancelar()
+
+    def cerrar(self) -> None:
+        """Detiene el sondeo y libera los hilos (sin esperar las tareas en curso)."""
+        self._cerrado = True
+        if self._sondeo is not None:
+            try:
+                self.raiz.after_cancel(self._sondeo)
+            except Exception:
+                pass
+            self._sondeo = None
+        self._hilos.shutdown(wait=False)
+
+    # ---- Hilo de trabajo ----
+    def _correr(self, tarea: Tarea) -> None:
+        with self._lock:
+            if self._pendientes_por_clave.get(tarea.clave) is tarea:
+                del self._pendientes_por_clave[tarea.clave]
+            if tarea.cancelada or self._cerrado:
+                tarea.estado = "cancelada"
+            else:
+                tarea.estado = "ejecutando"
+            funcion, args, kwargs = tarea.funcion, tarea.args, tarea.kwargs
+        if tarea.estado == "cancelada":
+            self._resultados.put((tarea, "cancelada", None))
+            return
+
+        _local.tarea = tarea
+        try:
+            resultado = funcion(*args, **kwargs)
+            self._resultados.put((tarea, "ok", resultado))
+        except BaseException as e:
+            self._resultados.put((tarea, "error", e))
+        finally:
+            _local.tarea = None
+
+    # ---- Hilo de la GUI ----
+    def _programar_sondeo(self) -> None:
+        if self._sondeo is None and not self._cerrado:
+            self._sondeo = self.raiz.after(self.intervalo_ms, self._sondear)
+
+    def _avisar_ocupado(self) -> None:
+        if self.al_cambiar_ocupado:
+            pendientes = self.pendientes
+            self.al_cambiar_ocupado(pendientes > 0, pendientes)
+
+    def _sondear(self) -> None:
+        self._sondeo = None
+        try:
+            while True:
+                try:
+                    tarea, tipo, valor = self._resultados.get_nowait()
+                except queue.Empty:
+                    break
+                if tipo == "progreso":
+                    if tarea.al_progreso and not tarea.cancelada:
+                        tarea.al_progreso(*valor)
+                    continue
+                with self._lock:
+                    self._sin_entregar.discard(tarea)
+                self._avisar_ocupado()
+                self._entregar(tarea, tipo, valor)
+        finally:
+            if self._sin_entregar:
+                self._programar_sondeo()
+
+    def _entregar(self, tarea: Tarea, tipo: str, valor: Any) -> None:
+        if tipo == "cancelada" or tarea.cancelada:
+            tarea.estado = "cancelada"
+            return
+        tarea.estado = "terminada"
+        if tipo == "ok":
+            if tarea.al_terminar:
+                tarea.al_terminar(valor)
+            return
+        manejador = tarea.al_fallar or self.al_fallar
+        if manejador:
+            manejador(valor)
+        else:
+            raise valor
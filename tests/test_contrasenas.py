@@ -0,0 +1,70 @@
+import unittest
+import hashlib
+import contrasenas
+
+
+class TestContrasenas(unittest.TestCase):
+    def setUp(self):
+        # Costo bajo para que las pruebas no tarden lo que tarda un login real
+        self.costo_anterior = dict(contrasenas._costos)
+        contrasenas.configurar('pbkdf2-sha256', 1000)
+
+    def tearDown(self):
+        contrasenas._costos.clear()
+        contrasenas._costos.update(self.costo_anterior)
+
+    def test_hash_versionado_con_sal(self):
+        h1 = contrasenas.hashear('secreto')
+        h2 = contrasenas.hashear('secreto')
+        self.assertTrue(h1.startswith('$pbkdf2-sha256$1000$'))
+        self.assertNotEqual(h1, h2)
+        self.assertEqual(contrasenas.identificar(h1), ('pbkdf2-sha256', 1000))
+        self.assertTrue(contrasenas.verificar('secreto', h1))
+        self.assertFalse(contrasenas.verificar('otro', h1))
+
+    def test_sha256_antiguo_se_verifica_y_pide_rehash(self):
+        antiguo = hashlib.sha256('admin2025'.encode('utf-8')).hexdigest()
+        self.assertEqual(contrasenas.identificar(antiguo), ('sha256', 0))
+        self.assertTrue(contrasenas.verificar('admin2025', antiguo))
+        self.assertFalse(contrasenas.verificar('admin', antiguo))
+        self.assertTrue(contrasenas.necesita_rehash(antiguo))
+
+    def test_rehash_cuando_sube_el_costo(self):
+        h = contrasenas.hashear('secreto')
+        self.assertFalse(contrasenas.necesita_rehash(h))
+        # Diferencias chicas entre calibraciones no provocan un rehash
+        contrasenas.configurar('pbkdf2-sha256', 1200)
+        self.assertFalse(contrasenas.necesita_rehash(h))
+        contrasenas.configurar('pbkdf2-sha256', 2000)
+        self.assertTrue(contrasenas.necesita_rehash(h))
+        self.assertTrue(contrasenas.necesita_rehash(h, costo=1300))
+        self.assertTrue(contrasenas.verificar('secreto', h))
+
+    def test_formato_desconocido(self):
+        self.assertFalse(contrasenas.verificar('x', 'texto-plano'))
+        self.assertFalse(contrasenas.verificar('x', None))
+        self.assertTrue(contrasenas.necesita_rehash('texto-plano'))
+        h = contrasenas.hashear('x')
+        for corrupto in (h + '$extra', h.rsplit('$', 1)[0], h.replace(h.split('$')[3], 'zz'),
+                         '$pbkdf2-sha256$0$00$00'):
+            self.assertFalse(contrasenas.verificar('x', corrupto))
+        with self.assertRaises(ValueError):
+            contrasenas.hashear(None)
+
+    def test_calibrar_respeta_el_minimo(self):
+        costo = contrasenas.calibrar('pbkdf2-sha256', objetivo_ms=1)
+        self.assertEqual(costo, contrasenas.COSTO_MINIMO['pbkdf2-sha256'])
+        self.assertEqual(contrasenas.costo_actual(), costo)
+        self.assertEqual(contrasenas.calibrar('pbkdf2-sha256', objetivo_ms=1000) % contrasenas.PASO_PBKDF2, 0)
+
+    def test_senuelo_cuesta_lo_mismo_y_falla(self):
+        self.assertFalse(contrasenas.verificar_senuelo('secreto'))
+        self.assertFalse(contrasenas.verificar_senuelo(None))
+        self.assertIn(('pbkdf2-sha256', 1000), contrasenas._senuelos)
+        # Con costo fijo (p. ej. el de un ServicioHash) el señuelo usa ese costo
+        self.assertFalse(contrasenas.verificar_senuelo('secreto', costo=1500))
+        self.assertIn(('pbkdf2-sha256', 1500), contrasenas._senuelos)
+
+
+if __name__ == '__main__':
+    unittest.main()
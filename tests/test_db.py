@@ -1,6 +1,10 @@
 import unittest
 import tempfile
 import os
+import sqlite3
+import threading
+import hashlib
+import contrasenas
 import db
 
 
@@ -13,10 +17,12 @@ class TestDB(unittest.TestCase):
         db.inicializar_bd(ruta_db=self.db_path)
 
     def tearDown(self):
-        try:
-            os.unlink(self.db_path)
-        except Exception:
-            pass
+        db.cerrar_conexiones(self.db_path)
+        for sufijo in ("", "-wal", "-shm"):
+            try:
+                os.unlink(self.db_path + sufijo)
+            except Exception:
+                pass
 
     def test_crud_basico(self):
         # Departamentos
@@ -51,6 +57,560 @@ class TestDB(unittest.TestCase):
         emp3 = db.obtener_empleado_por_email('t2@test.com', ruta_db=self.db_path)
         self.assertIsNone(emp3)
 
+    def test_login_rehace_hash_antiguo(self):
+        contrasenas.configurar('pbkdf2-sha256', 1000)
+        self.addCleanup(contrasenas._costos.pop, 'pbkdf2-sha256', None)
+        antiguo = hashlib.sha256('clave'.encode('utf-8')).hexdigest()
+        id_emp = db.agregar_empleado('Viejo', '', '', 'v@test.com', 1.0, antiguo, None, ruta_db=self.db_path)
+
+        self.assertFalse(db.verificar_y_actualizar_contrasena(id_emp, 'mal', antiguo, ruta_db=self.db_path))
+        self.assertEqual(db.obtener_empleado(id_emp, ruta_db=self.db_path)[6], antiguo)
+
+        self.assertTrue(db.verificar_y_actualizar_contrasena(id_emp, 'clave', antiguo, ruta_db=self.db_path))
+        nuevo = db.obtener_empleado(id_emp, ruta_db=self.db_path)[6]
+        self.assertTrue(nuevo.startswith('$pbkdf2-sha256$'))
+        self.assertTrue(db.verificar_contrasena('clave', nuevo))
+        # Un hash al día no se vuelve a escribir
+        self.assertTrue(db.verificar_y_actualizar_contrasena(id_emp, 'clave', nuevo, ruta_db=self.db_path))
+        self.assertEqual(db.obtener_empleado(id_emp, ruta_db=self.db_path)[6], nuevo)
+
+    def test_insercion_masiva(self):
+        id_dep = db.agregar_departamento('Masivo', ruta_db=self.db_path)
+        rangos = db.agregar_proyectos((('P%d' % i, '') for i in range(3)), ruta_db=self.db_path)
+        self.assertEqual(len(rangos), 1)
+        id_proj = rangos[0][0]
+
+        empleados = [('E%d' % i, '', '', 'e%d@test.com' % i, 1000.0, 'x', id_dep) for i in range(5)]
+        rangos_emp = db.agregar_empleados(empleados, tamano_lote=2, ruta_db=self.db_path)
+        self.assertEqual(rangos_emp[0][1] - rangos_emp[0][0] + 1, 5)
+
+        registros = ((rangos_emp[0][0], id_proj, '2025-12-01', 1.0) for _ in range(250))
+        rangos_reg = db.agregar_registros_tiempo(registros, tamano_lote=100, ruta_db=self.db_path)
+        self.assertEqual(len(rangos_reg), 1)
+        primero, ultimo = rangos_reg[0]
+        self.assertEqual(ultimo - primero + 1, 250)
+        self.assertEqual(len(db.listar_registros(ruta_db=self.db_path)), 250)
+
+        # Las asignaciones repetidas se ignoran y no cuentan en los rangos
+        asignaciones = [(rangos_emp[0][0], id_proj), (rangos_emp[0][0], id_proj), (rangos_emp[0][1], id_proj)]
+        rangos_asig = db.asignar_empleados_a_proyectos(asignaciones, ruta_db=self.db_path)
+        self.assertEqual(rangos_asig[0][1] - rangos_asig[0][0] + 1, 2)
+
+    def test_insercion_masiva_es_atomica(self):
+        empleados = [('A', '', '', 'dup@test.com', 1.0, 'x', None),
+                     ('B', '', '', 'otro@test.com', 1.0, 'x', None),
+                     ('C', '', '', 'dup@test.com', 1.0, 'x', None)]
+        with self.assertRaises(sqlite3.IntegrityError):
+            db.agregar_empleados(empleados, tamano_lote=1, ruta_db=self.db_path)
+        self.assertEqual(db.listar_empleados(ruta_db=self.db_path), [])
+
+    def test_insercion_masiva_dentro_de_transaccion_ajena(self):
+        id_dep = db.agregar_departamento('Anidada', ruta_db=self.db_path)
+        with self.assertRaises(RuntimeError):
+            with db.conexion(self.db_path) as conn:
+                conn.execute("INSERT INTO proyectos (nombre, descripcion) VALUES ('Externo', '')")
+                db.agregar_empleados([('A', '', '', 'a@x.com', 1.0, 'h', id_dep)], ruta_db=self.db_path)
+                raise RuntimeError('falla después de la inserción masiva')
+        # No se confirmó nada a mitad de camino: se deshizo todo el bloque externo
+        self.assertEqual(db.listar_empleados(ruta_db=self.db_path), [])
+        self.assertEqual(db.listar_proyectos(ruta_db=self.db_path, usar_cache=False), [])
+
+    def test_iteradores_y_paginacion(self):
+        ids = [db.agregar_proyecto('P%d' % i, ruta_db=self.db_path) for i in range(7)]
+        iterados = [p[0] for p in db.iterar_proyectos(tamano_bloque=3, ruta_db=self.db_path)]
+        self.assertEqual(iterados, ids)
+        self.assertEqual([p[0] for p in db.listar_proyectos(ruta_db=self.db_path)], ids)
+
+        paginas = []
+        ultimo = 0
+        while True:
+            pagina = db.paginar_proyectos(despues_de_id=ultimo, limite=3, ruta_db=self.db_path)
+            if not pagina:
+                break
+            paginas.append([p[0] for p in pagina])
+            ultimo = pagina[-1][0]
+        self.assertEqual(paginas, [ids[0:3], ids[3:6], ids[6:7]])
+
+    def test_iterador_abandonado_devuelve_conexion(self):
+        for i in range(3):
+            db.agregar_departamento('D%d' % i, ruta_db=self.db_path)
+        pool = db.obtener_pool(self.db_path)
+        it = db.iterar_departamentos(tamano_bloque=1, ruta_db=self.db_path)
+        next(it)
+        # Mientras el iterador está suspendido se puede seguir escribiendo
+        db.agregar_departamento('Otro', ruta_db=self.db_path)
+        it.close()
+        estado = pool.estado()
+        self.assertEqual(estado['ociosas'], estado['abiertas'])
+
+    def test_resumen_diario_sigue_a_registros(self):
+        id_proj = db.agregar_proyecto('R', ruta_db=self.db_path)
+        id_emp = db.agregar_empleado('R', '', '', 'r@test.com', 1.0, 'x', None, ruta_db=self.db_path)
+        db.agregar_registros_tiempo([(id_emp, id_proj, '2025-12-01', 2.0),
+                                     (id_emp, id_proj, '2025-12-01', 3.0),
+                                     (id_emp, id_proj, '2025-12-02', 1.0)], ruta_db=self.db_path)
+        with db.conexion(self.db_path) as conn:
+            conn.execute("UPDATE registros_tiempo SET fecha = '2025-12-03' WHERE fecha = '2025-12-02'")
+            conn.execute("DELETE FROM registros_tiempo WHERE horas = 2.0")
+            resumen = conn.execute("SELECT fecha, total_horas, cantidad FROM resumen_horas_diarias"
+                                   " ORDER BY fecha").fetchall()
+        self.assertEqual(resumen, [('2025-12-01', 3.0, 1), ('2025-12-03', 1.0, 1)])
+        self.assertEqual(db.verificar_resumen_horas(ruta_db=self.db_path), [])
+
+        db.eliminar_empleado(id_emp, ruta_db=self.db_path)
+        self.assertEqual(db.verificar_resumen_horas(ruta_db=self.db_path), [])
+
+    def test_verificar_y_reconstruir_resumen(self):
+        id_proj = db.agregar_proyecto('R', ruta_db=self.db_path)
+        db.agregar_registro_tiempo(1, id_proj, '2025-12-01', 4.0, ruta_db=self.db_path)
+        with db.conexion(self.db_path) as conn:
+            conn.execute("UPDATE resumen_horas_diarias SET total_horas = 9")
+            conn.execute("INSERT INTO resumen_horas_diarias VALUES (7, 7, '2025-01-01', 1, 1)")
+        diferencias = db.verificar_resumen_horas(ruta_db=self.db_path)
+        self.assertEqual(sorted(d[0] for d in diferencias), [1, 7])
+        db.reconstruir_resumen_horas(ruta_db=self.db_path)
+        self.assertEqual(db.verificar_resumen_horas(ruta_db=self.db_path), [])
+
+        # Dentro de una transacción ajena no confirma por su cuenta
+        with self.assertRaises(RuntimeError):
+            with db.conexion(self.db_path) as conn:
+                conn.execute("DELETE FROM registros_tiempo")
+                db.reconstruir_resumen_horas(ruta_db=self.db_path)
+                raise RuntimeError('falla')
+        self.assertEqual(len(db.listar_registros(ruta_db=self.db_path)), 1)
+        self.assertEqual(db.verificar_resumen_horas(ruta_db=self.db_path), [])
+
+    def test_cache_de_referencia(self):
+        db.invalidar_cache()
+        inicial = db.estadisticas_cache()
+        id_dep = db.agregar_departamento('Cache', ruta_db=self.db_path)
+        db.listar_departamentos(ruta_db=self.db_path)
+        db.listar_departamentos(ruta_db=self.db_path)
+        stats = db.estadisticas_cache()
+        self.assertEqual(stats['fallos'] - inicial['fallos'], 1)
+        self.assertEqual(stats['aciertos'] - inicial['aciertos'], 1)
+
+        # Las escrituras del módulo invalidan la tabla afectada
+        db.asignar_gerente_departamento(id_dep, 42, ruta_db=self.db_path)
+        self.assertEqual(db.listar_departamentos(ruta_db=self.db_path)[0][2], 42)
+        self.assertEqual(db.obtener_departamento(id_dep, ruta_db=self.db_path)[2], 42)
+        db.actualizar_departamento(id_dep, 'Renombrado', ruta_db=self.db_path)
+        self.assertEqual(db.obtener_departamento(id_dep, ruta_db=self.db_path)[1], 'Renombrado')
+
+        # Cambios por fuera del módulo: solo se ven sin caché o tras invalidar
+        with db.conexion(self.db_path) as conn:
+            conn.execute("UPDATE departamentos SET nombre = 'Externo'")
+        self.assertEqual(db.obtener_departamento(id_dep, ruta_db=self.db_path)[1], 'Renombrado')
+        self.assertEqual(db.obtener_departamento(id_dep, ruta_db=self.db_path, usar_cache=False)[1], 'Externo')
+        db.invalidar_cache('departamentos', ruta_db=self.db_path)
+        self.assertEqual(db.listar_departamentos(ruta_db=self.db_path)[0][1], 'Externo')
+
+    def test_cache_acotada(self):
+        cache = db.CacheReferencia(tamano_maximo=2)
+        for i in range(3):
+            cache.obtener(self.db_path, 'proyectos', ('id', i), lambda: i)
+        self.assertEqual(cache.estadisticas()['entradas'], 2)
+        cache.obtener(self.db_path, 'proyectos', ('id', 0), lambda: 'recargado')
+        self.assertEqual(cache.estadisticas()['fallos'], 4)
+
+    def test_consultar_ventana_ordenada(self):
+        for nombre in ['C', 'A', 'B', 'A']:
+            db.agregar_proyecto(nombre, ruta_db=self.db_path)
+        self.assertEqual(db.contar_filas('proyectos', ruta_db=self.db_path), 4)
+        ventana = db.consultar_ventana('proyectos', 1, 2, 'nombre', ruta_db=self.db_path)
+        self.assertEqual([(p[0], p[1]) for p in ventana], [(4, 'A'), (3, 'B')])
+        ventana = db.consultar_ventana('proyectos', 0, 2, 'id', descendente=True, ruta_db=self.db_path)
+        self.assertEqual([p[0] for p in ventana], [4, 3])
+        with self.assertRaises(ValueError):
+            db.consultar_ventana('proyectos', 0, 2, 'nombre; DROP TABLE proyectos', ruta_db=self.db_path)
+        with self.assertRaises(ValueError):
+            db.consultar_ventana('proyectos', 0, 2, 'descripcion', ruta_db=self.db_path)
+
+    def test_consultar_ventana_por_clave(self):
+        # salario admite NULL: van primero en orden ascendente y al final en descendente
+        salarios = [3.0, None, 1.0, 3.0, None, 2.0, 1.0]
+        db.agregar_empleados([(f'E{i}', '', '', f'e{i}@x.com', s, 'h', None) for i, s in enumerate(salarios)],
+                             ruta_db=self.db_path)
+        for descendente in (False, True):
+            esperado = db.consultar_ventana('empleados', 0, 10, 'salario', descendente, ruta_db=self.db_path)
+            paginas, ancla = [], None
+            while True:
+                pagina = db.consultar_ventana('empleados', 0, 2, 'salario', descendente, despues_de=ancla,
+                                              ruta_db=self.db_path)
+                if not pagina:
+                    break
+                paginas += pagina
+                ancla = (pagina[-1][5], pagina[-1][0])
+            self.assertEqual(paginas, esperado)
+        # cada página busca en el índice en vez de ordenar la tabla entera
+        plan = self._plan("SELECT id FROM registros_tiempo WHERE (fecha, id) > (?, ?)"
+                          " ORDER BY fecha, id LIMIT 100", ('2025-01-01', 1))
+        self.assertIn('idx_registros_orden_fecha', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def _plan(self, sql, params=()):
+        with db.conexion(self.db_path) as conn:
+            filas = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        return " | ".join(f[-1] for f in filas)
+
+    def test_registro_de_cambios(self):
+        inicio = db.ultimo_cambio(self.db_path)
+        id_dep = db.agregar_departamento('Cambios', ruta_db=self.db_path)
+        id_emp = db.agregar_empleado('Ana', 'D', '1', 'ana@x.com', 10.0, 'h', id_dep, ruta_db=self.db_path)
+        db.actualizar_departamento(id_dep, 'Cambios 2', ruta_db=self.db_path)
+        db.eliminar_empleado(id_emp, ruta_db=self.db_path)
+        cambios = db.cambios_desde(inicio, ruta_db=self.db_path)
+        self.assertEqual([(t, i, op) for _, t, i, op in cambios], [
+            ('departamentos', id_dep, 'I'), ('empleados', id_emp, 'I'),
+            ('departamentos', id_dep, 'U'), ('empleados', id_emp, 'D'),
+        ])
+        seqs = [c[0] for c in cambios]
+        self.assertEqual(seqs, sorted(seqs))
+        self.assertEqual(db.ultimo_cambio(self.db_path), seqs[-1])
+        self.assertEqual(db.cambios_desde(seqs[1], limite=1, ruta_db=self.db_path), cambios[2:3])
+        self.assertEqual(db.obtener_filas('departamentos', [id_dep, 999], ruta_db=self.db_path),
+                         {id_dep: (id_dep, 'Cambios 2', None)})
+
+    def test_purgar_cambios(self):
+        db.agregar_proyectos([(f'P{i}', '') for i in range(10)], ruta_db=self.db_path)
+        ultimo = db.ultimo_cambio(self.db_path)
+        self.assertEqual(db.purgar_cambios(conservar=3, ruta_db=self.db_path), 7)
+        self.assertEqual(db.ultimo_cambio(self.db_path), ultimo)
+        self.assertFalse(db.cambios_perdidos(ultimo - 3, ruta_db=self.db_path))
+        self.assertTrue(db.cambios_perdidos(ultimo - 5, ruta_db=self.db_path))
+        db.purgar_cambios(conservar=0, ruta_db=self.db_path)
+        self.assertFalse(db.cambios_perdidos(ultimo, ruta_db=self.db_path))
+        self.assertTrue(db.cambios_perdidos(ultimo - 1, ruta_db=self.db_path))
+
+    def test_busqueda_texto_completo(self):
+        ana = db.agregar_empleado('Ana García', 'Calle Sol 1', '555-1234', 'ana@eco.cl', 1.0, 'h', None,
+                                  ruta_db=self.db_path)
+        anabel = db.agregar_empleado('Anabel Pérez', 'Av. Luna', '777', 'ana.perez@eco.cl', 1.0, 'h', None,
+                                     ruta_db=self.db_path)
+
+        def ids(filas):
+            return [f[0] for f in filas]
+
+        # prefijos y sin tildes; el nombre pesa más que la dirección
+        self.assertCountEqual(ids(db.buscar('ana', ruta_db=self.db_path)), [ana, anabel])
+        luna = db.agregar_empleado('Luna Rojas', 'Calle', '1', 'lr@eco.cl', 1.0, 'h', None, ruta_db=self.db_path)
+        self.assertEqual(ids(db.buscar('luna', ruta_db=self.db_path)), [luna, anabel])
+        self.assertEqual(ids(db.buscar('perez', ruta_db=self.db_path)), [anabel])
+        self.assertEqual(ids(db.buscar('ana gar', ruta_db=self.db_path)), [ana])
+        self.assertEqual(db.buscar('  ', ruta_db=self.db_path), [])
+        # los triggers mantienen el índice al día
+        db.actualizar_empleado(ana, 'Ana Soto', 'Calle', '555', 'ana@eco.cl', 1.0, None, ruta_db=self.db_path)
+        self.assertEqual(db.buscar('garcia', ruta_db=self.db_path), [])
+        self.assertEqual(ids(db.buscar('soto', ruta_db=self.db_path)), [ana])
+        db.eliminar_empleado(anabel, ruta_db=self.db_path)
+        self.assertEqual(db.buscar('anabel', ruta_db=self.db_path), [])
+
+        proj = db.agregar_proyecto('Portal web', 'Rediseño del sitio', ruta_db=self.db_path)
+        self.assertEqual(db.buscar_proyectos('redise', ruta_db=self.db_path),
+                         [(proj, 'Portal web', 'Rediseño del sitio')])
+        # departamentos va por LIKE: '_' se busca literal, no como comodín
+        ti = db.agregar_departamento('TI_Soporte', ruta_db=self.db_path)
+        db.agregar_departamento('TIXSoporte', ruta_db=self.db_path)
+        self.assertEqual(ids(db.buscar_departamentos('ti_sop', ruta_db=self.db_path)), [ti])
+        with self.assertRaises(ValueError):
+            db.buscar('x', 'registros_tiempo', ruta_db=self.db_path)
+
+    def test_obtener_por_clave_primaria(self):
+        id_dep = db.agregar_departamento('Ventas', ruta_db=self.db_path)
+        ids = db.agregar_empleados([(f'E{i}', 'D', '1', f'e{i}@x.com', 10.0, 'h', id_dep) for i in range(3)],
+                                   ruta_db=self.db_path)
+        primero = ids[0][0]
+        self.assertEqual(db.obtener_empleado(primero, ruta_db=self.db_path),
+                         db.obtener_empleado_por_email('e0@x.com', ruta_db=self.db_path))
+        self.assertIsNone(db.obtener_empleado(9999, ruta_db=self.db_path))
+
+        por_ids = db.obtener_empleados_por_ids([primero + 2, primero, 9999, primero], ruta_db=self.db_path)
+        self.assertEqual(sorted(por_ids), [primero, primero + 2])
+        self.assertEqual(por_ids[primero + 2][4], 'e2@x.com')
+        self.assertEqual(db.obtener_departamentos_por_ids([id_dep], ruta_db=self.db_path),
+                         {id_dep: (id_dep, 'Ventas', None)})
+        proyectos = db.agregar_proyectos([(f'P{i}', '') for i in range(600)], ruta_db=self.db_path)
+        todos = range(proyectos[0][0], proyectos[0][1] + 1)
+        self.assertEqual(len(db.obtener_proyectos_por_ids(todos, ruta_db=self.db_path)), 600)
+
+        with db.conexion(self.db_path) as conn:
+            plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM empleados WHERE id = ?", (primero,)).fetchall()
+        self.assertIn('INTEGER PRIMARY KEY', ' '.join(str(f[-1]) for f in plan))
+
+    def test_pasarela_get_db(self):
+        pasarela = db.get_db('sqlite', ruta_db=self.db_path)
+        self.assertIs(db.get_db('sqlite', ruta_db=self.db_path), pasarela)
+
+        id_usr = pasarela.ejecutar_query(
+            "INSERT INTO usuarios (nombre_usuario, password, correo, rol) VALUES (%s, %s, %s, %s)",
+            ('ana', 'h', 'ana@x.com', 'admin'), commit=True)
+        filas = pasarela.ejecutar_query("SELECT id, nombre_usuario, rol FROM usuarios WHERE id = %s", (id_usr,))
+        self.assertEqual(filas, [{'id': id_usr, 'nombre_usuario': 'ana', 'rol': 'admin'}])
+
+        # Sin commit la escritura se descarta
+        self.assertEqual(pasarela.ejecutar_query("DELETE FROM usuarios WHERE id = %s", (id_usr,)), 1)
+        self.assertEqual(len(pasarela.ejecutar_query("SELECT id FROM usuarios")), 1)
+
+        with self.assertRaises(db.IntegridadError):
+            pasarela.ejecutar_query("INSERT INTO usuarios (nombre_usuario, password, correo) VALUES (%s, %s, %s)",
+                                    ('ana', 'h', 'otro@x.com'), commit=True)
+        with self.assertRaises(db.ErrorBD):
+            pasarela.ejecutar_query("SELECT * FROM no_existe")
+
+        # Una transacción confirma todo junto o nada
+        with self.assertRaises(RuntimeError):
+            with pasarela.transaccion():
+                pasarela.ejecutar_query("INSERT INTO usuarios (nombre_usuario, password, correo)"
+                                        " VALUES (%s, %s, %s)", ('beto', 'h', 'beto@x.com'))
+                raise RuntimeError('falla')
+        with pasarela.transaccion():
+            for nombre in ('carla', 'dario'):
+                pasarela.ejecutar_query("INSERT INTO usuarios (nombre_usuario, password, correo)"
+                                        " VALUES (%s, %s, %s)", (nombre, 'h', f'{nombre}@x.com'))
+        self.assertEqual([f['nombre_usuario'] for f in pasarela.ejecutar_query(
+            "SELECT nombre_usuario FROM usuarios ORDER BY id")], ['ana', 'carla', 'dario'])
+
+        estadisticas = pasarela.estadisticas()
+        self.assertEqual(estadisticas['backend'], 'sqlite')
+        self.assertEqual(estadisticas['commits'], 2)
+        self.assertGreaterEqual(estadisticas['rollbacks'], 3)
+        self.assertLessEqual(estadisticas['abiertas'], estadisticas['tamano'])
+        with self.assertRaises(TypeError):
+            db.PasarelaBD()
+
+    def test_pasarela_dentro_de_conexion_ajena(self):
+        pasarela = db.get_db('sqlite', ruta_db=self.db_path)
+        insertar = "INSERT INTO usuarios (nombre_usuario, password, correo) VALUES (%s, %s, %s)"
+        with self.assertRaises(RuntimeError):
+            with db.conexion(self.db_path) as conn:
+                conn.execute("INSERT INTO proyectos (nombre, descripcion) VALUES ('Externo', '')")
+                pasarela.ejecutar_query(insertar, ('ana', 'h', 'ana@x.com'))
+                with self.assertRaises(db.IntegridadError):
+                    pasarela.ejecutar_query(insertar, ('ana', 'h', 'otra@x.com'), commit=True)
+                # ni commit=False ni el error deshicieron (ni confirmaron) el bloque externo
+                self.assertTrue(conn.in_transaction)
+                self.assertEqual(conn.execute("SELECT COUNT(*) FROM proyectos").fetchone()[0], 1)
+                raise RuntimeError('falla el bloque externo')
+        self.assertEqual(pasarela.ejecutar_query("SELECT COUNT(*) AS n FROM usuarios"), [{'n': 0}])
+        self.assertEqual(db.contar_filas('proyectos', ruta_db=self.db_path), 0)
+
+        with db.conexion(self.db_path):
+            pasarela.ejecutar_query(insertar, ('beto', 'h', 'beto@x.com'))
+            pasarela.ejecutar_muchos(insertar, [('carla', 'h', 'carla@x.com')])
+            with pasarela.transaccion():
+                pasarela.ejecutar_query(insertar, ('dario', 'h', 'dario@x.com'))
+        # los confirma el bloque externo al salir
+        self.assertEqual(pasarela.ejecutar_query("SELECT COUNT(*) AS n FROM usuarios"), [{'n': 3}])
+
+    def test_pasarela_compartida_entre_hilos(self):
+        pasarela = db.get_db('sqlite', ruta_db=self.db_path)
+        errores = []
+
+        def insertar(n):
+            try:
+                for i in range(20):
+                    pasarela.ejecutar_query("INSERT INTO usuarios (nombre_usuario, password, correo)"
+                                            " VALUES (%s, %s, %s)", (f'u{n}_{i}', 'h', f'u{n}_{i}@x.com'),
+                                            commit=True)
+            except Exception as e:
+                errores.append(e)
+
+        hilos = [threading.Thread(target=insertar, args=(n,)) for n in range(8)]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        self.assertEqual(errores, [])
+        self.assertEqual(pasarela.ejecutar_query("SELECT COUNT(*) AS n FROM usuarios"), [{'n': 160}])
+        self.assertLessEqual(pasarela.estadisticas()['creadas'], db.TAMANO_POOL_DEFAULT)
+        with self.assertRaises(ValueError):
+            db.get_db('oracle')
+
+    def test_indices_registros_tiempo(self):
+        plan = self._plan("SELECT SUM(horas) FROM registros_tiempo"
+                          " WHERE empleado_id = ? AND fecha BETWEEN ? AND ?", (1, '2025-01-01', '2025-12-31'))
+        self.assertIn("COVERING INDEX idx_registros_empleado_fecha", plan)
+        plan = self._plan("SELECT SUM(horas) FROM registros_tiempo"
+                          " WHERE proyecto_id = ? AND fecha >= ?", (1, '2025-01-01'))
+        self.assertIn("COVERING INDEX idx_registros_proyecto_fecha", plan)
+        plan = self._plan("DELETE FROM registros_tiempo WHERE empleado_id = ?", (1,))
+        self.assertNotIn("SCAN", plan)
+
+    def test_indices_asignaciones_y_departamentos(self):
+        plan = self._plan("DELETE FROM proyectos_empleados WHERE proyecto_id = ?", (1,))
+        self.assertIn("idx_proyectos_empleados_proyecto", plan)
+        plan = self._plan("SELECT id FROM empleados WHERE departamento_id = ?", (1,))
+        self.assertIn("idx_empleados_departamento", plan)
+
+
+class TestMigraciones(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.NamedTemporaryFile(delete=False)
+        self.db_path = self.tmp.name
+        self.tmp.close()
+
+    def tearDown(self):
+        db.cerrar_conexiones(self.db_path)
+        for sufijo in ("", "-wal", "-shm"):
+            try:
+                os.unlink(self.db_path + sufijo)
+            except Exception:
+                pass
+
+    def test_bd_nueva_queda_en_ultima_version(self):
+        version = db.inicializar_bd(ruta_db=self.db_path)
+        self.assertEqual(version, db.MIGRACIONES[-1][0])
+        self.assertEqual(db.version_esquema(self.db_path), version)
+
+    def test_esquema_al_dia_solo_lee_user_version(self):
+        db.inicializar_bd(ruta_db=self.db_path)
+        sentencias = []
+        with db.conexion(self.db_path) as conn:
+            conn.set_trace_callback(sentencias.append)
+            try:
+                db.inicializar_bd(ruta_db=self.db_path)
+            finally:
+                conn.set_trace_callback(None)
+        self.assertEqual(sentencias, ["PRAGMA user_version"])
+
+    def test_migra_bd_existente_sin_version(self):
+        # BD creada antes de las migraciones: tablas presentes y user_version = 0
+        conn = db.obtener_conexion(self.db_path)
+        for sql in db.MIGRACIONES[0][2]:
+            conn.execute(sql)
+        conn.execute("INSERT INTO departamentos (nombre) VALUES ('Legado')")
+        conn.commit()
+        conn.close()
+
+        db.inicializar_bd(ruta_db=self.db_path)
+        self.assertEqual(db.listar_departamentos(ruta_db=self.db_path)[0][1], 'Legado')
+        with db.conexion(self.db_path) as conn:
+            indices = {f[0] for f in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertIn('idx_registros_empleado_fecha', indices)
+
+    def test_migracion_fallida_no_deja_cambios(self):
+        ultima = db.MIGRACIONES[-1][0]
+        db.MIGRACIONES.append((ultima + 1, "Rota", [
+            "CREATE INDEX idx_temporal ON empleados (email)",
+            "SELECT * FROM tabla_inexistente",
+        ]))
+        try:
+            with self.assertRaises(Exception):
+                db.inicializar_bd(ruta_db=self.db_path)
+        finally:
+            db.MIGRACIONES.pop()
+        self.assertEqual(db.version_esquema(self.db_path), 0)
+        with db.conexion(self.db_path) as conn:
+            tablas = conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0]
+        self.assertEqual(tablas, 0)
+
+
+class TestPoolConexiones(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.NamedTemporaryFile(delete=False)
+        self.db_path = self.tmp.name
+        self.tmp.close()
+        db.inicializar_bd(ruta_db=self.db_path)
+
+    def tearDown(self):
+        db.cerrar_conexiones(self.db_path)
+        for sufijo in ("", "-wal", "-shm"):
+            try:
+                os.unlink(self.db_path + sufijo)
+            except Exception:
+                pass
+
+    def test_reutiliza_conexion(self):
+        with db.conexion(self.db_path) as c1:
+            pass
+        with db.conexion(self.db_path) as c2:
+            pass
+        self.assertIs(c1, c2)
+
+    def test_llamadas_anidadas_usan_misma_conexion(self):
+        pool = db.PoolConexiones(self.db_path, tamano=1, timeout=0.1)
+        with pool.conexion() as externa:
+            with pool.conexion() as interna:
+                self.assertIs(externa, interna)
+        pool.cerrar()
+
+    def test_pool_agotado(self):
+        pool = db.PoolConexiones(self.db_path, tamano=1, timeout=0.05)
+        prestada = threading.Event()
+        liberar = threading.Event()
+
+        def ocupar():
+            with pool.conexion():
+                prestada.set()
+                liberar.wait(2)
+
+        hilo = threading.Thread(target=ocupar)
+        hilo.start()
+        prestada.wait(2)
+        self.assertEqual((pool.estado()['abiertas'], pool.estado()['ociosas']), (1, 0))
+        with self.assertRaises(db.PoolAgotadoError):
+            with pool.conexion():
+                pass
+        liberar.set()
+        hilo.join()
+        self.assertEqual(pool.estado()['ociosas'], 1)
+        self.assertEqual(pool.estado()['esperas'], 1)
+        pool.cerrar()
+
+    def test_verificacion_reemplaza_conexion_rota(self):
+        pool = db.PoolConexiones(self.db_path, tamano=1, intervalo_verificacion=0)
+        with pool.conexion() as c1:
+            pass
+        c1.close()
+        with pool.conexion() as c2:
+            self.assertEqual(c2.execute("SELECT 1").fetchone(), (1,))
+        self.assertIsNot(c1, c2)
+        self.assertEqual(pool.estadisticas["descartadas"], 1)
+        pool.cerrar()
+
+    def test_rollback_si_hay_excepcion(self):
+        with self.assertRaises(RuntimeError):
+            with db.conexion(self.db_path) as conn:
+                conn.execute("INSERT INTO departamentos (nombre) VALUES ('X')")
+                raise RuntimeError("fallo")
+        self.assertEqual(db.listar_departamentos(ruta_db=self.db_path), [])
+
+
+class TestPerfilesRendimiento(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.NamedTemporaryFile(delete=False)
+        self.db_path = self.tmp.name
+        self.tmp.close()
+
+    def tearDown(self):
+        db.configurar_perfil('balanceado')
+        for sufijo in ("", "-wal", "-shm"):
+            try:
+                os.unlink(self.db_path + sufijo)
+            except Exception:
+                pass
+
+    def test_perfil_balanceado_usa_wal(self):
+        conn = db.obtener_conexion(self.db_path, perfil='balanced')
+        try:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)
+            self.assertEqual(conn.execute("PRAGMA cache_size").fetchone()[0], -16000)
+        finally:
+            conn.close()
+
+    def test_configurar_perfil_aplica_a_conexiones_del_pool(self):
+        db.configurar_perfil('bulk-load')
+        self.assertEqual(db.perfil_actual(), 'carga_masiva')
+        with db.conexion(self.db_path) as conn:
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 0)
+            self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0], 30000)
+        db.cerrar_conexiones(self.db_path)
+
+    def test_perfil_desconocido(self):
+        with self.assertRaises(ValueError):
+            db.configurar_perfil('turbo')
+
 
 if __name__ == '__main__':
     unittest.main()
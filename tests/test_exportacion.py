@@ -0,0 +1,70 @@
+import unittest
+import tempfile
+import os
+import csv
+import gzip
+import json
+import db
+import exportacion
+
+
+class TestExportacion(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.dir, 'test.db')
+        db.inicializar_bd(ruta_db=self.db_path)
+        self.proj = db.agregar_proyecto('Portal', ruta_db=self.db_path)
+        self.emp = db.agregar_empleado('Ana', '', '', 'ana@test.com', 1.0, 'x', None, ruta_db=self.db_path)
+        otro = db.agregar_empleado('Beto', '', '', 'beto@test.com', 1.0, 'x', None, ruta_db=self.db_path)
+        db.agregar_registros_tiempo(
+            [(self.emp, self.proj, '2025-12-%02d' % (i % 28 + 1), 1.5) for i in range(25)]
+            + [(otro, self.proj, '2025-11-01', 8.0)],
+            ruta_db=self.db_path)
+
+    def tearDown(self):
+        db.cerrar_conexiones(self.db_path)
+        for nombre in os.listdir(self.dir):
+            os.unlink(os.path.join(self.dir, nombre))
+        os.rmdir(self.dir)
+
+    def test_csv_con_nombres_y_filtros(self):
+        ruta = os.path.join(self.dir, 'reporte.csv')
+        n = exportacion.exportar_registros(ruta, empleado_id=self.emp, fecha_desde='2025-12-01',
+                                           ruta_db=self.db_path)
+        self.assertEqual(n, 25)
+        with open(ruta, newline='', encoding='utf-8') as f:
+            filas = list(csv.reader(f))
+        self.assertEqual(filas[0], exportacion.ENCABEZADOS_CSV)
+        self.assertEqual(filas[1][2:5], ['Ana', str(self.proj), 'Portal'])
+        self.assertEqual(len(filas), 26)
+
+    def test_csv_gz_y_ndjson(self):
+        ruta_gz = os.path.join(self.dir, 'reporte.csv.gz')
+        exportacion.exportar_registros(ruta_gz, ruta_db=self.db_path)
+        with gzip.open(ruta_gz, 'rt', encoding='utf-8') as f:
+            self.assertEqual(len(f.read().splitlines()), 27)
+
+        ruta_json = os.path.join(self.dir, 'reporte.ndjson')
+        exportacion.exportar_registros(ruta_json, fecha_hasta='2025-11-30', ruta_db=self.db_path)
+        with open(ruta_json, encoding='utf-8') as f:
+            objetos = [json.loads(linea) for linea in f]
+        self.assertEqual(objetos, [{'id': 26, 'empleado_id': self.emp + 1, 'empleado': 'Beto',
+                                    'proyecto_id': self.proj, 'proyecto': 'Portal',
+                                    'fecha': '2025-11-01', 'horas': 8.0}])
+
+    def test_progreso_y_cancelacion(self):
+        ruta = os.path.join(self.dir, 'reporte.csv')
+        avances = []
+        exportacion.exportar_registros(ruta, progreso=lambda n, total: avances.append((n, total)),
+                                       tamano_bloque=10, ruta_db=self.db_path)
+        self.assertEqual(avances, [(10, 26), (20, 26), (26, 26)])
+
+        os.unlink(ruta)
+        with self.assertRaises(exportacion.ExportacionCancelada):
+            exportacion.exportar_registros(ruta, progreso=lambda n, total: False,
+                                           tamano_bloque=10, ruta_db=self.db_path)
+        self.assertFalse(any(n.startswith('reporte') for n in os.listdir(self.dir)))
+
+
+if __name__ == '__main__':
+    unittest.main()
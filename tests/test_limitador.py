@@ -0,0 +1,85 @@
+import unittest
+import threading
+import limitador
+
+
+class TestLimitador(unittest.TestCase):
+    def test_cubeta_se_vacia_y_recarga(self):
+        cubeta = limitador.CubetaTokens(2, 1000)
+        self.assertTrue(cubeta.tomar())
+        self.assertTrue(cubeta.tomar())
+        lenta = limitador.CubetaTokens(1, 0.001)
+        self.assertTrue(lenta.tomar())
+        self.assertFalse(lenta.tomar())
+        self.assertGreater(lenta.espera(), 900)
+        lenta.devolver()
+        self.assertTrue(lenta.tomar())
+        with self.assertRaises(ValueError):
+            limitador.CubetaTokens(0, 1)
+
+    def test_limite_por_cuenta(self):
+        lim = limitador.LimitadorLogin(intentos_cuenta=3, recarga_cuenta=0.001)
+        for _ in range(3):
+            with lim.intento('Ana@x.com'):
+                pass
+        with self.assertRaises(limitador.LoginLimitadoError) as ctx:
+            with lim.intento('ana@x.com '):  # misma cuenta, sin distinguir mayúsculas
+                pass
+        self.assertGreater(ctx.exception.reintentar_en, 0)
+        with lim.intento('beto@x.com'):
+            pass
+        est = lim.estadisticas()
+        self.assertEqual((est['permitidos'], est['rechazados_cuenta'], est['cuentas']), (4, 1, 2))
+
+    def test_limite_global_no_gasta_la_cuenta(self):
+        lim = limitador.LimitadorLogin(intentos_cuenta=2, recarga_cuenta=0.001,
+                                       intentos_global=3, recarga_global=0.001)
+        for i in range(3):
+            with lim.intento(f'u{i}'):
+                pass
+        with self.assertRaises(limitador.LoginLimitadoError):
+            with lim.intento('ana'):
+                pass
+        self.assertEqual(lim.estadisticas()['rechazados_global'], 1)
+        # El token de 'ana' se devolvió: sigue teniendo sus 2 intentos
+        self.assertTrue(lim._cubeta('ana').tomar(2))
+
+    def test_tope_de_hashes_simultaneos(self):
+        lim = limitador.LimitadorLogin(hashes_simultaneos=1, espera_max=0.05)
+        adentro, salir = threading.Event(), threading.Event()
+
+        def ocupar():
+            with lim.intento('ana'):
+                adentro.set()
+                salir.wait(5)
+
+        hilo = threading.Thread(target=ocupar)
+        hilo.start()
+        adentro.wait(5)
+        with self.assertRaises(limitador.LoginLimitadoError):
+            with lim.intento('beto'):
+                pass
+        self.assertEqual(lim.estadisticas()['en_curso'], 1)
+        salir.set()
+        hilo.join()
+        with lim.intento('beto'):
+            pass
+        est = lim.estadisticas()
+        self.assertEqual((est['encolados'], est['rechazados_espera'], est['en_curso']), (1, 1, 0))
+
+    def test_cuentas_recordadas_acotadas(self):
+        lim = limitador.LimitadorLogin(max_cuentas=10)
+        for i in range(50):
+            with lim.intento(f'u{i}'):
+                pass
+        self.assertEqual(lim.estadisticas()['cuentas'], 10)
+
+    def test_limitador_compartido(self):
+        self.assertIs(limitador.obtener_limitador(), limitador.obtener_limitador())
+        nuevo = limitador.configurar_limitador(intentos_cuenta=1)
+        self.addCleanup(limitador.configurar_limitador)
+        self.assertIs(limitador.obtener_limitador(), nuevo)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,240 @@
+import unittest
+import tempfile
+import os
+import io
+import threading
+from concurrent.futures import Future
+import contrasenas
+import db
+import limitador
+import sesiones
+import modelos
+
+
+class TestGestorUsuarios(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.NamedTemporaryFile(delete=False)
+        self.db_path = self.tmp.name
+        self.tmp.close()
+        self.pasarela = db.get_db('sqlite', ruta_db=self.db_path)
+        self.almacen = sesiones.AlmacenSesiones()
+        self.gestor = modelos.GestorUsuarios(db=self.pasarela, almacen_sesiones=self.almacen)
+
+    def tearDown(self):
+        db.cerrar_pasarelas()
+        for sufijo in ("", "-wal", "-shm"):
+            try:
+                os.unlink(self.db_path + sufijo)
+            except Exception:
+                pass
+
+    def _crear(self, nombres, rol='usuario'):
+        with self.pasarela.transaccion():
+            for nombre in nombres:
+                self.pasarela.ejecutar_query(
+                    "INSERT INTO usuarios (nombre_usuario, password, correo, rol) VALUES (%s, %s, %s, %s)",
+                    (nombre, 'hash-' + nombre, f'{nombre}@x.com', rol))
+
+    def test_listar_paginado_sin_hash(self):
+        self._crear([f'u{i:02d}' for i in range(25)])
+        pagina = self.gestor.listar(limite=10)
+        self.assertEqual(len(pagina), 10)
+        self.assertEqual(pagina[0]._fields, modelos.COLUMNAS_LISTADO)
+        self.assertEqual((pagina[0].nombre_usuario, pagina[0].correo), ('u00', 'u00@x.com'))
+        with self.assertRaises(AttributeError):
+            pagina[0].rol = 'admin'
+
+        resto = self.gestor.listar(despues_de_id=pagina[-1].id, limite=100)
+        self.assertEqual([f.nombre_usuario for f in resto], [f'u{i:02d}' for i in range(10, 25)])
+
+        with self.assertRaises(modelos.UsuarioError):
+            self.gestor.listar(columnas=('nombre_usuario', 'password'))
+        with self.assertRaises(modelos.UsuarioError):
+            self.gestor.listar(columnas=('id; DROP TABLE usuarios',))
+        con_hash = self.gestor.listar(limite=1, columnas=('password',), incluir_hash=True)
+        self.assertEqual(con_hash[0]._fields, ('id', 'password'))
+        self.assertEqual(con_hash[0].password, 'hash-u00')
+
+    def test_listar_filtros(self):
+        self._crear(['ana', 'andres', 'beto'])
+        self._crear(['anibal', 'an_x', 'anyx'], rol='admin')
+        self.assertEqual([f.nombre_usuario for f in self.gestor.listar(nombre='an', columnas=('nombre_usuario',))],
+                         ['ana', 'andres', 'anibal', 'an_x', 'anyx'])
+        self.assertEqual([f.nombre_usuario for f in self.gestor.listar(rol='admin', nombre='an_')],
+                         ['an_x'])
+        self.assertEqual(self.gestor.listar(rol='invitado'), [])
+
+    def test_modificar_y_eliminar_en_una_sentencia(self):
+        self._crear(['ana', 'beto'])
+        ana, beto = [f.id for f in self.gestor.listar()]
+        antes = self.pasarela.estadisticas()['consultas']
+
+        self.assertTrue(self.gestor.modificar(ana, nuevo_rol='admin'))
+        self.assertTrue(self.gestor.modificar(ana, nuevo_rol='admin'))  # mismos valores: sigue encontrándolo
+        with self.assertRaises(modelos.UsuarioError) as ctx:
+            self.gestor.modificar(beto, nuevo_correo='ana@x.com')
+        self.assertIn('en uso', str(ctx.exception))
+        with self.assertRaises(modelos.UsuarioError):
+            self.gestor.modificar(999, nuevo_rol='admin')
+
+        self.assertTrue(self.gestor.eliminar(beto))
+        with self.assertRaises(modelos.UsuarioError):
+            self.gestor.eliminar(beto)
+        # Ninguna escritura hizo un SELECT previo
+        self.assertEqual(self.pasarela.estadisticas()['consultas'], antes)
+        self.assertEqual([(f.nombre_usuario, f.rol) for f in self.gestor.listar()], [('ana', 'admin')])
+
+    @unittest.skipIf(contrasenas.bcrypt is None, 'requiere el paquete bcrypt')
+    def test_importar_csv(self):
+        contrasenas.configurar('bcrypt', 4)
+        self.addCleanup(contrasenas._costos.pop, 'bcrypt', None)
+        modelos.configurar_servicio_hash(trabajadores=2)
+        self.addCleanup(modelos.configurar_servicio_hash)
+        self._crear(['existente'])
+        lineas = ['nombre_usuario,correo,password,rol']
+        lineas += [f'u{i},u{i}@x.com,clave{i},' for i in range(12)]
+        lineas += ['existente,otro@x.com,x,', 'u1,nuevo@x.com,x,', 'sin_pass,s@x.com,,', 'malo,no-es-correo,x,admin']
+        creados, errores = self.gestor.importar_csv(io.StringIO('\n'.join(lineas)), tamano_lote=5)
+
+        self.assertEqual(creados, 12)
+        self.assertEqual(sorted(errores), [14, 15, 16, 17])
+        self.assertIn('ya existe', errores[14])
+        self.assertIn('linea 3', errores[15])
+        self.assertEqual(len(self.gestor.listar(nombre='u')), 12)
+        self.assertIsInstance(self.gestor.login('u7', 'clave7'), modelos.Usuario)
+
+        with self.assertRaises(modelos.UsuarioError):
+            self.gestor.importar_csv(io.StringIO('nombre_usuario,password\na,b'))
+
+    @unittest.skipIf(contrasenas.bcrypt is None, 'requiere el paquete bcrypt')
+    def test_login_limitado(self):
+        contrasenas.configurar('bcrypt', 4)
+        self.addCleanup(contrasenas._costos.pop, 'bcrypt', None)
+        lim = limitador.configurar_limitador(intentos_cuenta=2, recarga_cuenta=0.001)
+        self.addCleanup(limitador.configurar_limitador)
+        self.gestor.agregar_usuario(modelos.Usuario('ana', 'ana@x.com', password='clave'))
+
+        with self.assertRaises(modelos.UsuarioError):
+            self.gestor.login('nadie', 'x')  # inexistente: verifica contra el señuelo
+        self.assertIsInstance(self.gestor.login('ana', 'clave'), modelos.Usuario)
+        with self.assertRaises(modelos.UsuarioError):
+            self.gestor.login('ana', 'mala')
+        with self.assertRaises(modelos.UsuarioError) as ctx:
+            self.gestor.login('ana', 'clave')
+        self.assertIn('Demasiados intentos', str(ctx.exception))
+        self.assertEqual(lim.estadisticas()['rechazados_cuenta'], 1)
+
+    def test_modificar_y_eliminar_invalidan_sesiones(self):
+        self._crear(['ana', 'beto'])
+        ana, beto = [f.id for f in self.gestor.listar()]
+        t_ana = self.almacen.crear('usuario', ana, 'ana', 'admin')
+        t_beto = self.almacen.crear('usuario', beto, 'beto', 'usuario')
+        consultas = self.pasarela.estadisticas()['consultas']
+        self.assertTrue(self.gestor.tiene_rol(t_ana, 'admin'))
+        self.assertEqual(self.gestor.exigir_rol(t_beto).nombre, 'beto')
+        self.assertEqual(self.pasarela.estadisticas()['consultas'], consultas)  # sin ir a la BD
+
+        self.gestor.modificar(ana, nuevo_rol='usuario')
+        self.assertIsNone(self.gestor.sesion(t_ana))
+        with self.assertRaises(modelos.UsuarioError):
+            self.gestor.exigir_rol(t_ana, 'admin')
+        self.gestor.eliminar(beto)
+        self.assertFalse(self.gestor.tiene_rol(t_beto))
+
+    @unittest.skipIf(contrasenas.bcrypt is None, 'requiere el paquete bcrypt')
+    def test_iniciar_sesion(self):
+        contrasenas.configurar('bcrypt', 4)
+        self.addCleanup(contrasenas._costos.pop, 'bcrypt', None)
+        self.gestor.agregar_usuario(modelos.Usuario('ana', 'ana@x.com', rol='admin', password='clave'))
+        token = self.gestor.iniciar_sesion('ana', 'clave')
+        self.assertEqual(self.gestor.sesion(token).rol, 'admin')
+        self.gestor.cerrar_sesion(token)
+        self.assertIsNone(self.gestor.sesion(token))
+
+    def _servicio_de_prueba(self):
+        # Costo bajo fijo en el servicio: las pruebas no calibran ni tardan lo de un login real
+        contrasenas.configurar('bcrypt', 4)
+        self.addCleanup(contrasenas._costos.pop, 'bcrypt', None)
+        servicio = modelos.configurar_servicio_hash(trabajadores=2, costo=4)
+        self.addCleanup(modelos.configurar_servicio_hash)
+        limitador.configurar_limitador()
+        self.addCleanup(limitador.configurar_limitador)
+        return servicio
+
+    @unittest.skipIf(contrasenas.bcrypt is None, 'requiere el paquete bcrypt')
+    def test_configurar_servicio_hash(self):
+        anterior = modelos.obtener_servicio_hash()
+        servicio = self._servicio_de_prueba()
+        self.assertIs(modelos.obtener_servicio_hash(), servicio)
+        self.assertIsNot(servicio, anterior)
+        with self.assertRaises(RuntimeError):
+            anterior.hashear('x')  # el servicio reemplazado queda cerrado
+        h = servicio.hashear('clave').result()
+        self.assertEqual(contrasenas.identificar(h), ('bcrypt', 4))
+        self.assertTrue(servicio.verificar('clave', h).result())
+        self.assertFalse(servicio.verificar('otra', h).result())
+
+        restaurado = modelos.configurar_servicio_hash()
+        self.assertIs(modelos.obtener_servicio_hash(), restaurado)
+        self.assertEqual(restaurado.costo(), contrasenas.costo_actual('bcrypt'))
+
+    @unittest.skipIf(contrasenas.bcrypt is None, 'requiere el paquete bcrypt')
+    def test_set_password_async_guarda_el_hash(self):
+        self._servicio_de_prueba()
+        for i in range(20):
+            usuario = modelos.Usuario(f'u{i}', f'u{i}@x.com')
+            h = usuario.set_password_async(f'clave{i}').result()
+            # Cuando el Future se completa el hash ya está guardado en el usuario
+            self.assertEqual(usuario.get_hash(), h)
+            self.assertTrue(usuario.check_password(f'clave{i}'))
+        usuario.set_password('sincrona')
+        self.assertTrue(usuario.check_password_async('sincrona').result())
+        self.assertFalse(modelos.Usuario('x', 'x@x.com').check_password_async('x').result())
+
+    def test_set_password_async_no_se_adelanta(self):
+        # El Future del servicio despierta a quien espera antes de correr sus
+        # callbacks: uno lento delante deja ver si se devolvió antes de guardar
+        hash_listo = Future()
+        hash_listo.add_done_callback(lambda f: threading.Event().wait(0.2))
+        servicio = modelos.configurar_servicio_hash(trabajadores=1)
+        self.addCleanup(modelos.configurar_servicio_hash)
+        servicio.hashear = lambda password: hash_listo
+        usuario = modelos.Usuario('ana', 'ana@x.com')
+        futuro = usuario.set_password_async('clave')
+        threading.Thread(target=hash_listo.set_result, args=('hash-ana',)).start()
+        self.assertEqual(futuro.result(timeout=2), 'hash-ana')
+        self.assertEqual(usuario.get_hash(), 'hash-ana')
+
+    @unittest.skipIf(contrasenas.bcrypt is None, 'requiere el paquete bcrypt')
+    def test_variantes_async_como_las_sincronas(self):
+        self._servicio_de_prueba()
+        ana = self.gestor.agregar_usuario_async(modelos.Usuario('ana', 'ana@x.com', password='clave')).result()
+        self.assertEqual(ana, self.gestor.buscar_por_nombre('ana').id)
+        with self.assertRaises(modelos.UsuarioError):
+            self.gestor.agregar_usuario_async(modelos.Usuario('ana', 'otro@x.com', password='x')).result()
+
+        self.assertEqual(self.gestor.login_async('ana', 'clave').result().id, self.gestor.login('ana', 'clave').id)
+        for nombre, password in (('ana', 'mala'), ('nadie', 'clave')):
+            with self.assertRaises(modelos.UsuarioError) as asincrono:
+                self.gestor.login_async(nombre, password).result()
+            with self.assertRaises(modelos.UsuarioError) as sincrono:
+                self.gestor.login(nombre, password)
+            self.assertEqual(str(asincrono.exception), str(sincrono.exception))
+
+        self.assertTrue(self.gestor.modificar_async(ana, nuevo_pass='nueva').result())
+        self.assertEqual(self.gestor.login('ana', 'nueva').id, ana)
+        with self.assertRaises(modelos.UsuarioError):
+            self.gestor.modificar_async(ana + 100, nuevo_rol='admin').result()
+
+    @unittest.skipIf(contrasenas.bcrypt is None, 'requiere el paquete bcrypt')
+    def test_senuelo_con_el_costo_del_servicio(self):
+        contrasenas.configurar('bcrypt', 4)
+        self.addCleanup(contrasenas._costos.pop, 'bcrypt', None)
+        servicio = modelos.configurar_servicio_hash(trabajadores=1, costo=5)
+        self.addCleanup(modelos.configurar_servicio_hash)
+        self.assertFalse(servicio.verificar_senuelo('x').result())
+        self.assertIn(('bcrypt', 5), contrasenas._senuelos)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import tempfile
+import os
+import db
+import planilla
+
+
+class TestPlanilla(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.NamedTemporaryFile(delete=False)
+        self.db_path = self.tmp.name
+        self.tmp.close()
+        db.inicializar_bd(ruta_db=self.db_path)
+
+        self.dep = db.agregar_departamento('Desarrollo', ruta_db=self.db_path)
+        self.proj = db.agregar_proyecto('Portal', ruta_db=self.db_path)
+        self.emp1 = db.agregar_empleado('Ana', '', '', 'ana@test.com', 10.0, 'x', self.dep, ruta_db=self.db_path)
+        self.emp2 = db.agregar_empleado('Beto', '', '', 'beto@test.com', 10.0, 'x', self.dep, ruta_db=self.db_path)
+
+    def tearDown(self):
+        db.cerrar_conexiones(self.db_path)
+        for sufijo in ("", "-wal", "-shm"):
+            try:
+                os.unlink(self.db_path + sufijo)
+            except Exception:
+                pass
+
+    def test_fechas_semana(self):
+        fechas = planilla.fechas_semana('2025-01-08')
+        self.assertEqual((fechas[0], fechas[-1]), ('2025-01-06', '2025-01-12'))
+
+    def test_guarda_toda_la_semana_en_una_transaccion(self):
+        filas = [
+            (str(self.emp1), str(self.proj), ['8', '8', '', '', '4,5', '', '']),
+            (str(self.emp2), str(self.proj), ['', '', '', '', '', '', '']),  # sin horas: se ignora
+            ('', '', ['', '', '', '', '', '', '']),
+        ]
+        guardados, errores = planilla.guardar_planilla('2025-01-08', filas, ruta_db=self.db_path)
+        self.assertEqual((guardados, errores), (3, {}))
+        self.assertEqual([r[1:] for r in db.listar_registros(ruta_db=self.db_path)], [
+            (self.emp1, self.proj, '2025-01-06', 8.0),
+            (self.emp1, self.proj, '2025-01-07', 8.0),
+            (self.emp1, self.proj, '2025-01-10', 4.5),
+        ])
+
+    def test_errores_por_fila_no_guardan_nada(self):
+        filas = [
+            (str(self.emp1), str(self.proj), ['8', '', '', '', '', '', '']),
+            ('abc', str(self.proj), ['8', '', '', '', '', '', '']),
+            (str(self.emp2), '999', ['8', '', '', '', '', '', '']),
+            (str(self.emp2), str(self.proj), ['30', '', '', '', '', '', '']),
+            (str(self.emp1), str(self.proj), ['', '2', '', '', '', '', '']),
+        ]
+        guardados, errores = planilla.guardar_planilla('2025-01-06', filas, ruta_db=self.db_path)
+        self.assertEqual(guardados, 0)
+        self.assertEqual(sorted(errores), [1, 2, 3, 4])
+        self.assertIn('entero', errores[1][0])
+        self.assertIn('#999', errores[2][0])
+        self.assertIn('Lun', errores[3][0])
+        self.assertIn('fila 1', errores[4][0])
+        self.assertEqual(db.listar_registros(ruta_db=self.db_path), [])
+
+    def test_tope_diario_incluye_horas_ya_registradas(self):
+        db.agregar_registro_tiempo(self.emp1, self.proj, '2025-01-06', 20.0, ruta_db=self.db_path)
+        otro = db.agregar_proyecto('Nube', ruta_db=self.db_path)
+        registros, errores = planilla.validar_planilla('2025-01-06', [
+            (str(self.emp1), str(otro), ['5', '5', '', '', '', '', '']),
+        ], ruta_db=self.db_path)
+        self.assertEqual(registros, [])
+        self.assertEqual(errores, {0: [f'El empleado #{self.emp1} supera 24 h el Lun.']})
+
+    def test_filas_equipo(self):
+        db.asignar_empleado_a_proyecto(self.emp1, self.proj, ruta_db=self.db_path)
+        self.assertEqual(planilla.filas_equipo(self.dep, ruta_db=self.db_path),
+                         [(self.emp1, self.proj), (self.emp2, None)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import tempfile
+import os
+from datetime import date
+import db
+import reportes
+
+
+class TestReportes(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.NamedTemporaryFile(delete=False)
+        self.db_path = self.tmp.name
+        self.tmp.close()
+        db.inicializar_bd(ruta_db=self.db_path)
+
+        self.dep = db.agregar_departamento('Desarrollo', ruta_db=self.db_path)
+        self.proj1 = db.agregar_proyecto('Portal', ruta_db=self.db_path)
+        self.proj2 = db.agregar_proyecto('Nube', ruta_db=self.db_path)
+        self.emp1 = db.agregar_empleado('Ana', '', '', 'ana@test.com', 1000.0, 'x', self.dep, ruta_db=self.db_path)
+        self.emp2 = db.agregar_empleado('Beto', '', '', 'beto@test.com', 1000.0, 'x', None, ruta_db=self.db_path)
+        db.agregar_registros_tiempo([
+            (self.emp1, self.proj1, '2024-12-30', 8.0),  # semana ISO 2025-W01
+            (self.emp1, self.proj2, '2025-01-05', 4.0),  # domingo, 2025-W01
+            (self.emp2, self.proj1, '2025-01-06', 6.0),  # lunes, 2025-W02
+            (self.emp2, self.proj1, '2025-02-10', 2.0),
+        ], ruta_db=self.db_path)
+
+    def tearDown(self):
+        db.cerrar_conexiones(self.db_path)
+        for sufijo in ("", "-wal", "-shm"):
+            try:
+                os.unlink(self.db_path + sufijo)
+            except Exception:
+                pass
+
+    def test_por_empleado(self):
+        filas = reportes.horas_por_empleado(ruta_db=self.db_path)
+        self.assertEqual(filas, [(self.emp1, 'Ana', 12.0, 6.0, 2), (self.emp2, 'Beto', 8.0, 4.0, 2)])
+
+    def test_por_proyecto_con_rango(self):
+        filas = reportes.horas_por_proyecto('2025-01-01', '2025-01-31', ruta_db=self.db_path)
+        self.assertEqual(filas, [(self.proj1, 'Portal', 6.0, 6.0, 1), (self.proj2, 'Nube', 4.0, 4.0, 1)])
+
+    def test_por_departamento(self):
+        filas = reportes.horas_por_departamento(ruta_db=self.db_path)
+        self.assertEqual(filas, [(None, None, 8.0, 4.0, 2), (self.dep, 'Desarrollo', 12.0, 6.0, 2)])
+
+    def test_por_semana_iso_y_mes(self):
+        semanas = reportes.horas_por_semana(ruta_db=self.db_path)
+        self.assertEqual([(s[0], s[2]) for s in semanas],
+                         [('2025-W01', 12.0), ('2025-W02', 6.0), ('2025-W07', 2.0)])
+        meses = reportes.horas_por_mes(ruta_db=self.db_path)
+        self.assertEqual([(m[0], m[4]) for m in meses], [('2024-12', 1), ('2025-01', 2), ('2025-02', 1)])
+
+    def test_agrupacion_invalida(self):
+        with self.assertRaises(ValueError):
+            reportes.horas_por('anio', ruta_db=self.db_path)
+
+    def test_panel_de_la_semana(self):
+        # Semana del 2024-12-30 al 2025-01-05: Ana 8 h en Portal y 4 h en Nube
+        datos = reportes.panel(date(2025, 1, 2), usar_cache=False, ruta_db=self.db_path)
+        self.assertEqual((datos['desde'], datos['hasta']), ('2024-12-30', '2025-01-05'))
+        self.assertEqual([(f[1], f[2]) for f in datos['horas_proyecto']], [('Portal', 8.0), ('Nube', 4.0)])
+        self.assertEqual(datos['top_empleados'], [(self.emp1, 'Ana', 12.0)])
+        # 1 empleado × 5 días hábiles × 8 h = 40 h de capacidad
+        self.assertEqual(datos['utilizacion'], [(self.dep, 'Desarrollo', 1, 12.0, 40.0, 0.3)])
+        self.assertEqual(datos['costo_proyecto'], [(self.proj1, 'Portal', 8.0, 8000.0), (self.proj2, 'Nube', 4.0, 4000.0)])
+
+    def test_panel_usa_cache_con_ttl(self):
+        reportes.invalidar_panel()
+        primero = reportes.panel(date(2025, 1, 2), ruta_db=self.db_path)
+        db.agregar_registro_tiempo(self.emp2, self.proj2, '2025-01-03', 5.0, ruta_db=self.db_path)
+        self.assertIs(reportes.panel(date(2025, 1, 2), ruta_db=self.db_path), primero)
+        fresco = reportes.panel(date(2025, 1, 2), ttl=0, usar_cache=False, ruta_db=self.db_path)
+        self.assertEqual(fresco['top_empleados'][1], (self.emp2, 'Beto', 5.0))
+        reportes.invalidar_panel()
+
+    def test_top_empleados_limite(self):
+        self.assertEqual(reportes.top_empleados(1, ruta_db=self.db_path), [(self.emp1, 'Ana', 12.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import sesiones
+
+
+class TestSesiones(unittest.TestCase):
+    def setUp(self):
+        self.almacen = sesiones.AlmacenSesiones(tamano_maximo=3, inactividad=60)
+
+    def test_crear_y_consultar(self):
+        token = self.almacen.crear('usuario', 1, 'ana', 'admin')
+        self.assertEqual(self.almacen.obtener(token), sesiones.Sesion('usuario', 1, 'ana', 'admin'))
+        self.assertTrue(self.almacen.tiene_rol(token, 'admin', 'gerente'))
+        self.assertTrue(self.almacen.tiene_rol(token))
+        self.assertFalse(self.almacen.tiene_rol(token, 'usuario'))
+        self.assertFalse(self.almacen.tiene_rol('token-falso'))
+        self.assertEqual(self.almacen.exigir_rol(token, 'admin').nombre, 'ana')
+        with self.assertRaises(sesiones.SesionError):
+            self.almacen.exigir_rol(token, 'usuario')
+        with self.assertRaises(sesiones.SesionError):
+            self.almacen.exigir_rol(None)
+        self.assertNotEqual(self.almacen.crear('usuario', 1, 'ana', 'admin'), token)
+
+        self.almacen.cerrar(token)
+        self.almacen.cerrar(token)
+        self.assertIsNone(self.almacen.obtener(token))
+
+    def test_expira_por_inactividad(self):
+        token = self.almacen.crear('usuario', 1, 'ana', 'admin')
+        otro = self.almacen.crear('usuario', 2, 'beto', 'usuario')
+        self.almacen.inactividad = 0
+        self.assertIsNone(self.almacen.obtener(token))
+        self.assertEqual(self.almacen.purgar_expiradas(), 1)
+        self.assertIsNone(self.almacen.obtener(otro))
+        self.assertEqual(len(self.almacen), 0)
+        self.assertEqual(self.almacen.estadisticas['expiradas'], 2)
+
+    def test_lru_descarta_la_menos_usada(self):
+        a = self.almacen.crear('usuario', 1, 'a', 'usuario')
+        b = self.almacen.crear('usuario', 2, 'b', 'usuario')
+        c = self.almacen.crear('usuario', 3, 'c', 'usuario')
+        self.almacen.obtener(a)
+        d = self.almacen.crear('usuario', 4, 'd', 'usuario')
+        self.assertIsNone(self.almacen.obtener(b))
+        for token in (a, c, d):
+            self.assertIsNotNone(self.almacen.obtener(token))
+        self.assertEqual(self.almacen.estadisticas['expulsadas'], 1)
+
+    def test_consulta_sin_renovar(self):
+        a = self.almacen.crear('usuario', 1, 'a', 'usuario')
+        self.almacen.crear('usuario', 2, 'b', 'usuario')
+        self.almacen.crear('usuario', 3, 'c', 'usuario')
+        self.assertEqual(self.almacen.exigir_rol(a, renovar=False).nombre, 'a')
+        self.almacen.crear('usuario', 4, 'd', 'usuario')
+        self.assertIsNone(self.almacen.obtener(a))
+
+    def test_invalidar_usuario(self):
+        t1 = self.almacen.crear('usuario', 1, 'ana', 'admin')
+        t2 = self.almacen.crear('usuario', 1, 'ana', 'admin')
+        emp = self.almacen.crear('empleado', 1, 'Ana', 'empleado')
+        self.assertEqual(self.almacen.invalidar_usuario('usuario', 1), 2)
+        self.assertIsNone(self.almacen.obtener(t1))
+        self.assertIsNone(self.almacen.obtener(t2))
+        self.assertIsNotNone(self.almacen.obtener(emp))
+        self.assertEqual(self.almacen.invalidar_usuario('usuario', 1), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
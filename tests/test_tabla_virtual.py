@@ -0,0 +1,53 @@
+import unittest
+from tabla_virtual import CachePaginas
+
+
+class TestCachePaginas(unittest.TestCase):
+    def setUp(self):
+        self.datos = [(i,) for i in range(1, 96)]
+        self.cargas = []
+
+        def cargar(desde, limite):
+            self.cargas.append(desde)
+            return self.datos[desde:desde + limite]
+
+        self.cache = CachePaginas(cargar, tamano_pagina=10, max_paginas=3)
+
+    def test_ventana_que_cruza_paginas(self):
+        self.assertEqual(self.cache.filas(8, 5), [(9,), (10,), (11,), (12,), (13,)])
+        self.assertEqual(self.cargas, [0, 10])
+        self.cache.filas(12, 3)
+        self.assertEqual(self.cargas, [0, 10])
+
+    def test_final_de_la_tabla(self):
+        self.assertEqual(self.cache.filas(92, 10), [(93,), (94,), (95,)])
+
+    def test_limite_de_paginas(self):
+        for inicio in (0, 10, 20, 30):
+            self.cache.filas(inicio, 1)
+        self.cache.filas(0, 1)
+        self.assertEqual(self.cargas, [0, 10, 20, 30, 0])
+
+    def test_reemplazar_filas_guardadas(self):
+        self.cache.filas(0, 15)
+        self.cache.reemplazar({3: (3, 'nuevo'), 50: (50, 'no cargada')})
+        self.assertEqual(self.cache.filas(2, 2), [(3, 'nuevo'), (4,)])
+        self.assertEqual(self.cargas, [0, 10])
+        self.assertEqual(self.datos[2], (3,))
+
+    def test_paginas_cargadas_aparte(self):
+        self.cache.filas(0, 5)
+        self.assertEqual(self.cache.faltantes(8, 5), [1])
+        self.assertEqual(self.cache.guardadas(8, 4), [(9,), (10,), None, None])
+        self.cache.guardar(1, self.datos[10:20])
+        self.assertEqual(self.cache.faltantes(8, 5), [])
+        self.assertEqual(self.cache.filas(8, 4), [(9,), (10,), (11,), (12,)])
+        self.assertEqual(self.cargas, [0])
+        # una página corta marca el final de la tabla
+        self.cache.guardar(9, self.datos[90:])
+        self.assertEqual(self.cache.faltantes(90, 20), [])
+        self.assertEqual(self.cache.guardadas(93, 5), [(94,), (95,)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import threading
+import time
+from tareas import EjecutorTareas, tarea_actual
+
+
+class RaizFalsa:
+    """Sustituto mínimo de tk.Tk: guarda los after() y los ejecuta al bombear."""
+
+    def __init__(self):
+        self.pendientes = {}
+        self.siguiente = 0
+
+    def after(self, ms, funcion, *args):
+        self.siguiente += 1
+        self.pendientes[self.siguiente] = (funcion, args)
+        return self.siguiente
+
+    def after_cancel(self, ident):
+        self.pendientes.pop(ident, None)
+
+    def bombear(self, hasta, timeout=2.0):
+        limite = time.monotonic() + timeout
+        while not hasta() and time.monotonic() < limite:
+            for ident in list(self.pendientes):
+                funcion, args = self.pendientes.pop(ident)
+                funcion(*args)
+            time.sleep(0.005)
+
+
+class TestEjecutorTareas(unittest.TestCase):
+    def setUp(self):
+        self.raiz = RaizFalsa()
+        self.ocupado = []
+        self.ejecutor = EjecutorTareas(self.raiz, intervalo_ms=1,
+                                       al_cambiar_ocupado=lambda o, n: self.ocupado.append(o))
+
+    def tearDown(self):
+        self.ejecutor.cerrar()
+
+    def test_entrega_resultado_en_hilo_de_la_gui(self):
+        hilos = []
+        resultados = []
+        self.ejecutor.ejecutar(lambda a, b: (hilos.append(threading.current_thread()), a + b)[1], 2, 3,
+                               al_terminar=resultados.append)
+        self.raiz.bombear(lambda: resultados)
+        self.assertEqual(resultados, [5])
+        self.assertIsNot(hilos[0], threading.current_thread())
+        self.assertEqual(self.ocupado, [True, False])
+        self.assertEqual(self.ejecutor.pendientes, 0)
+
+    def test_errores_van_a_al_fallar(self):
+        errores = []
+        self.ejecutor.ejecutar(lambda: 1 / 0, al_fallar=errores.append)
+        self.raiz.bombear(lambda: errores)
+        self.assertIsInstance(errores[0], ZeroDivisionError)
+
+    def test_coalescencia_por_clave(self):
+        bloqueo = threading.Event()
+        ejecutor = EjecutorTareas(self.raiz, max_hilos=1, intervalo_ms=1)
+        self.addCleanup(ejecutor.cerrar)
+        ejecutor.ejecutar(bloqueo.wait, 2)
+        llamadas = []
+        resultados = []
+        for i in range(5):
+            ejecutor.ejecutar(lambda i=i: llamadas.append(i) or i, clave='refrescar',
+                              al_terminar=resultados.append)
+        bloqueo.set()
+        self.raiz.bombear(lambda: resultados)
+        self.assertEqual(llamadas, [4])
+        self.assertEqual(resultados, [4])
+
+    def test_cancelacion_y_progreso(self):
+        empezo = threading.Event()
+        avances = []
+        resultados = []
+
+        def larga():
+            tarea = tarea_actual()
+            empezo.set()
+            while not tarea.cancelada:
+                tarea.avisar_progreso(1)
+                time.sleep(0.005)
+            return 'terminada'
+
+        tarea = self.ejecutor.ejecutar(larga, al_terminar=resultados.append, al_progreso=avances.append)
+        empezo.wait(1)
+        self.raiz.bombear(lambda: avances)
+        tarea.cancelar()
+        self.raiz.bombear(lambda: self.ejecutor.pendientes == 0)
+        self.assertEqual(resultados, [])
+        self.assertEqual(tarea.estado, 'cancelada')
+
+
+if __name__ == '__main__':
+    unittest.main()